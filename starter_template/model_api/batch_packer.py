@@ -0,0 +1,91 @@
+import os
+import re
+from typing import Any, Callable, List, Optional, Sequence
+
+from dotenv import load_dotenv
+
+try:
+    from .llm_gateway import CHARS_PER_TOKEN, estimate_tokens
+except ImportError:
+    from llm_gateway import CHARS_PER_TOKEN, estimate_tokens
+
+load_dotenv()
+
+# Prompt tokens of one categorization request. Far below the model's input limit: the answer
+# grows with the number of articles and has to fit the output limit too
+CATEGORIZATION_TOKEN_BUDGET = int(os.getenv('LLM_CATEGORIZATION_TOKEN_BUDGET', 24000))
+
+# Articles per request, so the per-article answers stay well within the output limit
+MAX_ARTICLES_PER_BATCH = int(os.getenv('LLM_CATEGORIZATION_MAX_ARTICLES', 60))
+
+# Tokens of article text sent per article; the lead of a news article summarizes it
+ARTICLE_PREVIEW_TOKENS = int(os.getenv('LLM_ARTICLE_PREVIEW_TOKENS', 300))
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+
+def compress_article(text: str, max_tokens: int = ARTICLE_PREVIEW_TOKENS,
+                     estimate: Callable[[str], int] = estimate_tokens) -> str:
+    """
+    Summary-first preview of an article: the whole text if it fits max_tokens, otherwise its
+    leading paragraphs and sentences up to max_tokens, cut at a sentence boundary where possible.
+
+    Args:
+        text (str): Article body
+        max_tokens (int): Token budget of the preview
+        estimate (Callable): Token counter of the target model
+
+    Returns:
+        str: The preview
+    """
+    text = ' '.join(str(text).split())
+    if estimate(text) <= max_tokens:
+        return text
+    # Trim to the character budget first so the tokenizer only sees a preview-sized text
+    text = text[:max_tokens * CHARS_PER_TOKEN]
+    preview = ''
+    for sentence in _SENTENCE_END.split(text):
+        candidate = f"{preview} {sentence}" if preview else sentence
+        if estimate(candidate) > max_tokens:
+            break
+        preview = candidate
+    if not preview:
+        # A single sentence longer than the budget, cut it at a word
+        preview = text
+        while preview and estimate(preview) > max_tokens:
+            preview = preview[:int(len(preview) * 0.9)].rsplit(' ', 1)[0]
+    return preview
+
+
+def pack_batches(items: Sequence[Any], item_tokens: Callable[[Any], int], overhead_tokens: int = 0,
+                 budget: int = CATEGORIZATION_TOKEN_BUDGET,
+                 max_items: Optional[int] = MAX_ARTICLES_PER_BATCH) -> List[List[Any]]:
+    """
+    Greedily pack items, in order, into as few batches as possible such that every batch fits
+    budget tokens together with the fixed prompt overhead_tokens. An item too large for any
+    batch gets a batch of its own.
+
+    Args:
+        items (Sequence): Items to send, e.g. formatted articles
+        item_tokens (Callable): Token count of one item as it appears in the prompt
+        overhead_tokens (int): Tokens of the prompt without any item
+        budget (int): Prompt tokens allowed per request
+        max_items (int): Items allowed per request, None for no limit
+
+    Returns:
+        list: Batches, each a list of items
+    """
+    capacity = max(1, budget - overhead_tokens)
+    batches: List[List[Any]] = []
+    batch: List[Any] = []
+    used = 0
+    for item in items:
+        tokens = item_tokens(item)
+        if batch and (used + tokens > capacity or (max_items and len(batch) >= max_items)):
+            batches.append(batch)
+            batch, used = [], 0
+        batch.append(item)
+        used += tokens
+    if batch:
+        batches.append(batch)
+    return batches
@@ -0,0 +1,72 @@
+"""
+Pages per second of every installed HTML parser backend (see html_parser).
+
+Usage:
+    python benchmark_html_parser.py [page.html ...] [--repeat N]
+
+Without arguments the pages in the HTTP cache are used, or a generated
+article page if the cache is empty.
+"""
+import argparse
+import glob
+import os
+import time
+
+try:
+    from .html_parser import available_backends, build_parser, DATE_METADATA_ONLY
+    from .http_cache import CACHE_DIR
+except ImportError:
+    from html_parser import available_backends, build_parser, DATE_METADATA_ONLY
+    from http_cache import CACHE_DIR
+
+
+def sample_page() -> str:
+    links = "".join(f'<li><a href="/news/2025/04/06/some-headline-number-{i}">Headline {i}</a></li>' for i in range(300))
+    paragraphs = "".join(f"<p>Paragraph {i} of the article body with a few more words in it.</p>" for i in range(60))
+    return (
+        '<html><head><title>Sample</title>'
+        '<meta property="article:published_time" content="2025-04-06T07:30:00+05:30">'
+        '<script type="application/ld+json">{"datePublished": "2025-04-06T07:30:00+05:30"}</script>'
+        '</head><body><nav><ul>' + links + '</ul></nav>'
+        '<main><h1>Sample headline</h1><div class="article-body">' + paragraphs + '</div></main>'
+        '</body></html>'
+    )
+
+
+def load_pages(paths):
+    if not paths:
+        paths = glob.glob(os.path.join(CACHE_DIR, '*', '*.body'))[:200]
+    pages = []
+    for path in paths:
+        with open(path, 'rb') as file:
+            pages.append(file.read().decode('utf-8', errors='replace'))
+    return pages or [sample_page()]
+
+
+def run(pages, repeat):
+    tasks = {
+        "full tree": lambda parser, page: parser.soup(page),
+        "links only": lambda parser, page: parser.hrefs(page),
+        "date metadata": lambda parser, page: parser.soup(page, DATE_METADATA_ONLY),
+    }
+    print(f"{len(pages)} pages x {repeat} runs")
+    print(f"{'backend':<14}" + "".join(f"{name:>16}" for name in tasks))
+    for backend in available_backends():
+        parser = build_parser(backend)
+        row = f"{backend:<14}"
+        for task in tasks.values():
+            start = time.perf_counter()
+            for _ in range(repeat):
+                for page in pages:
+                    task(parser, page)
+            elapsed = time.perf_counter() - start
+            row += f"{len(pages) * repeat / elapsed:>12.1f} p/s"
+        print(row)
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Benchmark the HTML parser backends")
+    arg_parser.add_argument("pages", nargs="*", help="HTML files to parse (default: cached pages)")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="Runs over all pages per backend")
+    args = arg_parser.parse_args()
+    run(load_pages(args.pages), args.repeat)
@@ -0,0 +1,123 @@
+import os
+import threading
+from collections import deque
+from typing import Deque, Dict
+
+import requests
+
+try:
+    from .politeness_scheduler import get_host
+except ImportError:
+    from politeness_scheduler import get_host
+
+# Consecutive failures (connection errors, timeouts, 5xx) after which a host is skipped for the run
+FAILURE_THRESHOLD = int(os.getenv('SCRAPER_BREAKER_FAILURES', 4))
+
+# Timeouts: DEFAULT_TIMEOUT until MIN_SAMPLES responses were seen, then TIMEOUT_MULTIPLIER x p95
+# latency of the host, clamped to [MIN_TIMEOUT, MAX_TIMEOUT]
+DEFAULT_TIMEOUT = 10.0
+MIN_TIMEOUT = 3.0
+MAX_TIMEOUT = 30.0
+TIMEOUT_MULTIPLIER = 3.0
+MIN_SAMPLES = 5
+LATENCY_WINDOW = 50
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of requesting a host whose circuit is open."""
+
+
+class HostHealth:
+    def __init__(self):
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.consecutive_failures = 0
+        self.open = False
+
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker and adaptive timeouts, fed by every request of make_request.
+
+    After FAILURE_THRESHOLD consecutive failures a host's circuit opens and stays open until
+    reset() (called at the start of every run), so one dead or hanging source costs a few
+    timeouts instead of three retries for its section page and each of its articles.
+    Answers below 500 count as healthy: the host is up even if the page is missing.
+    """
+
+    def __init__(self, failure_threshold: int = FAILURE_THRESHOLD):
+        self.failure_threshold = failure_threshold
+        self._hosts: Dict[str, HostHealth] = {}
+        self._lock = threading.Lock()
+
+    def _health(self, url: str) -> HostHealth:
+        host = get_host(url)
+        health = self._hosts.get(host)
+        if health is None:
+            health = HostHealth()
+            self._hosts[host] = health
+        return health
+
+    def allow(self, url: str) -> bool:
+        """False if the circuit of the host is open."""
+        with self._lock:
+            return not self._health(url).open
+
+    def check(self, url: str) -> None:
+        """Raise CircuitOpenError if the circuit of the host is open."""
+        if not self.allow(url):
+            raise CircuitOpenError(f"Circuit open for {get_host(url)}, skipping {url}")
+
+    def timeout(self, url: str) -> float:
+        """Request timeout for the host, from its p95 latency."""
+        with self._lock:
+            latencies = sorted(self._health(url).latencies)
+        if len(latencies) < MIN_SAMPLES:
+            return DEFAULT_TIMEOUT
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        return min(MAX_TIMEOUT, max(MIN_TIMEOUT, p95 * TIMEOUT_MULTIPLIER))
+
+    def record_response(self, url: str, status_code: int, latency: float, throttled: bool = False) -> bool:
+        """
+        Record an answer of the host and the time it took to arrive. A throttling 5xx
+        (with Retry-After) is left to the scheduler and not counted as a failure.
+
+        Returns:
+            bool: True if this answer opened the circuit
+        """
+        if status_code >= 500 and not throttled:
+            return self.record_failure(url)
+        with self._lock:
+            health = self._health(url)
+            health.latencies.append(latency)
+            health.consecutive_failures = 0
+        return False
+
+    def record_failure(self, url: str) -> bool:
+        """
+        Record a failed request (no answer or a 5xx).
+
+        Returns:
+            bool: True if this failure opened the circuit
+        """
+        with self._lock:
+            health = self._health(url)
+            health.consecutive_failures += 1
+            if not health.open and health.consecutive_failures >= self.failure_threshold:
+                health.open = True
+                return True
+        return False
+
+    def reset(self) -> None:
+        """Close all circuits and forget the failures, keeping the latency history."""
+        with self._lock:
+            for health in self._hosts.values():
+                health.open = False
+                health.consecutive_failures = 0
+
+
+_breaker = CircuitBreaker()
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    """Return the shared circuit breaker."""
+    return _breaker
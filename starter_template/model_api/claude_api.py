@@ -1,10 +1,10 @@
-import anthropic
 from dotenv import load_dotenv
 import os
 from .web_scrapper_api import get_links_and_content_from_page
 from .mongo import db
 from datetime import datetime
 from .logging_scripts import create_log_file, append_to_log
+from .llm_gateway import get_llm_gateway, estimate_tokens
 
 
 
@@ -37,16 +37,15 @@ from .logging_scripts import create_log_file, append_to_log
 class ClaudeAIAPI:
     def __init__(self):
         load_dotenv()
-        self.client = anthropic.Anthropic(
-            api_key=os.getenv('ANTHROPIC_API_KEY')
-        )
+        # Shared by every Anthropic caller of the process, see llm_gateway
+        self.client = get_llm_gateway().client("anthropic")
 
         self.log_file = f"claude_{datetime.today().strftime('%Y_%m_%d')}_log.txt"
         create_log_file(log_file) 
         
 
     def claude_api_request(self, txt)->str:
-        message = self.client.messages.create(
+        message = get_llm_gateway().call("anthropic", lambda client: client.messages.create(
             model="claude-3-5-sonnet-20241022",
             max_tokens=8192,
             temperature=1,
@@ -62,7 +61,7 @@ class ClaudeAIAPI:
                     ]
                 }
             ]
-        )
+        ), estimated_tokens=estimate_tokens(txt) + 8192)
         append_to_log(self.log_file, f"[CLAUDE_API][INF][{datetime.today().strftime('%H:%M:%S')}] {message.content[0].text}")
         print(message.content)
         return message.content[0].text
@@ -0,0 +1,94 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Optional
+from urllib.parse import urlparse
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Limits are shared by every thread in the process, so the category threads in
+# start_gemini_assistant cannot multiply them. Override through the environment if needed.
+MAX_CONCURRENT_REQUESTS = int(os.getenv('CRAWL_MAX_CONCURRENCY', 16))
+MAX_CONCURRENT_REQUESTS_PER_HOST = int(os.getenv('CRAWL_MAX_CONCURRENCY_PER_HOST', 4))
+
+
+class CrawlEngine:
+    """
+    Process-wide asyncio crawl engine.
+
+    A single event loop runs on a daemon thread and schedules fetch jobs under a global
+    and a per-host semaphore. The fetch callables themselves are the blocking scraper
+    functions (make_request, fetch_article, ...), so they run on a thread pool sized to
+    the global limit and keep all their retry/logging behaviour.
+    """
+
+    def __init__(self, max_concurrency: int = MAX_CONCURRENT_REQUESTS, max_per_host: int = MAX_CONCURRENT_REQUESTS_PER_HOST):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_per_host = max(1, max_per_host)
+        self._loop = None
+        self._executor = None
+        self._global_semaphore = None
+        self._host_semaphores = {}
+        self._start_lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the background event loop on first use."""
+        with self._start_lock:
+            if self._loop is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="crawl")
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="crawl-engine", daemon=True).start()
+        return self._loop
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        # Only ever called on the loop thread, so no extra locking is needed
+        host = urlparse(url).netloc.lower()
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.max_per_host)
+        return self._host_semaphores[host]
+
+    async def _fetch(self, fetch: Callable[[str], Any], url: str) -> Any:
+        if self._global_semaphore is None:
+            self._global_semaphore = asyncio.Semaphore(self.max_concurrency)
+        # Wait for the host slot first so a busy host does not hold global slots idle
+        async with self._host_semaphore(url):
+            async with self._global_semaphore:
+                return await asyncio.get_running_loop().run_in_executor(self._executor, fetch, url)
+
+    async def _gather(self, fetch: Callable[[str], Any], urls: list) -> Dict[str, Any]:
+        results = await asyncio.gather(*(self._fetch(fetch, url) for url in urls), return_exceptions=True)
+        return dict(zip(urls, results))
+
+    def crawl(self, urls: Iterable[str], fetch: Callable[[str], Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Run fetch(url) for every URL concurrently and wait for all of them.
+
+        Args:
+            urls (Iterable[str]): URLs to fetch, duplicates are fetched once
+            fetch (Callable[[str], Any]): Blocking function that fetches and processes one URL
+            timeout (float, optional): Maximum seconds to wait for the whole batch
+
+        Returns:
+            Dict[str, Any]: Mapping of URL to fetch(url) result, or the exception it raised
+        """
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return {}
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(self._gather(fetch, urls), loop)
+        return future.result(timeout)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_crawl_engine() -> CrawlEngine:
+    """Return the shared process-wide crawl engine."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = CrawlEngine()
+        return _engine
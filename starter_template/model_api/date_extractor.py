@@ -0,0 +1,292 @@
+import json
+import re
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+import dateutil.parser
+from bs4 import BeautifulSoup
+
+try:
+    from .html_parser import make_soup
+except ImportError:
+    from html_parser import make_soup
+
+# Only the start of the page is scanned by the cheap strategies, publication metadata
+# lives in <head> or right after it on practically every news site
+DATE_SCAN_KB = 128
+
+# Fields and meta names carrying the publication date, most specific first
+JSONLD_DATE_FIELDS = ['datePublished', 'dateModified', 'dateCreated', 'uploadDate']
+META_DATE_NAMES = [
+    'article:published_time', 'og:published_time', 'datepublished', 'pubdate', 'publishdate',
+    'publish-date', 'parsely-pub-date', 'dc.date.issued', 'timestamp', 'date'
+]
+
+JSONLD_DATE_PATTERNS = [re.compile(r'"%s"\s*:\s*"([^"]+)"' % field) for field in JSONLD_DATE_FIELDS]
+META_TAG = re.compile(r'<meta\b[^>]*>', re.IGNORECASE)
+TAG_ATTRIBUTE = re.compile(r'([\w:.-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\')')
+TIME_DATETIME = re.compile(r'<time\b[^>]*\bdatetime\s*=\s*["\']([^"\']+)["\']', re.IGNORECASE)
+URL_DATE = re.compile(r'/((?:19|20)\d{2})[/-](0[1-9]|1[0-2])[/-](0[1-9]|[12]\d|3[01])(?:/|$|[-_])')
+
+# Date strings in the page text, the last resort
+TEXT_DATE_PATTERNS = [
+    re.compile(r'(\d{1,2}\s+(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{4})'),
+    re.compile(r'((?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2},?\s+\d{4})'),
+    re.compile(r'(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})'),
+    re.compile(r'(\d{2}/\d{2}/\d{4})'),
+    re.compile(r'(\d{4}/\d{2}/\d{2})'),
+]
+
+
+def parse_date(value: Optional[str]) -> Optional[datetime]:
+    """
+    Parse a date string into a naive datetime, trying datetime.fromisoformat before dateutil.
+    Timezone info is dropped (the wall-clock time of the source is kept).
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        parsed_date = datetime.fromisoformat(value[:-1] + '+00:00' if value.endswith('Z') else value)
+    except ValueError:
+        try:
+            parsed_date = dateutil.parser.parse(value)
+        except (ValueError, OverflowError):
+            return None
+    # Convert to naive datetime if it has timezone info
+    if parsed_date.tzinfo is not None:
+        parsed_date = parsed_date.replace(tzinfo=None)
+    return parsed_date
+
+
+def date_from_jsonld(head: str) -> Optional[datetime]:
+    for pattern in JSONLD_DATE_PATTERNS:
+        match = pattern.search(head)
+        if match:
+            parsed_date = parse_date(match.group(1))
+            if parsed_date:
+                return parsed_date
+    return None
+
+
+def date_from_meta(head: str) -> Optional[datetime]:
+    found = {}
+    for tag in META_TAG.findall(head):
+        attributes = {name.lower(): double if double else single for name, double, single in TAG_ATTRIBUTE.findall(tag)}
+        key = (attributes.get('property') or attributes.get('name') or attributes.get('itemprop') or '').lower()
+        if key in META_DATE_NAMES and attributes.get('content') and key not in found:
+            found[key] = attributes['content']
+    for name in META_DATE_NAMES:
+        parsed_date = parse_date(found.get(name))
+        if parsed_date:
+            return parsed_date
+    return None
+
+
+def date_from_time_tag(head: str) -> Optional[datetime]:
+    for value in TIME_DATETIME.findall(head):
+        parsed_date = parse_date(value)
+        if parsed_date:
+            return parsed_date
+    return None
+
+
+def date_from_url(url: str) -> Optional[datetime]:
+    """
+    Return the day encoded in the URL path (e.g. /2025/04/06/ or /2025-04-06-), or None.
+    Only the day is known, so the result is midnight of that day.
+    """
+    match = URL_DATE.search(urlparse(url).path)
+    if not match:
+        return None
+    try:
+        return datetime(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+    except ValueError:
+        return None
+
+
+def extract_date_from_metadata(soup: BeautifulSoup) -> Optional[datetime]:
+    """
+    Extract the publication date from JSON-LD structured data, meta tags and <time> tags
+    """
+    # Check for structured data
+    structured_data = soup.find('script', {'type': 'application/ld+json'})
+    if structured_data:
+        try:
+            data = json.loads(structured_data.string)
+            if isinstance(data, list):
+                data = data[0]
+
+            date_str = None
+            # Check various fields where date might be stored
+            for field in JSONLD_DATE_FIELDS:
+                if field in data:
+                    date_str = data[field]
+                    break
+
+            if date_str:
+                parsed_date = parse_date(date_str)
+                if parsed_date:
+                    return parsed_date
+        except:
+            pass
+
+    # Common meta tags for publication date
+    meta_tags = [
+        ('meta[property="article:published_time"]', 'content'),
+        ('meta[name="pubdate"]', 'content'),
+        ('meta[name="publishdate"]', 'content'),
+        ('meta[name="timestamp"]', 'content'),
+        ('meta[name="date"]', 'content'),
+        ('time', 'datetime')
+    ]
+
+    for selector, attr in meta_tags:
+        date_tag = soup.select_one(selector)
+        if date_tag and date_tag.get(attr):
+            parsed_date = parse_date(date_tag[attr])
+            if parsed_date:
+                return parsed_date
+
+    return None
+
+
+def extract_date_from_text(text: str) -> Optional[datetime]:
+    """
+    Extract the publication date from date strings in the page text
+    """
+    for pattern in TEXT_DATE_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            parsed_date = parse_date(match.group(1))
+            if parsed_date:
+                return parsed_date
+    return None
+
+
+def leading_text(soup: BeautifulSoup, max_chars: int) -> str:
+    """The first max_chars of the page text, without joining the text of the whole tree."""
+    parts = []
+    size = 0
+    for string in soup.strings:
+        parts.append(string)
+        size += len(string)
+        if size >= max_chars:
+            break
+    return ''.join(parts)[:max_chars]
+
+
+class DateExtractor:
+    """
+    Publication date extraction, cheapest strategy first.
+
+    The cheap strategies (JSON-LD, meta and <time> regexes) only scan the first DATE_SCAN_KB
+    of the raw HTML without building a tree. The strategy that worked last for a domain is
+    tried first on its next page. A date in the URL path has no time of day, so it is only
+    used when the page carries no timestamp; a full parse with the text patterns over the first
+    DATE_SCAN_KB of the page text comes last.
+    domain_strategy records what worked last per domain ('jsonld', 'meta', 'time', 'full',
+    'url' or 'text'); only the cheap ones change the order.
+    """
+
+    CHEAP_STRATEGIES = ['jsonld', 'meta', 'time']
+
+    def __init__(self, scan_kb: int = DATE_SCAN_KB):
+        self.scan_chars = scan_kb * 1024
+        self._lock = threading.Lock()
+        self.domain_strategy: Dict[str, str] = {}
+        self.strategies: Dict[str, Callable[[str], Optional[datetime]]] = {
+            'jsonld': date_from_jsonld,
+            'meta': date_from_meta,
+            'time': date_from_time_tag,
+        }
+
+    def strategy_order(self, domain: str) -> List[str]:
+        """Cheap strategies in the order they are tried for domain."""
+        with self._lock:
+            preferred = self.domain_strategy.get(domain)
+        if preferred in self.CHEAP_STRATEGIES:
+            return [preferred] + [name for name in self.CHEAP_STRATEGIES if name != preferred]
+        return list(self.CHEAP_STRATEGIES)
+
+    def _remember(self, domain: str, strategy: str) -> None:
+        with self._lock:
+            self.domain_strategy[domain] = strategy
+
+    def learned_strategy(self, url: str) -> Optional[str]:
+        """The strategy that worked last for the domain of url, None if there is none."""
+        with self._lock:
+            return self.domain_strategy.get(urlparse(url).netloc.lower())
+
+    def learn_strategy(self, url: str, strategy: str) -> None:
+        """Record strategy as the one that worked last for the domain of url, e.g. in another process."""
+        self._remember(urlparse(url).netloc.lower(), strategy)
+
+    def extract_cheap(self, url: str, html: str) -> Optional[datetime]:
+        """Run only the cheap strategies over the start of html (which may be a partial page)."""
+        domain = urlparse(url).netloc.lower()
+        head = html[:self.scan_chars]
+        for name in self.strategy_order(domain):
+            pub_date = self.strategies[name](head)
+            if pub_date:
+                self._remember(domain, name)
+                return pub_date
+        return None
+
+    def extract(self, url: str, html: Optional[str] = None, soup: Optional[BeautifulSoup] = None) -> Optional[datetime]:
+        """
+        Extract the publication date of the article at url.
+
+        Args:
+            url (str): The URL of the article
+            html (str, optional): Raw HTML of the page, scanned by the cheap strategies
+            soup (BeautifulSoup, optional): Parsed page, reused for the full-parse fallback
+
+        Returns:
+            Optional[datetime]: The publication date if found, None otherwise
+        """
+        domain = urlparse(url).netloc.lower()
+        if html:
+            pub_date = self.extract_cheap(url, html)
+            if pub_date:
+                return pub_date
+
+        # An already parsed page makes the full metadata check free, so it goes before the URL
+        if soup is not None:
+            pub_date = extract_date_from_metadata(soup)
+            if pub_date:
+                self._remember(domain, 'full')
+                return pub_date
+
+        pub_date = date_from_url(url)
+        if pub_date:
+            self._remember(domain, 'url')
+            return pub_date
+
+        if soup is None:
+            if not html:
+                return None
+            soup = make_soup(html)
+            pub_date = extract_date_from_metadata(soup)
+            if pub_date:
+                self._remember(domain, 'full')
+                return pub_date
+        pub_date = extract_date_from_text(leading_text(soup, self.scan_chars))
+        if pub_date:
+            self._remember(domain, 'text')
+        return pub_date
+
+
+_extractor = None
+_extractor_lock = threading.Lock()
+
+
+def get_date_extractor() -> DateExtractor:
+    """Return the shared date extractor."""
+    global _extractor
+    with _extractor_lock:
+        if _extractor is None:
+            _extractor = DateExtractor()
+        return _extractor
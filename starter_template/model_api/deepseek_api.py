@@ -3,7 +3,6 @@ import json
 import time
 from threading import Thread, Lock
 from datetime import datetime
-from openai import OpenAI
 from dotenv import load_dotenv
 
 # Handle imports for both Django and standalone execution
@@ -12,12 +11,14 @@ try:
     from .web_scrapper_api import get_links_and_content_from_page
     from .mongo import db
     from .logging_scripts import *
+    from .llm_gateway import get_llm_gateway, estimate_tokens
 except ImportError:
     try:
         # Try absolute imports (for standalone script)
         from web_scrapper_api import get_links_and_content_from_page
         from mongo import db
         from logging_scripts import *
+        from llm_gateway import get_llm_gateway, estimate_tokens
     except ImportError:
         print("Warning: Could not import some modules. Some functionality may be limited.")
         # Define fallback or dummy functions/variables if needed
@@ -28,7 +29,8 @@ class DeepseekAPI:
     def __init__(self):
         load_dotenv()
         self.api_key = os.getenv('DEEPSEEK_API_KEY')
-        self.client = OpenAI(api_key=self.api_key, base_url="https://api.deepseek.com")
+        # Shared by every Deepseek caller of the process, see llm_gateway
+        self.client = get_llm_gateway().client("deepseek")
         
         self.today = datetime.today().strftime('%Y_%m_%d_%H_%M_%S')
         self.log_file = f"deepseek_{self.today}_log.txt"
@@ -115,14 +117,18 @@ class DeepseekAPI:
         """Generate content using Deepseek API"""
         try:
             start_time = time.time()
-            response = self.client.chat.completions.create(
-                model="deepseek-chat",
-                messages=[
-                    {"role": "system", "content": "You are an expert assistant that categorizes news content."},
-                    {"role": "user", "content": txt}
-                ],
-                temperature=0.2,
-                max_tokens=1024
+            response = get_llm_gateway().call(
+                "deepseek",
+                lambda client: client.chat.completions.create(
+                    model="deepseek-chat",
+                    messages=[
+                        {"role": "system", "content": "You are an expert assistant that categorizes news content."},
+                        {"role": "user", "content": txt}
+                    ],
+                    temperature=0.2,
+                    max_tokens=1024
+                ),
+                estimated_tokens=estimate_tokens(txt) + 1024
             )
             end_time = time.time()
             processing_time = end_time - start_time
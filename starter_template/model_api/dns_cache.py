@@ -0,0 +1,126 @@
+import ipaddress
+import json
+import os
+import socket
+import threading
+import time
+from typing import Dict, List, Optional
+
+import urllib3.util.connection
+from urllib3.util.connection import allowed_gai_family
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Seconds a resolved address list is reused; the system resolver does not expose record TTLs
+DNS_TTL = float(os.getenv('SCRAPER_DNS_TTL', 1800))
+
+# Resolved addresses are kept next to the scripts, so a new run starts with warm entries
+DNS_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dns_cache.json')
+
+
+def _is_ip(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+        return True
+    except ValueError:
+        return False
+
+
+class DnsCache:
+    """
+    Process-wide resolver cache for the scrapers' HTTP connections.
+
+    install() routes urllib3's connection setup (and so every requests.Session) through
+    resolve(), which asks the system resolver once per host and DNS_TTL. If resolving
+    fails, an expired entry is used rather than failing the request; addresses that all
+    refuse the connection are dropped so the next attempt resolves again.
+    """
+
+    def __init__(self, ttl: float = DNS_TTL, cache_file: str = DNS_CACHE_FILE):
+        self.ttl = ttl
+        self.cache_file = cache_file
+        self._lock = threading.Lock()
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as file:
+                self.entries: Dict[str, Dict] = json.load(file)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def _save(self) -> None:
+        try:
+            tmp_path = f"{self.cache_file}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                json.dump(self.entries, file)
+            os.replace(tmp_path, self.cache_file)
+        except OSError as e:
+            print(f"Failed to save DNS cache: {str(e)}")
+
+    def resolve(self, host: str, port: int) -> List[str]:
+        """
+        Return the IP addresses of host, from the cache while the entry is fresh.
+
+        Raises:
+            socket.gaierror: If the host cannot be resolved and nothing is cached for it
+        """
+        key = host.lower()
+        with self._lock:
+            entry = self.entries.get(key)
+        if entry and entry["expires"] > time.time():
+            return entry["addresses"]
+        try:
+            results = socket.getaddrinfo(host, port, allowed_gai_family(), socket.SOCK_STREAM)
+        except socket.gaierror:
+            if entry:
+                return entry["addresses"]
+            raise
+        addresses = list(dict.fromkeys(sockaddr[0] for _, _, _, _, sockaddr in results))
+        with self._lock:
+            self.entries[key] = {"addresses": addresses, "expires": time.time() + self.ttl}
+            self._save()
+        return addresses
+
+    def invalidate(self, host: str) -> None:
+        """Forget the addresses of host."""
+        with self._lock:
+            if self.entries.pop(host.lower(), None) is not None:
+                self._save()
+
+    def create_connection(self, address, *args, **kwargs) -> socket.socket:
+        """urllib3.util.connection.create_connection that connects to the cached addresses."""
+        host, port = address
+        if host.startswith("["):
+            host = host.strip("[]")
+        if _is_ip(host):
+            return _create_connection((host, port), *args, **kwargs)
+        error: Optional[OSError] = None
+        for ip in self.resolve(host, port):
+            try:
+                return _create_connection((ip, port), *args, **kwargs)
+            except OSError as e:
+                error = e
+        self.invalidate(host)
+        raise error if error is not None else OSError(f"No addresses for {host}")
+
+
+_create_connection = urllib3.util.connection.create_connection
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_dns_cache() -> DnsCache:
+    """Return the shared DNS cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = DnsCache()
+        return _cache
+
+
+def install() -> None:
+    """
+    Route all urllib3/requests connections of this process through the shared DNS cache.
+    Patches urllib3 process-wide, so it is called by the scraper entry points rather than on import.
+    """
+    cache = get_dns_cache()
+    urllib3.util.connection.create_connection = cache.create_connection
@@ -0,0 +1,182 @@
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+import soupsieve
+from bs4 import BeautifulSoup
+
+# Per-domain extraction rules: {domain: {"title": selector, "body": selector, "drop": [selector, ...]}}.
+# A domain matches its subdomains too. Missing keys fall back to the generic behaviour.
+DOMAIN_RULES: Dict[str, Dict[str, Any]] = {
+    'thehindu.com': {'title': 'h1.title', 'body': 'div.articlebodycontent'},
+    'ndtv.com': {'title': 'h1.sp-ttl', 'body': 'div.sp-cn'},
+}
+
+# Generic body selectors tried in order for domains without a (working) rule
+GENERIC_BODY_SELECTORS = [
+    'div.article-content, div.article-body, div.body-content, div.article-text, div.content',
+    '[itemprop="articleBody"]',
+    'article',
+    'main',
+    'div#main',
+    'div.container',
+]
+GENERIC_TITLE_SELECTOR = 'h1, h2'
+
+# Boilerplate removed from every body before its paragraphs are read
+DEFAULT_DROP_SELECTORS = ['script', 'style', 'aside', 'nav', 'figure', 'form', '.related', '.advertisement', '.ad']
+
+# A body selector counts as working for a domain when it yields at least this many words
+MIN_BODY_WORDS = 20
+
+# Body selectors learned for domains without a rule are kept next to the scripts
+LEARNED_RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'extraction_rules.json')
+
+
+def _domain(url: str) -> str:
+    host = urlparse(url).netloc.lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+class ExtractionRules:
+    """
+    Chooses title/body selectors by hostname. Selectors are compiled once with soupsieve.
+
+    Domains with a rule in DOMAIN_RULES use it. For other domains the generic body selectors
+    are tried in order; the first one producing a real body is learned for the domain,
+    persisted, and tried first on its next page.
+    """
+
+    def __init__(self, rules: Optional[Dict[str, Dict[str, Any]]] = None, learned_file: str = LEARNED_RULES_FILE):
+        self.rules = DOMAIN_RULES if rules is None else rules
+        self.learned_file = learned_file
+        self._lock = threading.Lock()
+        self._compiled: Dict[str, Any] = {}
+        try:
+            with open(self.learned_file, 'r', encoding='utf-8') as file:
+                self.learned: Dict[str, str] = json.load(file)
+        except (OSError, ValueError):
+            self.learned = {}
+
+    def compiled(self, selector: str):
+        """Return the compiled soupsieve pattern for selector, compiling it on first use."""
+        with self._lock:
+            pattern = self._compiled.get(selector)
+            if pattern is None:
+                pattern = soupsieve.compile(selector)
+                self._compiled[selector] = pattern
+            return pattern
+
+    def rule_for(self, url: Optional[str]) -> Dict[str, Any]:
+        """Return the configured rule for the domain of url (or a parent domain), or an empty dict."""
+        if not url:
+            return {}
+        domain = _domain(url)
+        while domain:
+            if domain in self.rules:
+                return self.rules[domain]
+            domain = domain.partition('.')[2]
+        return {}
+
+    def body_selectors(self, url: Optional[str]) -> List[str]:
+        """Body selectors in the order they are tried for url."""
+        selectors = []
+        rule = self.rule_for(url)
+        if rule.get('body'):
+            selectors.append(rule['body'])
+        with self._lock:
+            learned = self.learned.get(_domain(url)) if url else None
+        if learned and learned not in selectors:
+            selectors.append(learned)
+        selectors.extend(selector for selector in GENERIC_BODY_SELECTORS if selector not in selectors)
+        return selectors
+
+    def learned_selector(self, url: Optional[str]) -> Optional[str]:
+        """The body selector learned for the domain of url, None if there is none."""
+        if not url:
+            return None
+        with self._lock:
+            return self.learned.get(_domain(url))
+
+    def learn(self, url: Optional[str], selector: str, persist: bool = True) -> None:
+        """
+        Remember the body selector that worked for a domain without a configured body rule.
+        With persist=False it is only kept in memory, e.g. in parser processes given the parent's selectors.
+        """
+        if not url or self.rule_for(url).get('body') == selector:
+            return
+        domain = _domain(url)
+        with self._lock:
+            if self.learned.get(domain) == selector:
+                return
+            self.learned[domain] = selector
+            if not persist:
+                return
+            try:
+                tmp_path = f"{self.learned_file}.{threading.get_ident()}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as file:
+                    json.dump(self.learned, file)
+                os.replace(tmp_path, self.learned_file)
+            except OSError as e:
+                print(f"Failed to save extraction rules: {str(e)}")
+
+    def extract(self, soup: BeautifulSoup, url: Optional[str] = None) -> Union[List[str], str]:
+        """
+        Extract [title, body] from a parsed article page with the rules for url.
+        Note that boilerplate is removed from the soup in place.
+
+        Returns:
+            list | str: [title, body], or an error message if no title or body element was found
+        """
+        return self.extract_with_selector(soup, url)[0]
+
+    def extract_with_selector(self, soup: BeautifulSoup, url: Optional[str] = None,
+                              learn: bool = True) -> Tuple[Union[List[str], str], Optional[str]]:
+        """
+        Like extract(), also returning the body selector that produced a real body (None otherwise).
+        With learn=False the selector is not remembered, e.g. in parser processes that hand it back.
+        """
+        rule = self.rule_for(url)
+        title = None
+        if rule.get('title'):
+            title = self.compiled(rule['title']).select_one(soup)
+        if title is None:
+            title = self.compiled(GENERIC_TITLE_SELECTOR).select_one(soup)
+        if title is None:
+            return "Error: Could not find an article title", None
+
+        drop_selectors = DEFAULT_DROP_SELECTORS + rule.get('drop', [])
+        first_body = None
+        for selector in self.body_selectors(url):
+            body = self.compiled(selector).select_one(soup)
+            if body is None:
+                continue
+            for drop_selector in drop_selectors:
+                for element in self.compiled(drop_selector).select(body):
+                    element.decompose()
+            body_text = "\n".join(p.get_text().strip() for p in body.find_all('p'))
+            if len(body_text.split()) >= MIN_BODY_WORDS:
+                if learn:
+                    self.learn(url, selector)
+                return [title.get_text().strip(), body_text], selector
+            if first_body is None:
+                first_body = body_text
+        if first_body is None:
+            return "Error: Could not find an article body", None
+        # Nothing substantial anywhere, keep the first match like before (dropped later as too short)
+        return [title.get_text().strip(), first_body], None
+
+
+_rules = None
+_rules_lock = threading.Lock()
+
+
+def get_extraction_rules() -> ExtractionRules:
+    """Return the shared extraction rules."""
+    global _rules
+    with _rules_lock:
+        if _rules is None:
+            _rules = ExtractionRules()
+        return _rules
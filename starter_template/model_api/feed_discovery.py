@@ -0,0 +1,121 @@
+import re
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+import dateutil.parser
+
+# Feeds or news sitemaps to read for a section page instead of (or when autodiscovery
+# finds nothing on) the HTML page. Format: {section_url: [feed_or_sitemap_url, ...]}
+FEED_SOURCES: Dict[str, List[str]] = {}
+
+# Feed entries read per feed, newest entries come first in practically every feed
+MAX_FEED_ENTRIES = 200
+
+FEED_LINK_TAG = re.compile(r'<link\b[^>]*\btype=["\']application/(?:rss|atom)\+xml["\'][^>]*>', re.IGNORECASE)
+HREF_ATTR = re.compile(r'\bhref=["\']([^"\']+)["\']', re.IGNORECASE)
+
+
+def discover_feed_urls(section_url: str, html: str, autodiscover: bool = True) -> List[str]:
+    """
+    Find the feeds of a section page: configured FEED_SOURCES first, then
+    <link rel="alternate" type="application/rss+xml|atom+xml"> tags in the page head.
+
+    Args:
+        section_url (str): URL of the section page
+        html (str): HTML of the section page
+        autodiscover (bool): Also read the page head; its feeds are often site-wide rather than the section's
+
+    Returns:
+        List[str]: Absolute feed or sitemap URLs, empty if the source has none
+    """
+    feed_urls = list(FEED_SOURCES.get(section_url, []))
+    if not autodiscover:
+        return feed_urls
+    head = html[:html.lower().find('</head>')] if '</head>' in html.lower() else html[:65536]
+    for tag in FEED_LINK_TAG.findall(head):
+        href = HREF_ATTR.search(tag)
+        if href:
+            feed_url = urljoin(section_url, href.group(1).strip())
+            if feed_url not in feed_urls:
+                feed_urls.append(feed_url)
+    return feed_urls
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1].lower()
+
+
+def _child(element: ET.Element, name: str) -> Optional[ET.Element]:
+    for child in element:
+        if _local_name(child.tag) == name:
+            return child
+    return None
+
+
+def _child_text(element: ET.Element, *names: str) -> Optional[str]:
+    for name in names:
+        child = _child(element, name)
+        if child is not None and child.text and child.text.strip():
+            return child.text.strip()
+    return None
+
+
+def _parse_date(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        parsed_date = dateutil.parser.parse(value)
+    except (ValueError, OverflowError):
+        return None
+    # Naive datetimes, like extract_publication_date
+    if parsed_date.tzinfo is not None:
+        parsed_date = parsed_date.replace(tzinfo=None)
+    return parsed_date
+
+
+def parse_feed(xml_content: bytes) -> List[Tuple[str, Optional[datetime]]]:
+    """
+    Parse an RSS 2.0, Atom or (news) sitemap document.
+
+    Args:
+        xml_content (bytes): Raw feed document
+
+    Returns:
+        List[Tuple[str, Optional[datetime]]]: (article_url, publication_date) pairs, date None if absent
+    """
+    try:
+        root = ET.fromstring(xml_content)
+    except ET.ParseError:
+        return []
+
+    entries = []
+    for element in root.iter():
+        name = _local_name(element.tag)
+        if name == 'item':
+            # RSS 2.0
+            link = _child_text(element, 'link', 'guid')
+            pub_date = _parse_date(_child_text(element, 'pubdate', 'date', 'published'))
+        elif name == 'entry':
+            # Atom
+            link_element = None
+            for child in element:
+                if _local_name(child.tag) == 'link' and child.get('rel', 'alternate') == 'alternate':
+                    link_element = child
+                    break
+            link = link_element.get('href') if link_element is not None else None
+            pub_date = _parse_date(_child_text(element, 'published', 'updated'))
+        elif name == 'url':
+            # Sitemap, prefer news:publication_date over lastmod
+            link = _child_text(element, 'loc')
+            news = _child(element, 'news')
+            news_date = _child_text(news, 'publication_date') if news is not None else None
+            pub_date = _parse_date(news_date or _child_text(element, 'lastmod'))
+        else:
+            continue
+        if link and link.startswith('http'):
+            entries.append((link, pub_date))
+        if len(entries) >= MAX_FEED_ENTRIES:
+            break
+    return entries
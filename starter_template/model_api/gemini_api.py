@@ -13,6 +13,7 @@ try:
     from .mongo import db
     from .logging_scripts import *
     from .hugging_face_api_enhanced import check_url_content_relevance, categorize_content
+    from .llm_cache import get_llm_cache
 except ImportError:
     try:
         # Try absolute imports (for standalone script)
@@ -20,6 +21,7 @@ except ImportError:
         from mongo import db
         from logging_scripts import *
         from hugging_face_api_enhanced import check_url_content_relevance, categorize_content
+        from llm_cache import get_llm_cache
     except ImportError:
         print("Warning: Could not import some modules. Some functionality may be limited.")
         # Define fallback or dummy functions/variables if needed
@@ -120,9 +122,10 @@ class GeminiAPI:
         required_input_tokens = model.count_tokens(txt)
         print(f"Required Token for txt ={required_input_tokens=}")
         
-        response = self.client.models.generate_content(
-            model="gemini-2.0-flash-lite",
-            contents=[txt])
+        # Identical prompts are answered from the LLM response cache
+        response = get_llm_cache().generate(
+            "gemini-2.0-flash-lite", txt,
+            lambda: self.client.models.generate_content(model="gemini-2.0-flash-lite", contents=[txt]))
         
         print(response)
         print(f"Finish reason: {response.candidates[0].finish_reason}")
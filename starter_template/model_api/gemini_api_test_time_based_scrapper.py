@@ -13,6 +13,7 @@ try:
     from .mongo import db
     from .logging_scripts import *
     from .hugging_face_api_enhanced import check_url_content_relevance, categorize_content, summarize_articles
+    from .llm_cache import get_llm_cache
 except ImportError:
     try:
         # Try absolute imports (for standalone script)
@@ -20,6 +21,7 @@ except ImportError:
         from mongo import db
         from logging_scripts import *
         from hugging_face_api_enhanced import check_url_content_relevance, categorize_content, summarize_articles
+        from llm_cache import get_llm_cache
     except ImportError:
         print("Warning: Could not import some modules. Some functionality may be limited.")
         # Define fallback or dummy functions/variables if needed
@@ -459,9 +461,10 @@ class GeminiAPI:
         required_input_tokens = model.count_tokens(prompt_text)
         # print(f"Required Token for prompt_text ={required_input_tokens=}")
         
-        response = self.client.models.generate_content(
-            model="gemini-2.0-flash-lite",
-            contents=[prompt_text])
+        # Identical prompts are answered from the LLM response cache
+        response = get_llm_cache().generate(
+            "gemini-2.0-flash-lite", prompt_text,
+            lambda: self.client.models.generate_content(model="gemini-2.0-flash-lite", contents=[prompt_text]))
         
         # print(response)
         # print(f"Finish reason: {response.candidates[0].finish_reason}")
@@ -3,23 +3,46 @@ import json
 import time
 from threading import Thread, Lock
 from datetime import datetime, timedelta
+from urllib.parse import urlparse
 from openai import OpenAI
 from dotenv import load_dotenv
 
 # Handle imports for both Django and standalone execution
 try:
     # Try relative imports (for Django)
-    from .web_scrapper_test_time_based import get_links_and_content_from_page
+    from .web_scrapper_test_time_based import get_links_and_content_from_page, mark_stored
     from .mongo import db
     from .logging_scripts import *
     from .hugging_face_api_enhanced import check_url_content_relevance, categorize_content, summarize_articles
+    from .near_duplicates import group_near_duplicates
+    from .url_registry import UrlRegistry
+    from .parse_pool import get_parse_pool
+    from .circuit_breaker import get_circuit_breaker
+    from . import dns_cache
+    from .gemini_model import GEMINI_MODEL, get_model_info, estimate_tokens, get_usage
+    from .llm_gateway import get_llm_gateway
+    from .llm_cache import get_llm_cache
+    from .batch_packer import CATEGORIZATION_TOKEN_BUDGET, compress_article, pack_batches
+    from .structured_output import (StructuredOutputError, categorized_articles_schema, category_indices_schema,
+                                    parse, request_json, response_config, text_fields_schema)
 except ImportError:
     try:
         # Try absolute imports (for standalone script)
-        from web_scrapper_test_time_based import get_links_and_content_from_page
+        from web_scrapper_test_time_based import get_links_and_content_from_page, mark_stored
         from mongo import db
         from logging_scripts import *
         from hugging_face_api_enhanced import check_url_content_relevance, categorize_content, summarize_articles
+        from near_duplicates import group_near_duplicates
+        from url_registry import UrlRegistry
+        from parse_pool import get_parse_pool
+        from circuit_breaker import get_circuit_breaker
+        import dns_cache
+        from gemini_model import GEMINI_MODEL, get_model_info, estimate_tokens, get_usage
+        from llm_gateway import get_llm_gateway
+        from llm_cache import get_llm_cache
+        from batch_packer import CATEGORIZATION_TOKEN_BUDGET, compress_article, pack_batches
+        from structured_output import (StructuredOutputError, categorized_articles_schema, category_indices_schema,
+                                       parse, request_json, response_config, text_fields_schema)
     except ImportError:
         print("Warning: Could not import some modules. Some functionality may be limited.")
         # Define fallback or dummy functions/variables if needed
@@ -34,7 +57,8 @@ class GeminiAPI:
     def __init__(self):
         load_dotenv()
         self.api_key = os.getenv('GEMINI_API_KEY')
-        self.client = genai.Client(api_key=self.api_key)
+        # Shared by every Gemini caller of the process, see llm_gateway
+        self.client = get_llm_gateway().client("gemini")
         
         self.today_now = datetime.today().strftime('%Y_%m_%d_%H_%M_%S')
         self.log_file = f"gemini_{self.today_now}_log.txt"
@@ -52,8 +76,10 @@ class GeminiAPI:
         self.today_date = self._get_date_with_time_constraint()
         
         self.MAX_RETRY = 5
-        self.MAX_BATCHES = 5
         self.user_personalized_urls = {}
+        # Tokens billed to this instance, from the usage metadata of every Gemini response
+        self.token_usage = {"requests": 0, "cached_requests": 0, "prompt_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+        self.token_usage_lock = Lock()
         
         # Initialize model
         # self.model = genai.GenerativeModel('gemini-pro')
@@ -438,30 +464,112 @@ class GeminiAPI:
         }
         return news_categories
 
-    def openai_api_request(self, prompt_text):
+    def get_section_categories(self):
+        """
+        Default categories of clearly scoped news sections, keyed by the last path segment of the
+        section URL (e.g. 'https://www.livemint.com/economy' -> 'economy'). General sections such as
+        home pages, 'business' or 'entertainment' are left out on purpose and always go to Gemini.
+        
+        Args:
+            None
+        
+        Returns:
+            dict: Dictionary mapping section slugs (str) to lists of category names from get_categories
+                Example: {'india-politics': ['Politics'], 'real-estate': ['Real Estate']}
+        """
+        section_categories = {
+            "politics": ["Politics"], "india-politics": ["Politics"], "economy": ["Economy"],
+            "finance": ["Finance"], "banking": ["Finance"], "banking-finance": ["Finance"], "health": ["Health"],
+            "science": ["Science"], "environment": ["Environment"], "education": ["Education"],
+            "sport": ["Sports"], "sports": ["Sports"], "culture": ["Culture"], "travel": ["Travel"],
+            "food": ["Food"], "food-wine": ["Food"], "fashion": ["Fashion"], "art": ["Art"], "music": ["Music"],
+            "movies": ["Film"], "bollywood": ["Film"], "television": ["Television"], "tv": ["Television"],
+            "theatre": ["Theater"], "books": ["Books"], "sunday-herald-books": ["Books"], "auto": ["Automotive"],
+            "real-estate": ["Real Estate"]
+        }
+        return section_categories
+
+    def categorize_by_section(self, filtered_links, news_categories):
+        """
+        Assigns the default categories of their section to articles that are clearly filed under it,
+        so they need no Gemini call. An article counts as filed under a section when the section has an
+        entry in get_section_categories and the article URL, on the same host, is below the section path
+        or has the section slug as one of its path segments; links from a section page to other parts
+        of the site are left for Gemini.
+        
+        Args:
+            filtered_links (dict): Dictionary mapping base URLs to article URLs and their content
+                Example: {'https://source.com/economy': {'https://source.com/economy/article1': ['Title', 'Content']}}
+            news_categories (dict): Dictionary of category names to empty lists
+        
+        Returns:
+            tuple: (categorized_content in the format of categorize_content_with_gemini,
+                    remaining filtered_links that still need Gemini)
+        """
+        section_categories = self.get_section_categories()
+        categorized_content = {}
+        remaining_links = {}
+        for base_url, articles in filtered_links.items():
+            section = urlparse(base_url)
+            section_path = section.path.rstrip('/')
+            slug = os.path.splitext(section_path.rsplit('/', 1)[-1])[0].lower()
+            default_categories = [category for category in section_categories.get(slug, []) if category in news_categories]
+            remaining_links[base_url] = {}
+            for article_url, content in articles.items():
+                article = urlparse(article_url)
+                filed_under_section = (
+                    default_categories
+                    and article.netloc.lower() == section.netloc.lower()
+                    and (article.path.startswith(section_path + '/') or slug in article.path.lower().split('/'))
+                )
+                if filed_under_section:
+                    for category in default_categories:
+                        categorized_content.setdefault(category, {}).setdefault(base_url, {})[article_url] = content
+                else:
+                    remaining_links[base_url][article_url] = content
+        return categorized_content, remaining_links
+
+    def openai_api_request(self, prompt_text, response_schema=None):
         """
         Makes an API request to Gemini model and returns response in an OpenAI-compatible format.
         
         Args:
             prompt_text (str): The prompt text to send to the Gemini API
                 Example: "Summarize the latest news about AI advancements."
+            response_schema (dict, optional): Schema the answer must follow, see structured_output;
+                Gemini then answers with JSON only, which is cached only if it matches the schema
         
         Returns:
             ResponseWrapper: Custom object containing response data with attributes:
                 - text (str): The generated text response
                 - data (list): List containing nested object structure similar to OpenAI response
                 - candidates (list): Original Gemini response candidates
+                - usage_metadata (dict): Billed token counts, see gemini_model.get_usage
         """
         append_to_log(self.log_file, f"[GEMINI][DBG][{datetime.today().strftime('%H:%M:%S')}][openai_api_request] Received Gemini request for content {prompt_text}")
         
-        model_info = google_genai.get_model("models/gemini-2.0-flash-lite")
-        model = google_genai.GenerativeModel("models/gemini-2.0-flash-lite")
-        required_input_tokens = model.count_tokens(prompt_text)
-        # print(f"Required Token for prompt_text ={required_input_tokens=}")
-        
-        response = self.client.models.generate_content(
-            model="gemini-2.0-flash-lite",
-            contents=[prompt_text])
+        # Model metadata is fetched once per process and tokens are counted locally, so the
+        # generate_content call below is the only round trip
+        model_info = get_model_info(GEMINI_MODEL)
+        required_input_tokens = estimate_tokens(prompt_text, GEMINI_MODEL)
+        if model_info is not None and required_input_tokens > model_info.input_token_limit:
+            append_to_log(self.log_file, f"[GEMINI][WAR][{datetime.today().strftime('%H:%M:%S')}][openai_api_request] Prompt of about {required_input_tokens} tokens exceeds the {model_info.input_token_limit} token input limit of {GEMINI_MODEL}")
+        
+        # Identical prompts are answered from the LLM response cache, the others are queued against
+        # the process-wide Gemini RPM/TPM budget and 429s pause all Gemini callers
+        config = response_config(response_schema) if response_schema else None
+        validate = (lambda text: parse(text, response_schema)) if response_schema else None
+        response = get_llm_cache().generate(GEMINI_MODEL, prompt_text, lambda: get_llm_gateway().call(
+            "gemini",
+            lambda client: client.models.generate_content(model=GEMINI_MODEL, contents=[prompt_text], config=config),
+            estimated_tokens=required_input_tokens), config=config, validate=validate)
+        
+        usage = get_usage(response)
+        with self.token_usage_lock:
+            self.token_usage["cached_requests" if getattr(response, "from_cache", False) else "requests"] += 1
+            for key in ("prompt_tokens", "output_tokens", "total_tokens"):
+                self.token_usage[key] += usage[key]
+        append_to_log(self.log_file, f"[GEMINI][DBG][{datetime.today().strftime('%H:%M:%S')}][openai_api_request] Used {usage['prompt_tokens']} prompt and {usage['output_tokens']} output tokens (estimated {required_input_tokens} prompt tokens)")
         
         # print(response)
         # print(f"Finish reason: {response.candidates[0].finish_reason}")
@@ -476,9 +584,65 @@ class GeminiAPI:
                 })]
                 self.text = gemini_response.text
                 self.candidates = gemini_response.candidates
+                self.usage_metadata = usage
                 
         return ResponseWrapper(response)
     
+    def structured_request(self, prompt_text, response_schema):
+        """
+        Makes a Gemini request constrained to response_schema and returns the parsed answer.
+        An answer that fails validation gets a single repair request; only valid answers,
+        first or repaired, are kept in the LLM response cache.
+        
+        Args:
+            prompt_text (str): The prompt text to send to the Gemini API
+            response_schema (dict): Schema of the answer, see structured_output
+        
+        Returns:
+            dict or list: The validated answer
+        
+        Raises:
+            StructuredOutputError: If the answer is still invalid after the repair request
+        """
+        return request_json(lambda prompt, schema: self.openai_api_request(prompt, response_schema=schema).text,
+                            prompt_text, response_schema)
+
+    def _count_tokens(self, text):
+        """Token count of text for the Gemini model, see gemini_model.estimate_tokens."""
+        return estimate_tokens(text, GEMINI_MODEL)
+
+    def _batch_token_budget(self):
+        """Prompt tokens per categorization request, never more than the model's input limit."""
+        model_info = get_model_info(GEMINI_MODEL)
+        if model_info is not None and model_info.input_token_limit:
+            return min(CATEGORIZATION_TOKEN_BUDGET, model_info.input_token_limit)
+        return CATEGORIZATION_TOKEN_BUDGET
+
+    def _categorization_prompt(self, categories_list, formatted_batch):
+        """Prompt of categorize_content_with_gemini for a batch of formatted articles."""
+        return f"""
+        Analyze these news articles and categorize each into ONE of the following categories:
+        {', '.join(categories_list)}
+        
+        For each article, determine ALL relevant categories (an article can belong to multiple categories).
+        
+        Articles to categorize:
+        {json.dumps(formatted_batch, indent=2)}
+        
+        Return ONLY a JSON object with this structure:
+        {{
+            "categorized_articles": [
+                {{
+                    "article_url": "[article URL]",
+                    "categories": ["Category1", "Category2", ...]
+                }},
+                ...
+            ]
+        }}
+        
+        Ensure category names EXACTLY match the provided list. Only include categories from the list above.
+        """
+
     def categorize_content_with_gemini(self, filtered_links, news_categories):
         """
         Categorizes content from filtered news links using Gemini API.
@@ -507,101 +671,56 @@ class GeminiAPI:
         
         append_to_log(self.log_file, f"[GEMINI][INF][{datetime.today().strftime('%H:%M:%S')}][categorize_content_with_gemini] Categorizing content using Gemini API")
         
-        # Process each base URL separately
+        # Articles of all sources share the requests; every article is sent as its title and a
+        # summary-first preview, and the answer's article_url leads back to the source
+        sources_of = {}
+        formatted_articles = []
         for base_url, articles in filtered_links.items():
             append_to_log(self.log_file, f"[GEMINI][DBG][{datetime.today().strftime('%H:%M:%S')}][categorize_content_with_gemini] Processing {len(articles)} articles from {base_url}")
+            for article_url, content in articles.items():
+                sources_of.setdefault(article_url, []).append((base_url, content))
+                if len(sources_of[article_url]) > 1:
+                    continue
+                title = content[0] if isinstance(content, list) and len(content) >= 1 else "Unknown Title"
+                article_text = content[1] if isinstance(content, list) and len(content) >= 2 else str(content)
+                formatted_articles.append({
+                    "url": article_url,
+                    "title": title,
+                    "content_preview": compress_article(article_text, estimate=self._count_tokens)
+                })
+        
+        # Each request is filled up to the token budget instead of a fixed number of articles
+        batches = pack_batches(formatted_articles,
+                               lambda article: self._count_tokens(json.dumps(article, indent=2)),
+                               overhead_tokens=self._count_tokens(self._categorization_prompt(categories_list, [])),
+                               budget=self._batch_token_budget())
+        append_to_log(self.log_file, f"[GEMINI][INF][{datetime.today().strftime('%H:%M:%S')}][categorize_content_with_gemini] Packed {len(formatted_articles)} articles into {len(batches)} requests")
+        
+        for batch_number, formatted_batch in enumerate(batches, start=1):
+            append_to_log(self.log_file, f"[GEMINI][DBG][{datetime.today().strftime('%H:%M:%S')}][categorize_content_with_gemini] Processing batch {batch_number} with {len(formatted_batch)} articles")
+            prompt = self._categorization_prompt(categories_list, formatted_batch)
+            batch_urls = {article["url"] for article in formatted_batch}
             
-            # If we have many articles from a single source, process in batches
-            MAX_BATCH_SIZE = 10  # Maximum articles per batch
-            article_items = list(articles.items())
-            
-            for i in range(0, len(article_items), MAX_BATCH_SIZE):
-                batch = article_items[i:i+MAX_BATCH_SIZE]
-                append_to_log(self.log_file, f"[GEMINI][DBG][{datetime.today().strftime('%H:%M:%S')}][categorize_content_with_gemini] Processing batch {i//MAX_BATCH_SIZE + 1} with {len(batch)} articles")
-                
-                # Format the batch for the prompt
-                formatted_batch = []
-                for article_url, content in batch:
-                    title = content[0] if isinstance(content, list) and len(content) >= 1 else "Unknown Title"
-                    article_text = content[1] if isinstance(content, list) and len(content) >= 2 else str(content)
-                    # Truncate content to avoid exceeding token limits
-                    truncated_text = article_text[:1000] if len(article_text) > 1000 else article_text
-                    formatted_batch.append({
-                        "url": article_url,
-                        "title": title,
-                        "content_preview": truncated_text
-                    })
-                
-                prompt = f"""
-                Analyze these news articles and categorize each into ONE of the following categories:
-                {', '.join(categories_list)}
-                
-                For each article, determine ALL relevant categories (an article can belong to multiple categories).
-                
-                Articles to categorize:
-                {json.dumps(formatted_batch, indent=2)}
-                
-                Return ONLY a JSON object with this structure:
-                {{
-                    "categorized_articles": [
-                        {{
-                            "article_url": "[article URL]",
-                            "categories": ["Category1", "Category2", ...]
-                        }},
-                        ...
-                    ]
-                }}
-                
-                Ensure category names EXACTLY match the provided list. Only include categories from the list above.
-                """
+            try:
+                # The answer is constrained to the schema, so every category is one of categories_list
+                categorization_result = self.structured_request(prompt, categorized_articles_schema(categories_list))
+
+                # Process each categorized article
+                for article_data in categorization_result["categorized_articles"]:
+                    article_url = article_data["article_url"]
+
+                    # Skip if article_url is not in our batch
+                    if article_url not in batch_urls:
+                        continue
+
+                    # Add the article to each of its categories, under every source that listed it
+                    for category in article_data["categories"]:
+                        for base_url, article_content in sources_of[article_url]:
+                            categorized_content.setdefault(category, {}).setdefault(base_url, {})[article_url] = article_content
                 
-                try:
-                    response = self.openai_api_request(prompt)
-                    response_text = response.text
-                    
-                    # Clean up the response if it contains markdown formatting
-                    if "```json" in response_text:
-                        response_text = response_text.split("```json")[1].split("```")[0].strip()
-                    elif "```" in response_text:
-                        response_text = response_text.split("```")[1].split("```")[0].strip()
-                        
-                    # Parse the JSON response
-                    categorization_result = json.loads(response_text)
-                    
-                    # Process each categorized article
-                    for article_data in categorization_result.get("categorized_articles", []):
-                        article_url = article_data.get("article_url", "")
-                        article_categories = article_data.get("categories", [])
-                        
-                        # Skip if article_url is not found or no categories assigned
-                        if not article_url or not article_categories:
-                            continue
-                            
-                        # Find the article in our batch
-                        article_content = None
-                        for url, content in batch:
-                            if url == article_url:
-                                article_content = content
-                                break
-                                
-                        if article_content:
-                            # Add the article to each of its categories
-                            for category in article_categories:
-                                if category in categories_list:
-                                    # Initialize category if needed
-                                    if category not in categorized_content:
-                                        categorized_content[category] = {}
-                                    
-                                    # Initialize base_url in category if needed
-                                    if base_url not in categorized_content[category]:
-                                        categorized_content[category][base_url] = {}
-                                    
-                                    # Add article to the category
-                                    categorized_content[category][base_url][article_url] = article_content
-                    
-                except Exception as e:
-                    append_to_log(self.log_file, f"[GEMINI][ERR][{datetime.today().strftime('%H:%M:%S')}][categorize_content_with_gemini] Error processing batch: {str(e)}")
-                    continue
+            except Exception as e:
+                append_to_log(self.log_file, f"[GEMINI][ERR][{datetime.today().strftime('%H:%M:%S')}][categorize_content_with_gemini] Error processing batch: {str(e)}")
+                continue
         
         # Log categorization summary
         category_counts = {category: sum(len(urls) for urls in sources.values()) 
@@ -634,6 +753,8 @@ class GeminiAPI:
         links = {}
         lock = self.thread_lock
         result_grded_news = {}
+        # Every article is fetched and processed once per run, whichever categories link to it
+        url_registry = UrlRegistry()
         
         def process_lnks(category, sources):
             nonlocal links    
@@ -643,13 +764,19 @@ class GeminiAPI:
             for source in sources:
                 append_to_log(self.log_file, f"[GEMINI][INF][{datetime.today().strftime('%H:%M:%S')}][start_gemini_assistant] Getting news from {source}")
                 try:
-                    links[category][source] = get_links_and_content_from_page(source)
+                    links[category][source] = get_links_and_content_from_page(source, registry=url_registry)
                     append_to_log(self.log_file, f"[GEMINI][INF][{datetime.today().strftime('%H:%M:%S')}][start_gemini_assistant] Successfully extracted news from {source}")
                     append_to_log(self.log_file, f"[GEMINI][INF][{datetime.today().strftime('%H:%M:%S')}][start_gemini_assistant] *****************************************************")
                 except Exception as e:
                     append_to_log(self.log_file, f"[GEMINI][ERR][{datetime.today().strftime('%H:%M:%S')}][start_gemini_assistant] ************************ERROR************************")
                     append_to_log(self.log_file, f"[GEMINI][ERR][{datetime.today().strftime('%H:%M:%S')}][start_gemini_assistant] Failed to extract news from {source}: {e}")
                     append_to_log(self.log_file, f"[GEMINI][ERR][{datetime.today().strftime('%H:%M:%S')}][start_gemini_assistant] *****************************************************")
+            
+            # The same wire story is published by several sources, only one copy goes through relevance and Gemini
+            scraped_links = links[category]
+            links[category], duplicates = group_near_duplicates(links[category])
+            if duplicates:
+                append_to_log(self.log_file, f"[GEMINI][INF][{datetime.today().strftime('%H:%M:%S')}][start_gemini_assistant] Dropped {sum(len(urls) for urls in duplicates.values())} near-duplicate articles in {len(duplicates)} groups for {category}")
                     
             append_to_log(self.log_file, f"[GEMINI][INF][{datetime.today().strftime('%H:%M:%S')}][start_gemini_assistant] Before processing category: {links[category]} and length {len(str(links[category]))} and for category {category}")
             append_to_log(self.log_file, f"[GEMINI][INF][{datetime.today().strftime('%H:%M:%S')}][start_gemini_assistant] Thread ID for {category}: {thread.ident}")
@@ -657,34 +784,81 @@ class GeminiAPI:
             if category not in result_grded_news:
                 result_grded_news[category] = []
                 
+            # Claim the processing of every article; those another category of this run claimed first
+            # are not sent again, their categories are reused once published
+            new_links = {}
+            claimed_elsewhere = {}
+            owned_urls = []
+            for base_url, articles in links[category].items():
+                new_links[base_url] = {}
+                for article_url, content in articles.items():
+                    is_owner, future = url_registry.claim_processing(article_url)
+                    if is_owner:
+                        owned_urls.append(article_url)
+                        new_links[base_url][article_url] = content
+                    else:
+                        claimed_elsewhere[article_url] = future
+            if claimed_elsewhere:
+                append_to_log(self.log_file, f"[GEMINI][INF][{datetime.today().strftime('%H:%M:%S')}][start_gemini_assistant] Reusing results of {len(claimed_elsewhere)} articles processed by other categories of this run for {category}")
+                
             with lock:
                 append_to_log(self.log_file, f"[GEMINI][DBG][{datetime.today().strftime('%H:%M:%S')}][start_gemini_assistant] Thread {thread.ident} acquired lock for {category}")
                 
-                # Step 1: Check URL relevance using HuggingFace API
-                append_to_log(self.log_file, f"[GEMINI][INF][{datetime.today().strftime('%H:%M:%S')}][start_gemini_assistant] Checking URL content relevance for {category}")
-                relevance_results = check_url_content_relevance(links[category], threshold=0.7)
+                try:
+                    # Step 1: Check URL relevance using HuggingFace API
+                    append_to_log(self.log_file, f"[GEMINI][INF][{datetime.today().strftime('%H:%M:%S')}][start_gemini_assistant] Checking URL content relevance for {category}")
+                    relevance_results = check_url_content_relevance(new_links, threshold=0.7)
                 
-                # Filter out irrelevant content
-                filtered_links = {}
-                for base_url, articles in links[category].items():
-                    filtered_links[base_url] = {}
-                    for article_url, content in articles.items():
-                        if base_url in relevance_results and article_url in relevance_results[base_url] and relevance_results[base_url][article_url] == 1:
-                            filtered_links[base_url][article_url] = content
+                    # Filter out irrelevant content
+                    filtered_links = {}
+                    for base_url, articles in new_links.items():
+                        filtered_links[base_url] = {}
+                        for article_url, content in articles.items():
+                            if base_url in relevance_results and article_url in relevance_results[base_url] and relevance_results[base_url][article_url] == 1:
+                                filtered_links[base_url][article_url] = content
+                            else:
+                                url_registry.record_categories(article_url, [])
                             
-                append_to_log(self.log_file, f"[GEMINI][INF][{datetime.today().strftime('%H:%M:%S')}][start_gemini_assistant] Filtered {sum(len(articles) for articles in links[category].values()) - sum(len(articles) for articles in filtered_links.values())} irrelevant articles")
+                    append_to_log(self.log_file, f"[GEMINI][INF][{datetime.today().strftime('%H:%M:%S')}][start_gemini_assistant] Filtered {sum(len(articles) for articles in new_links.values()) - sum(len(articles) for articles in filtered_links.values())} irrelevant articles")
                 
-                # Step 2: Use Gemini API to categorize content instead of HuggingFace API
-                news_categories = self.get_categories()
-                append_to_log(self.log_file, f"[GEMINI][INF][{datetime.today().strftime('%H:%M:%S')}][start_gemini_assistant] Categorizing content for {category}")
-                categorized_content = self.categorize_content_with_gemini(filtered_links, news_categories)
+                    # Step 2: Use Gemini API to categorize content instead of HuggingFace API
+                    news_categories = self.get_categories()
+                    append_to_log(self.log_file, f"[GEMINI][INF][{datetime.today().strftime('%H:%M:%S')}][start_gemini_assistant] Categorizing content for {category}")
+                    # Articles filed under a clearly scoped section take its categories, only the rest go to Gemini
+                    categorized_content, ambiguous_links = self.categorize_by_section(filtered_links, news_categories)
+                    hinted_count = sum(len(articles) for articles in filtered_links.values()) - sum(len(articles) for articles in ambiguous_links.values())
+                    append_to_log(self.log_file, f"[GEMINI][INF][{datetime.today().strftime('%H:%M:%S')}][start_gemini_assistant] Categorized {hinted_count} articles from their section for {category}")
+                    for news_category, sources in self.categorize_content_with_gemini(ambiguous_links, news_categories).items():
+                        for base_url, articles in sources.items():
+                            categorized_content.setdefault(news_category, {}).setdefault(base_url, {}).update(articles)
                 
-                # Clean the categorized content to remove empty categories
-                categorized_content = self._clean_categorized_content(categorized_content)
-                append_to_log(self.log_file, f"[GEMINI][INF][{datetime.today().strftime('%H:%M:%S')}][start_gemini_assistant] Cleaned categorized content for {category}")
+                    # Publish the categories of every article this category processed
+                    article_categories = {}
+                    for news_category, sources in categorized_content.items():
+                        for articles in sources.values():
+                            for article_url in articles:
+                                article_categories.setdefault(article_url, []).append(news_category)
+                    for article_url, assigned_categories in article_categories.items():
+                        url_registry.record_categories(article_url, assigned_categories)
                 
-                # Convert categorized content to the expected format for result_grded_news
-                result_grded_news[category] = categorized_content
+                    # Clean the categorized content to remove empty categories
+                    categorized_content = self._clean_categorized_content(categorized_content)
+                    append_to_log(self.log_file, f"[GEMINI][INF][{datetime.today().strftime('%H:%M:%S')}][start_gemini_assistant] Cleaned categorized content for {category}")
+                
+                    # Convert categorized content to the expected format for result_grded_news
+                    result_grded_news[category] = categorized_content
+                
+                finally:
+                    # Owned articles without categories (irrelevant or failed) must not keep others waiting
+                    url_registry.release_processing(owned_urls)
+                
+            # Fan out the articles processed by other categories into this category's result,
+            # waiting outside the lock so the owners can finish
+            reused_categories = url_registry.wait_categories(claimed_elsewhere)
+            for base_url, articles in links[category].items():
+                for article_url, content in articles.items():
+                    for news_category in reused_categories.get(article_url, []):
+                        result_grded_news[category].setdefault(news_category, {}).setdefault(base_url, {})[article_url] = content
                 
             append_to_log(self.log_file, f"[GEMINI][INF][{datetime.today().strftime('%H:%M:%S')}][start_gemini_assistant] After processing category: {result_grded_news[category]} and length {len(str(result_grded_news[category])) if result_grded_news[category] else 0} and for category {category}")
             
@@ -693,10 +867,22 @@ class GeminiAPI:
                     # Using the date with time constraint for storage
                     gemini_links_db.insert_one({self.today_date: {category: result_grded_news[category]}})
                     append_to_log(self.log_file, f"[GEMINI][INF][{datetime.today().strftime('%H:%M:%S')}][start_gemini_assistant] Successfully inserted data for {category} into MongoDB with date-time constraint: {self.today_date}")
+                    if duplicates:
+                        # Other sources of every forwarded article: {representative_url: [duplicate_url, ...]}
+                        gemini_links_db.insert_one({"Duplicates": {self.today_date: {category: duplicates}}})
+                    # Only now are the scraped articles done; a failed insert leaves them for the next run
+                    mark_stored(scraped_links)
                 except Exception as e:
                     append_to_log(self.log_file, f"[GEMINI][ERR][{datetime.today().strftime('%H:%M:%S')}][start_gemini_assistant] Failed to insert data into MongoDB: {e}")
                     print(f"Failed to insert data into MongoDB: {e}")
                     
+        # Start the parser processes before any scraper thread exists
+        get_parse_pool().start()
+        # Hosts that failed in an earlier run get another chance
+        get_circuit_breaker().reset()
+        # Every pooled session of this run resolves each host once per DNS_TTL
+        dns_cache.install()
+        
         threads = []
         for category, sources in news_sources.items():
             thread = Thread(target=process_lnks, args=(category, sources))
@@ -708,6 +894,7 @@ class GeminiAPI:
             thread.join()
             
         append_to_log(self.log_file, f"[GEMINI][INF][{datetime.today().strftime('%H:%M:%S')}][start_gemini_assistant] News retrieval complete")
+        append_to_log(self.log_file, f"[GEMINI][INF][{datetime.today().strftime('%H:%M:%S')}][start_gemini_assistant] Gemini usage so far: {self.token_usage}")
         return None
 
     def grd_nws(self, links, category):
@@ -736,8 +923,11 @@ class GeminiAPI:
             append_to_log(self.log_file, f"[GEMINI][INF][{datetime.today().strftime('%H:%M:%S')}][grd_nws] News is present for category {category}")
             
             for top_url in list(links.keys()):
-                step = max(1, int(len(list(news[top_url].items()))/self.MAX_BATCHES))
-                link_items = [list(news[top_url].items())[j:j+step] for j in range(0, len(list(news[top_url].items())), step)]
+                # Batches are filled up to the token budget, measured on the previews the prompt sends
+                link_items = pack_batches(list(news[top_url].items()),
+                                          lambda item: self._count_tokens(str(self._preview_items([item]))),
+                                          overhead_tokens=self._count_tokens(self._grading_prompt([], list(categories.keys()))),
+                                          budget=self._batch_token_budget())
                 
                 append_to_log(self.log_file, f"[GEMINI][DBG][{datetime.today().strftime('%H:%M:%S')}][grd_nws] Processing {len(link_items)} batches for {category}")
                 
@@ -760,6 +950,34 @@ class GeminiAPI:
             
         return result_links
 
+    def _preview_items(self, link_item):
+        """Article items of a grd_nws batch with each content replaced by its summary-first preview."""
+        previews = []
+        for article_url, content in link_item:
+            if isinstance(content, list) and len(content) >= 2:
+                previews.append((article_url, [content[0], compress_article(content[1], estimate=self._count_tokens)]))
+            else:
+                previews.append((article_url, compress_article(content, estimate=self._count_tokens)))
+        return previews
+
+    def _grading_prompt(self, preview_items, categories_list):
+        """Prompt of _process_batch_with_retry for a batch of preview items."""
+        return f"""
+            Analyze these articles: {preview_items}
+            
+            I'll provide you with:
+            1. A list of article items where each item is a tuple of (article_url, [title, content])
+            2. A list of category names: {categories_list}
+            
+            Return a JSON object listing, for each category, the indices of the articles that belong to it.
+            For example: {{"categories": [{{"category_index": 2, "article_indices": [0, 3]}}, {{"category_index": 5, "article_indices": [1, 2]}}]}} means:
+            - Articles at indices 0 and 3 belong to the category at index 2
+            - Articles at indices 1 and 2 belong to the category at index 5
+            
+            An article can belong to multiple categories if relevant.
+            Only include articles that are relevant to at least one category.
+            """
+
     def _process_batch_with_retry(self, link_item, result_links, categories, top_url, retries_remaining):
         """
         Helper method to process a batch of links with retry logic and batch splitting.
@@ -795,71 +1013,23 @@ class GeminiAPI:
             # Create lists of categories and article items for index reference
             categories_list = list(categories.keys())
             
-            prompt = f"""
-            Analyze these articles: {link_item}
+            prompt = self._grading_prompt(self._preview_items(link_item), categories_list)
             
-            I'll provide you with:
-            1. A list of article items where each item is a tuple of (article_url, [title, content])
-            2. A list of category names: {categories_list}
-            
-            Return a dictionary mapping category indices to lists of article indices that belong to that category.
-            For example: {{2: [0, 3], 5: [1, 2]}} means:
-            - Articles at indices 0 and 3 belong to the category at index 2
-            - Articles at indices 1 and 2 belong to the category at index 5
-            
-            An article can belong to multiple categories if relevant.
-            Only include articles that are relevant to at least one category.
-            Format the response as a valid Python dictionary of indices.
-
-            Only return a python dict data structure, avoid ``` and word python in the string
-            """
-            
-            response = self.openai_api_request(prompt)
-            append_to_log(self.log_file, f"[GEMINI][DBG][{datetime.today().strftime('%H:%M:%S')}][grd_nws] Received grading response")
-            
-            # Log the raw response text for debugging
-            try:
-                append_to_log(self.log_file, f"[GEMINI][DBG][{datetime.today().strftime('%H:%M:%S')}][grd_nws] Raw response text: {response.text}")
-            except Exception as log_error:
-                append_to_log(self.log_file, f"[GEMINI][ERR][{datetime.today().strftime('%H:%M:%S')}][grd_nws] Failed to log response text: {str(log_error)}")
-                
-            # Parsing response
-            response_text = response.text
-            # Remove markdown formatting if present
-            if "```python" in response_text:
-                response_text = response_text.split("```python")[1].split("```")[0].strip()
-            elif "```" in response_text:
-                response_text = response_text.split("```")[1].split("```")[0].strip()
+            # The answer is constrained to the schema and gets one repair request if it is still
+            # invalid, so every index below refers to a category and an article of this batch
+            grading = self.structured_request(prompt, category_indices_schema(len(categories_list), len(link_item)))
+            append_to_log(self.log_file, f"[GEMINI][DBG][{datetime.today().strftime('%H:%M:%S')}][grd_nws] Received grading response: {grading}")
             
-            try:
-                index_mapping = eval(response_text)
-                append_to_log(self.log_file, f"[GEMINI][DBG][{datetime.today().strftime('%H:%M:%S')}][grd_nws] Successfully parsed index mapping")
-                
-                # Convert the index mapping to actual data
-                categorized_data = {}
-                for cat_idx, article_indices in index_mapping.items():
-                    if cat_idx < len(categories_list):
-                        cat_name = categories_list[cat_idx]
-                        if cat_name not in categorized_data:
-                            categorized_data[cat_name] = []
-                        
-                        for article_idx in article_indices:
-                            if article_idx < len(link_item):
-                                categorized_data[cat_name].append(link_item[article_idx])
-                
-                # Merge the categorized data into result_links
-                for cat, articles in categorized_data.items():
-                    if cat not in result_links:
-                        result_links[cat] = {}
-                    if articles:  # Only process if there are articles
-                        if top_url not in result_links[cat]:
-                            result_links[cat][top_url] = {}
-                        for article_url, content in articles:
-                            result_links[cat][top_url][article_url] = content
-            except Exception as parsing_error:
-                append_to_log(self.log_file, f"[GEMINI][ERR][{datetime.today().strftime('%H:%M:%S')}][grd_nws] Failed to parse response: {str(parsing_error)}")
-                raise parsing_error  # Re-raise to trigger the split and retry
+            # Merge the categorized articles into result_links
+            for assignment in grading["categories"]:
+                cat_name = categories_list[assignment["category_index"]]
+                for article_idx in assignment["article_indices"]:
+                    article_url, content = link_item[article_idx]
+                    result_links.setdefault(cat_name, {}).setdefault(top_url, {})[article_url] = content
                         
+        except StructuredOutputError as e:
+            # Smaller batches would not make a malformed answer valid, only multiply the calls
+            append_to_log(self.log_file, f"[GEMINI][ERR][{datetime.today().strftime('%H:%M:%S')}][grd_nws] Dropping batch of {len(link_item)} articles, answer still invalid after repair: {str(e)}")
         except Exception as e:
             append_to_log(self.log_file, f"[GEMINI][WARN][{datetime.today().strftime('%H:%M:%S')}][grd_nws] Error processing batch: {str(e)}. Retries remaining: {retries_remaining-1}")
             
@@ -911,16 +1081,16 @@ class GeminiAPI:
                     
                     append_to_log(self.log_file, f"[GEMINI][DBG][{datetime.today().strftime('%H:%M:%S')}][process_category] Processing summary for {article_url} with title: {title}")
                     
-                    prompt = f"Summarize the news from {article_url} with the title {title} and content {news_content} with at least 100 words"
-                    summary = self.openai_api_request(prompt)
+                    prompt = f"Summarize the news from {article_url} with the title {title} and content {news_content} with at least 100 words. Return the summary in the \"summary\" field."
+                    summary = self.structured_request(prompt, text_fields_schema("summary"))["summary"]
                     
-                    append_to_log(self.log_file, f"[GEMINI][DBG][{datetime.today().strftime('%H:%M:%S')}][process_category] Summary result: {summary.data[0].content[0].text.value}")
+                    append_to_log(self.log_file, f"[GEMINI][DBG][{datetime.today().strftime('%H:%M:%S')}][process_category] Summary result: {summary}")
                     
                     result[category][source].append({
                         "link": article_url,
                         "title": title,
                         "content": news_content,
-                        "summary": summary.data[0].content[0].text.value
+                        "summary": summary
                     })
                 except Exception as e:
                     append_to_log(self.log_file, f"[GEMINI][ERR][{datetime.today().strftime('%H:%M:%S')}][process_category] Error processing article {article_url}: {str(e)}")
@@ -1283,12 +1453,11 @@ class GeminiAPI:
                     Source: {source}
                     Content: {article_content[:4000]}  # Limiting content to avoid token limits
                     
-                    Provide only the summary with no additional text or explanations.
+                    Return the summary in the "summary" field, with no additional text or explanations.
                     """
                     
                     # Get summary from Gemini API
-                    response = self.openai_api_request(prompt)
-                    summary = response.text.strip()
+                    summary = self.structured_request(prompt, text_fields_schema("summary"))["summary"].strip()
                     
                     # Log successful summary generation
                     append_to_log(self.log_file, f"[GEMINI][DBG][{datetime.today().strftime('%H:%M:%S')}][_summarize_articles_with_gemini] Generated summary for article: {article_url}")
@@ -1389,17 +1558,22 @@ class GeminiAPI:
                 
                 Write about 600-800 words in a journalistic style that gives a complete overview of the 
                 {category} news during this period. Use a structure with clear paragraphs and logical flow.
+                
+                Return the synthesis in the "summary" field and a catchy, informative title for this
+                {category} section, under 10 words, in the "title" field.
                 """
                 
                 try:
-                    # Generate the synthesized summary from existing article summaries
-                    synthesis_response = self.openai_api_request(synthesis_prompt)
-                    category_summary = synthesis_response.text.strip()
+                    # Generate the synthesized summary and the section title from existing article summaries in one request
+                    synthesis = self.structured_request(synthesis_prompt, text_fields_schema("title", "summary"))
+                    category_summary = synthesis["summary"].strip()
+                    category_title = synthesis["title"].strip()
                     append_to_log(self.log_file, f"[GEMINI][INF][{datetime.today().strftime('%H:%M:%S')}][_generate_overall_summary] Generated synthesized summary of {len(category_summary.split())} words for category: {category}")
                 except Exception as e:
                     append_to_log(self.log_file, f"[GEMINI][ERR][{datetime.today().strftime('%H:%M:%S')}][_generate_overall_summary] Error generating synthesized summary: {str(e)}")
                     # Fall back to listing approach
                     category_summary = f"Error generating synthesized summary for {category}. Key stories include: " + ", ".join([article["title"] for article in all_source_articles[:10]])
+                    category_title = f"{category} News Roundup"
             else:
                 # If no existing summaries, create a summary from the article titles and sources
                 fallback_prompt = f"""
@@ -1410,28 +1584,19 @@ class GeminiAPI:
                 Write about 400-500 words covering the key stories. Focus on extracting meaning and
                 connections between these stories to create a coherent narrative of {category} news
                 for {date} during the {time_period} period.
+                
+                Return the summary in the "summary" field and a catchy, informative title for this
+                {category} section, under 10 words, in the "title" field.
                 """
                 
                 try:
-                    fallback_response = self.openai_api_request(fallback_prompt)
-                    category_summary = fallback_response.text.strip()
+                    fallback = self.structured_request(fallback_prompt, text_fields_schema("title", "summary"))
+                    category_summary = fallback["summary"].strip()
+                    category_title = fallback["title"].strip()
                 except Exception as e:
                     append_to_log(self.log_file, f"[GEMINI][ERR][{datetime.today().strftime('%H:%M:%S')}][_generate_overall_summary] Error generating fallback summary: {str(e)}")
                     category_summary = f"Unable to generate summary for {category}."
-            
-            # Create an engaging title for this category
-            title_prompt = f"""
-            Create a catchy, informative title for a news summary section about {category}.
-            The title should be engaging and relevant to today's {category} news ({date}).
-            Keep it under 10 words. Only return the title text, nothing else.
-            """
-            
-            try:
-                title_response = self.openai_api_request(title_prompt)
-                category_title = title_response.text.strip()
-            except Exception as e:
-                append_to_log(self.log_file, f"[GEMINI][ERR][{datetime.today().strftime('%H:%M:%S')}][_generate_overall_summary] Error generating title: {str(e)}")
-                category_title = f"{category} News Roundup"
+                    category_title = f"{category} News Roundup"
             
             # Store title and combined summary
             all_category_summaries[category] = {
@@ -0,0 +1,75 @@
+import threading
+from typing import Any, Dict, Optional
+
+import google.generativeai as google_genai
+
+try:
+    # Local Gemini tokenizer of newer google-genai releases (needs sentencepiece)
+    from google.genai.local_tokenizer import LocalTokenizer
+except ImportError:
+    LocalTokenizer = None
+
+try:
+    from .llm_gateway import estimate_tokens as approximate_tokens
+except ImportError:
+    from llm_gateway import estimate_tokens as approximate_tokens
+
+GEMINI_MODEL = "gemini-2.0-flash-lite"
+
+_model_info: Dict[str, Any] = {}
+_tokenizers: Dict[str, Any] = {}
+_lock = threading.Lock()
+
+
+def get_model_info(model_name: str = GEMINI_MODEL) -> Optional[Any]:
+    """
+    Return the model metadata (input_token_limit, output_token_limit, ...) of model_name,
+    fetched once per process. None if it could not be fetched; it is not retried.
+    """
+    with _lock:
+        if model_name not in _model_info:
+            try:
+                _model_info[model_name] = google_genai.get_model(f"models/{model_name}")
+            except Exception as e:
+                print(f"Could not fetch metadata of {model_name}: {str(e)}")
+                _model_info[model_name] = None
+        return _model_info[model_name]
+
+
+def get_tokenizer(model_name: str = GEMINI_MODEL) -> Optional[Any]:
+    """Return the cached local tokenizer of model_name, None if none is available."""
+    if LocalTokenizer is None:
+        return None
+    with _lock:
+        if model_name not in _tokenizers:
+            try:
+                _tokenizers[model_name] = LocalTokenizer(model_name=model_name)
+            except Exception as e:
+                print(f"No local tokenizer for {model_name}, estimating tokens: {str(e)}")
+                _tokenizers[model_name] = None
+        return _tokenizers[model_name]
+
+
+def estimate_tokens(text: str, model_name: str = GEMINI_MODEL) -> int:
+    """Count the tokens of text without a request, exactly with a local tokenizer, else approximately."""
+    tokenizer = get_tokenizer(model_name)
+    if tokenizer is not None:
+        try:
+            return tokenizer.count_tokens(text).total_tokens
+        except Exception:
+            pass
+    return approximate_tokens(text)
+
+
+def get_usage(response: Any) -> Dict[str, int]:
+    """
+    Token counts billed for a generate_content response, from its usage metadata.
+
+    Returns:
+        dict: {"prompt_tokens", "output_tokens", "total_tokens"}, 0 where the response has no count
+    """
+    usage = getattr(response, "usage_metadata", None)
+    prompt_tokens = getattr(usage, "prompt_token_count", None) or 0
+    output_tokens = getattr(usage, "candidates_token_count", None) or 0
+    total_tokens = getattr(usage, "total_token_count", None) or prompt_tokens + output_tokens
+    return {"prompt_tokens": prompt_tokens, "output_tokens": output_tokens, "total_tokens": total_tokens}
@@ -0,0 +1,73 @@
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+# Newest article seen per section page, kept next to the scripts
+HIGH_WATER_MARKS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'high_water_marks.json')
+
+
+def _naive(value: datetime) -> datetime:
+    return value.replace(tzinfo=None)
+
+
+class HighWaterMarks:
+    """
+    Per-source high-water marks: the publication time and URL of the newest article found
+    on a section page in earlier runs. Section pages list articles newest-first, so links
+    at or below the mark were covered by an earlier run.
+    """
+
+    def __init__(self, marks_file: str = HIGH_WATER_MARKS_FILE):
+        self.marks_file = marks_file
+        self._lock = threading.Lock()
+        try:
+            with open(self.marks_file, 'r', encoding='utf-8') as file:
+                self.marks: Dict[str, Dict[str, str]] = json.load(file)
+        except (OSError, ValueError):
+            self.marks = {}
+
+    def get(self, source: str) -> Optional[Dict[str, str]]:
+        """Return {"pub_date": ISO string, "url": article URL} for source, None before its first run."""
+        with self._lock:
+            mark = self.marks.get(source)
+        return dict(mark) if mark else None
+
+    def is_below(self, source: str, url: str, pub_date: Optional[datetime]) -> bool:
+        """True if the article is the marked one or not newer than it."""
+        mark = self.get(source)
+        if mark is None:
+            return False
+        if url == mark["url"]:
+            return True
+        return pub_date is not None and _naive(pub_date) <= datetime.fromisoformat(mark["pub_date"])
+
+    def advance(self, source: str, url: str, pub_date: datetime) -> None:
+        """Move the mark of source to the article if it is newer, and persist the marks."""
+        pub_date = _naive(pub_date)
+        with self._lock:
+            mark = self.marks.get(source)
+            if mark and datetime.fromisoformat(mark["pub_date"]) >= pub_date:
+                return
+            self.marks[source] = {"pub_date": pub_date.isoformat(), "url": url}
+            try:
+                tmp_path = f"{self.marks_file}.{threading.get_ident()}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as file:
+                    json.dump(self.marks, file)
+                os.replace(tmp_path, self.marks_file)
+            except OSError as e:
+                print(f"Failed to save high-water marks: {str(e)}")
+
+
+_marks = None
+_marks_lock = threading.Lock()
+
+
+def get_high_water_marks() -> HighWaterMarks:
+    """Return the shared high-water marks."""
+    global _marks
+    with _marks_lock:
+        if _marks is None:
+            _marks = HighWaterMarks()
+        return _marks
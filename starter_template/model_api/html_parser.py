@@ -0,0 +1,127 @@
+import os
+import threading
+from typing import Dict, List, Optional
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401  (only needed as a BeautifulSoup tree builder)
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxHTMLParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser as SelectolaxHTMLParser
+    except ImportError:
+        SelectolaxHTMLParser = None
+
+# Parser backend: 'auto' picks the fastest installed one, 'selectolax', 'lxml' or 'html.parser' force one
+HTML_PARSER_BACKEND = os.getenv('SCRAPER_HTML_PARSER', 'auto')
+
+# Partial parsing: only the matching elements (and their children) are turned into a tree
+LINKS_ONLY = SoupStrainer('a', href=True)
+DATE_METADATA_ONLY = SoupStrainer(['script', 'meta', 'time'])
+
+
+class SoupParser:
+    """
+    BeautifulSoup with a given tree builder. Every backend returns BeautifulSoup trees
+    from soup() so the existing extraction code keeps working unchanged.
+    """
+
+    name = 'html.parser'
+
+    def __init__(self, builder: str = 'html.parser'):
+        self.builder = builder
+        self.name = builder
+
+    def soup(self, markup: str, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+        """Parse markup, restricted to the parse_only strainer if given."""
+        return BeautifulSoup(markup, self.builder, parse_only=parse_only)
+
+    def hrefs(self, markup: str) -> List[str]:
+        """Return the raw href of every <a href> in markup."""
+        return [a['href'] for a in self.soup(markup, LINKS_ONLY).find_all('a', href=True)]
+
+    def select_attrs(self, markup: str, selector: str, parse_only: Optional[SoupStrainer] = None) -> List[Dict[str, str]]:
+        """Return the attributes of every element matching the CSS selector."""
+        return [
+            {key: ' '.join(value) if isinstance(value, list) else value for key, value in tag.attrs.items()}
+            for tag in self.soup(markup, parse_only).select(selector)
+        ]
+
+
+class SelectolaxParser(SoupParser):
+    """
+    selectolax (lexbor, C) for link and attribute extraction, which is where most of
+    the parsing time goes on section and search pages. Full trees still come from BeautifulSoup
+    (lxml builder when installed) because title/body/date extraction use its API.
+    """
+
+    def __init__(self):
+        super().__init__('lxml' if LXML_AVAILABLE else 'html.parser')
+        self.name = 'selectolax'
+
+    def hrefs(self, markup: str) -> List[str]:
+        return [node.attributes['href'] for node in SelectolaxHTMLParser(markup).css('a[href]') if node.attributes.get('href')]
+
+    def select_attrs(self, markup: str, selector: str, parse_only: Optional[SoupStrainer] = None) -> List[Dict[str, str]]:
+        return [
+            {key: value for key, value in node.attributes.items() if value is not None}
+            for node in SelectolaxHTMLParser(markup).css(selector)
+        ]
+
+
+def available_backends() -> List[str]:
+    """Installed backends, fastest first."""
+    backends = []
+    if SelectolaxHTMLParser is not None:
+        backends.append('selectolax')
+    if LXML_AVAILABLE:
+        backends.append('lxml')
+    backends.append('html.parser')
+    return backends
+
+
+def build_parser(backend: str) -> SoupParser:
+    """Create the parser for a backend name, falling back to html.parser if it is not installed."""
+    if backend == 'auto':
+        backend = available_backends()[0]
+    if backend == 'selectolax' and SelectolaxHTMLParser is not None:
+        return SelectolaxParser()
+    if backend == 'lxml' and LXML_AVAILABLE:
+        return SoupParser('lxml')
+    if backend not in ('html.parser', 'lxml', 'selectolax'):
+        print(f"Unknown HTML parser backend '{backend}', using html.parser")
+    return SoupParser('html.parser')
+
+
+_parser = None
+_parser_lock = threading.Lock()
+
+
+def get_html_parser() -> SoupParser:
+    """Return the shared parser for HTML_PARSER_BACKEND."""
+    global _parser
+    with _parser_lock:
+        if _parser is None:
+            _parser = build_parser(HTML_PARSER_BACKEND)
+        return _parser
+
+
+def make_soup(markup: str, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+    """Parse markup into a BeautifulSoup tree with the configured backend."""
+    return get_html_parser().soup(markup, parse_only)
+
+
+def extract_hrefs(markup: str) -> List[str]:
+    """Return the raw href of every link in markup with the configured backend."""
+    return get_html_parser().hrefs(markup)
+
+
+def select_attrs(markup: str, selector: str, parse_only: Optional[SoupStrainer] = None) -> List[Dict[str, str]]:
+    """Return the attributes of every element matching selector with the configured backend."""
+    return get_html_parser().select_attrs(markup, selector, parse_only)
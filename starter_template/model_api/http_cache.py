@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Cached pages live next to the scripts unless overridden, entries not revalidated for
+# CACHE_MAX_AGE_DAYS are pruned the first time the cache is opened in a process.
+CACHE_DIR = os.getenv('SCRAPER_HTTP_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'http_cache'))
+CACHE_MAX_AGE_DAYS = 7
+
+# Response headers kept with the cached body
+STORED_HEADERS = ['ETag', 'Last-Modified', 'Content-Type']
+
+
+def _atomic_write(path: str, data: bytes) -> None:
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as file:
+        file.write(data)
+    os.replace(tmp_path, path)
+
+
+class HttpCache:
+    """
+    On-disk response cache keyed by URL with ETag / Last-Modified revalidation.
+
+    Every entry is a body file plus a JSON metadata file. Before a request the caller adds
+    conditional_headers(url); handle(url, response) then stores fresh 200 responses and turns
+    a 304 into the cached 200 response (marked with response.from_cache = True). Values derived
+    from the body (parsed article, extracted links) can be stored with put_derived and are
+    dropped whenever the body changes, so unchanged pages skip parsing as well.
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR, max_age_days: int = CACHE_MAX_AGE_DAYS):
+        self.cache_dir = cache_dir
+        self.max_age_days = max_age_days
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.prune()
+
+    def _paths(self, url: str) -> Dict[str, str]:
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.cache_dir, key[:2], key)
+        return {"dir": os.path.dirname(base), "meta": f"{base}.json", "body": f"{base}.body"}
+
+    def _read_meta(self, url: str) -> Optional[Dict[str, Any]]:
+        paths = self._paths(url)
+        if not (os.path.exists(paths["meta"]) and os.path.exists(paths["body"])):
+            return None
+        try:
+            with open(paths["meta"], 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, url: str, meta: Dict[str, Any]) -> None:
+        _atomic_write(self._paths(url)["meta"], json.dumps(meta).encode('utf-8'))
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """Return If-None-Match / If-Modified-Since headers for a cached URL, or an empty dict."""
+        meta = self._read_meta(url)
+        if not meta:
+            return {}
+        headers = {}
+        stored = CaseInsensitiveDict(meta.get("headers", {}))
+        if stored.get('ETag'):
+            headers['If-None-Match'] = stored['ETag']
+        if stored.get('Last-Modified'):
+            headers['If-Modified-Since'] = stored['Last-Modified']
+        return headers
+
+    def store(self, url: str, response: requests.Response) -> None:
+        """Store a complete 200 response if it carries a validator (ETag or Last-Modified)."""
+        if response.status_code != 200 or getattr(response, "truncated", False):
+            return
+        if not (response.headers.get('ETag') or response.headers.get('Last-Modified')):
+            return
+        paths = self._paths(url)
+        os.makedirs(paths["dir"], exist_ok=True)
+        _atomic_write(paths["body"], response.content)
+        self._write_meta(url, {
+            "url": url,
+            "headers": {name: response.headers[name] for name in STORED_HEADERS if response.headers.get(name)},
+            "encoding": response.encoding,
+            "validated_at": time.time(),
+            "derived": {}
+        })
+
+    def load(self, url: str) -> Optional[requests.Response]:
+        """Rebuild the cached 200 response for url, or None if it is not cached."""
+        meta = self._read_meta(url)
+        if not meta:
+            return None
+        try:
+            with open(self._paths(url)["body"], 'rb') as file:
+                body = file.read()
+        except OSError:
+            return None
+        response = requests.Response()
+        response.status_code = 200
+        response._content = body
+        response.headers = CaseInsensitiveDict(meta.get("headers", {}))
+        response.encoding = meta.get("encoding")
+        response.url = url
+        response.from_cache = True
+        return response
+
+    def handle(self, url: str, response: requests.Response) -> requests.Response:
+        """
+        Process the response of a (possibly conditional) request.
+
+        Returns:
+            requests.Response: The cached response for a 304, otherwise the original response
+        """
+        if response.status_code == 304:
+            cached = self.load(url)
+            if cached is None:
+                return response
+            meta = self._read_meta(url)
+            if meta:
+                meta["validated_at"] = time.time()
+                self._write_meta(url, meta)
+            return cached
+        self.store(url, response)
+        return response
+
+    def get_derived(self, url: str, name: str) -> Any:
+        """Return a value previously derived from the cached body of url, or None."""
+        meta = self._read_meta(url)
+        if not meta:
+            return None
+        return meta.get("derived", {}).get(name)
+
+    def put_derived(self, url: str, name: str, value: Any) -> None:
+        """Attach a JSON-serialisable value derived from the cached body of url."""
+        meta = self._read_meta(url)
+        if not meta:
+            return
+        meta.setdefault("derived", {})[name] = value
+        self._write_meta(url, meta)
+
+    def prune(self) -> None:
+        """Delete entries that have not been revalidated within max_age_days."""
+        cutoff = time.time() - self.max_age_days * 86400
+        for root, _, files in os.walk(self.cache_dir):
+            for filename in files:
+                if not filename.endswith('.json'):
+                    continue
+                # The metadata file is rewritten on every revalidation, so its mtime is the last use
+                meta_path = os.path.join(root, filename)
+                try:
+                    if os.path.getmtime(meta_path) >= cutoff:
+                        continue
+                    os.remove(meta_path)
+                    body_path = meta_path[:-len('.json')] + '.body'
+                    if os.path.exists(body_path):
+                        os.remove(body_path)
+                except OSError:
+                    continue
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_http_cache() -> HttpCache:
+    """Return the shared on-disk HTTP cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = HttpCache()
+        return _cache
@@ -0,0 +1,109 @@
+import os
+import threading
+from typing import Callable, Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Keep-alive connections kept per host. POOL_MAXSIZE should be at least the crawl engine's
+# per-host concurrency so concurrent requests to one host never open throwaway connections.
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 16
+
+# Transport-level retries for connection errors and transient 5xx answers.
+# 429/503 are left to the politeness scheduler so Retry-After is honoured per host.
+RETRY_TOTAL = 2
+RETRY_BACKOFF_FACTOR = 0.5
+RETRY_STATUS_FORCELIST = [500, 502, 504]
+
+# Hard cap on the body of any single response read with read_body, larger bodies are cut off
+MAX_RESPONSE_BYTES = int(os.getenv('SCRAPER_MAX_RESPONSE_BYTES', 5 * 1024 * 1024))
+STREAM_CHUNK_SIZE = 16 * 1024
+
+
+def build_session() -> requests.Session:
+    """Create a keep-alive session with a tuned connection pool and retry adapter."""
+    session = requests.Session()
+    retry_strategy = Retry(
+        total=RETRY_TOTAL,
+        status_forcelist=RETRY_STATUS_FORCELIST,
+        allowed_methods=["GET", "HEAD"],
+        backoff_factor=RETRY_BACKOFF_FACTOR,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=retry_strategy)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def read_body(response: requests.Response, max_bytes: int = MAX_RESPONSE_BYTES,
+              stop: Optional[Callable[[bytearray], bool]] = None) -> requests.Response:
+    """
+    Download the body of a response requested with stream=True, at most max_bytes of it.
+
+    stop is called with the body read so far (a bytearray it must not modify) after every
+    chunk; returning True ends the download early. The body is then available as usual through response.content / .text,
+    and response.truncated tells whether the download was cut off (cap or stop), in which
+    case the connection is closed rather than drained.
+    """
+    body = bytearray()
+    truncated = False
+    for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+        body.extend(chunk)
+        if len(body) >= max_bytes:
+            del body[max_bytes:]
+            truncated = True
+            break
+        if stop is not None and stop(body):
+            truncated = True
+            break
+    if truncated:
+        response.close()
+    response._content = bytes(body)
+    response._content_consumed = True
+    response.truncated = truncated
+    return response
+
+
+class SessionPool:
+    """
+    One long-lived requests.Session per host, shared by every scraper thread.
+    Reusing the session keeps TCP/TLS connections (and cookies) alive between requests.
+    """
+
+    def __init__(self):
+        self._sessions: Dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+
+    def get_session(self, url: str) -> requests.Session:
+        """Return the shared session for the host of url, creating it on first use."""
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = build_session()
+                self._sessions[host] = session
+            return session
+
+    def close_all(self) -> None:
+        """Close every pooled session and drop its connections."""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+_pool = SessionPool()
+
+
+def get_session(url: str) -> requests.Session:
+    """Return the shared keep-alive session for the host of url."""
+    return _pool.get_session(url)
+
+
+def close_sessions() -> None:
+    """Close all shared sessions, e.g. at the end of a scheduled run."""
+    _pool.close_all()
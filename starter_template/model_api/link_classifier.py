@@ -0,0 +1,204 @@
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, Tuple
+from urllib.parse import urlparse, urlunparse
+
+# Links kept per section page after scoring, and the minimum score for a link to count as an article
+MAX_LINKS_PER_SOURCE = 40
+MIN_ARTICLE_SCORE = 2
+
+# Learned per-domain URL templates are kept next to the scripts
+PATTERNS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'link_patterns.json')
+# Observations needed before a learned template changes the score
+MIN_PATTERN_OBSERVATIONS = 3
+# Learned counts halve every PATTERN_HALF_LIFE_DAYS without new observations, so a template
+# penalized after a few misses is tried again later instead of being dropped for good
+PATTERN_HALF_LIFE_DAYS = 7
+
+# Path segments that mark navigation, account, listing or legal pages rather than articles
+NON_ARTICLE_SEGMENTS = {
+    'tag', 'tags', 'topic', 'topics', 'author', 'authors', 'login', 'signin', 'sign-in', 'signup', 'register',
+    'subscribe', 'subscription', 'account', 'profile', 'search', 'privacy', 'privacy-policy', 'terms',
+    'terms-of-use', 'terms-and-conditions', 'about', 'about-us', 'contact', 'contact-us', 'careers', 'advertise',
+    'newsletter', 'newsletters', 'rss', 'feed', 'feeds', 'sitemap', 'archive', 'archives', 'page', 'photos',
+    'gallery', 'podcast', 'podcasts', 'epaper', 'e-paper', 'apps', 'help', 'faq', 'cookie-policy', 'disclaimer'
+}
+
+DATE_IN_PATH = re.compile(r'/(19|20)\d{2}[/-](0?[1-9]|1[0-2])([/-](0?[1-9]|[12]\d|3[01]))?(/|$)|(19|20)\d{2}(0[1-9]|1[0-2])(0[1-9]|[12]\d|3[01])')
+NUMERIC_ID = re.compile(r'\d{5,}')
+ARTICLE_EXTENSION = re.compile(r'\.(html?|cms|ece|php|aspx)$')
+PAGINATION = re.compile(r'([?&](page|p)=\d+)|(/page/\d+)')
+
+
+def _host(url: str) -> str:
+    host = urlparse(url).netloc.lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def _same_site(host: str, section_host: str) -> bool:
+    return host == section_host or host.endswith('.' + section_host) or section_host.endswith('.' + host)
+
+
+def _segments(path: str) -> List[str]:
+    return [segment for segment in path.split('/') if segment]
+
+
+def _is_slug(segment: str) -> bool:
+    base = ARTICLE_EXTENSION.sub('', segment)
+    return len([word for word in re.split(r'[-_]', base) if word]) >= 3
+
+
+def normalize_link(url: str) -> str:
+    """Drop the fragment so anchors on the same page collapse into one link."""
+    parsed = urlparse(url)
+    return urlunparse(parsed._replace(fragment=''))
+
+
+def url_template(url: str) -> str:
+    """
+    Reduce a URL to a per-domain shape, e.g.
+    https://www.ndtv.com/india-news/some-long-headline-1234567 -> ndtv.com/india-news/{slug}
+    """
+    parts = []
+    for segment in _segments(urlparse(url).path):
+        extension = ARTICLE_EXTENSION.search(segment)
+        suffix = extension.group(0) if extension else ''
+        if segment.isdigit():
+            parts.append('{num}')
+        elif _is_slug(segment):
+            parts.append('{slug}' + suffix)
+        elif NUMERIC_ID.search(segment):
+            parts.append('{id}' + suffix)
+        else:
+            parts.append(segment.lower())
+    return _host(url) + '/' + '/'.join(parts)
+
+
+def _decayed(stats: Dict[str, float], now: float) -> Tuple[float, float]:
+    # Entries saved before decay was introduced have no 'updated' and count as current
+    # Whole days, so observations of the same day count in full
+    age_days = max(0.0, now - stats.get('updated', now)) // 86400
+    factor = 0.5 ** (age_days / PATTERN_HALF_LIFE_DAYS)
+    return stats['hits'] * factor, stats['misses'] * factor
+
+
+class LinkClassifier:
+    """
+    Scores links found on a section page by how likely they are to be articles.
+
+    Heuristics: same-site check, navigation/listing path segments, path depth, slug,
+    date and numeric-id patterns. On top of that, per-domain URL templates are learned
+    from scrape outcomes: templates that produced articles get a bonus, templates that
+    only ever produced non-article pages get a penalty. Learned counts decay over time.
+    """
+
+    def __init__(self, patterns_file: str = PATTERNS_FILE):
+        self.patterns_file = patterns_file
+        self._lock = threading.Lock()
+        self.patterns: Dict[str, Dict[str, float]] = {}
+        try:
+            with open(self.patterns_file, 'r', encoding='utf-8') as file:
+                self.patterns = json.load(file)
+        except (OSError, ValueError):
+            self.patterns = {}
+
+    def score(self, url: str, section_url: str) -> float:
+        """
+        Score a link found on section_url. Higher means more likely an article.
+
+        Returns:
+            float: The score, float('-inf') for links that can never be articles
+        """
+        parsed = urlparse(url)
+        section = urlparse(section_url)
+        host, section_host = _host(url), _host(section_url)
+        if not _same_site(host, section_host):
+            return float('-inf')
+
+        segments = _segments(parsed.path)
+        section_segments = _segments(section.path)
+        if not segments or [s.lower() for s in segments] == [s.lower() for s in section_segments]:
+            return float('-inf')
+        if any(segment.lower() in NON_ARTICLE_SEGMENTS for segment in segments):
+            return float('-inf')
+
+        score = 0.0
+        if len(segments) >= 2:
+            score += 1
+        if _is_slug(segments[-1]):
+            score += 2
+        if DATE_IN_PATH.search(parsed.path):
+            score += 2
+        if NUMERIC_ID.search(segments[-1]):
+            score += 1
+        if ARTICLE_EXTENSION.search(segments[-1]):
+            score += 1
+        if section_segments and parsed.path.lower().startswith(section.path.lower().rstrip('/') + '/'):
+            score += 1
+        if len(segments) == 1 and not _is_slug(segments[0]):
+            score -= 2
+        if PAGINATION.search(url):
+            score -= 3
+
+        with self._lock:
+            stats = self.patterns.get(url_template(url))
+        if stats:
+            hits, misses = _decayed(stats, time.time())
+            if hits + misses >= MIN_PATTERN_OBSERVATIONS:
+                if stats['hits'] == 0:
+                    score -= 3
+                elif hits >= misses:
+                    score += 2
+        return score
+
+    def select(self, links: Iterable[str], section_url: str, max_links: int = MAX_LINKS_PER_SOURCE) -> List[str]:
+        """
+        Keep the likely article links of a section page, the best max_links of them in page order.
+        """
+        unique_links = list(dict.fromkeys(normalize_link(link) for link in links))
+        scored = [(self.score(link, section_url), position, link) for position, link in enumerate(unique_links)]
+        kept = [item for item in scored if item[0] >= MIN_ARTICLE_SCORE]
+        kept.sort(key=lambda item: (-item[0], item[1]))
+        return [link for _, _, link in sorted(kept[:max_links], key=lambda item: item[1])]
+
+    def learn(self, outcomes: Iterable[Tuple[str, bool]]) -> None:
+        """
+        Update the per-domain templates from scrape outcomes and persist them.
+
+        Args:
+            outcomes (Iterable[Tuple[str, bool]]): (url, is_article) pairs, only for pages that
+                clearly were or were not articles
+        """
+        outcomes = list(outcomes)
+        if not outcomes:
+            return
+        now = time.time()
+        with self._lock:
+            for url, is_article in outcomes:
+                stats = self.patterns.setdefault(url_template(url), {'hits': 0, 'misses': 0})
+                stats['hits'], stats['misses'] = _decayed(stats, now)
+                stats['hits' if is_article else 'misses'] += 1
+                stats['updated'] = now
+            try:
+                tmp_path = f"{self.patterns_file}.{threading.get_ident()}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as file:
+                    json.dump(self.patterns, file)
+                os.replace(tmp_path, self.patterns_file)
+            except OSError as e:
+                print(f"Failed to save link patterns: {str(e)}")
+
+
+_classifier = None
+_classifier_lock = threading.Lock()
+
+
+def get_link_classifier() -> LinkClassifier:
+    """Return the shared link classifier."""
+    global _classifier
+    with _classifier_lock:
+        if _classifier is None:
+            _classifier = LinkClassifier()
+        return _classifier
@@ -0,0 +1,176 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Cached responses live next to the scripts unless overridden. Entries unused for
+# LLM_CACHE_TTL_DAYS expire, and beyond LLM_CACHE_MAX_ENTRIES the least recently used are evicted.
+LLM_CACHE_DIR = os.getenv('LLM_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'llm_cache'))
+LLM_CACHE_TTL_DAYS = float(os.getenv('LLM_CACHE_TTL_DAYS', 7))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv('LLM_CACHE_MAX_ENTRIES', 20000))
+
+# Eviction runs when the cache is opened and then every PRUNE_EVERY stored responses
+PRUNE_EVERY = 500
+
+# Finish reasons of complete answers; truncated or blocked answers are not cached
+CACHEABLE_FINISH_REASONS = {None, 'STOP', 'FinishReason.STOP', '1'}
+
+
+def _atomic_write(path: str, data: bytes) -> None:
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as file:
+        file.write(data)
+    os.replace(tmp_path, path)
+
+
+def cache_key(model: str, prompt: str, config: Optional[Dict[str, Any]] = None) -> str:
+    """Content address of a request: SHA-256 over model, prompt and generation config."""
+    payload = json.dumps({"model": model, "prompt": prompt, "config": config or {}}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class CachedResponse:
+    """Stand-in for a generate_content response served from the cache (.text, .candidates, no usage)."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.candidates = [type('obj', (object,), {'finish_reason': 'STOP'})]
+        self.usage_metadata = None
+        self.from_cache = True
+
+
+class LLMCache:
+    """
+    On-disk, content-addressed cache of LLM responses.
+
+    Every entry is a JSON file named after cache_key(model, prompt, config) holding the response
+    text; its mtime is refreshed on every hit, so it doubles as the last-use time for TTL and
+    LRU eviction. generate() puts the cache in front of a generate_content call and only keeps
+    answers that are complete and pass the caller's validation.
+    """
+
+    def __init__(self, cache_dir: str = LLM_CACHE_DIR, ttl_days: float = LLM_CACHE_TTL_DAYS,
+                 max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        self.cache_dir = cache_dir
+        self.ttl_days = ttl_days
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._stores = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.prune()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, model: str, prompt: str, config: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """Return the cached response text of the request, or None."""
+        path = self._path(cache_key(model, prompt, config))
+        try:
+            if os.path.getmtime(path) < time.time() - self.ttl_days * 86400:
+                return None
+            with open(path, 'r', encoding='utf-8') as file:
+                text = json.load(file)["text"]
+            os.utime(path)
+            return text
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def put(self, model: str, prompt: str, text: str, config: Optional[Dict[str, Any]] = None) -> None:
+        """Store the response text of the request."""
+        path = self._path(cache_key(model, prompt, config))
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            _atomic_write(path, json.dumps({"model": model, "text": text, "stored_at": time.time()}).encode('utf-8'))
+        except OSError as e:
+            print(f"Failed to cache LLM response: {str(e)}")
+            return
+        with self._lock:
+            self._stores += 1
+            prune = self._stores % PRUNE_EVERY == 0
+        if prune:
+            self.prune()
+
+    def delete(self, model: str, prompt: str, config: Optional[Dict[str, Any]] = None) -> None:
+        """Evict the cached response of the request, if any."""
+        try:
+            os.remove(self._path(cache_key(model, prompt, config)))
+        except OSError:
+            pass
+
+    def generate(self, model: str, prompt: str, request: Callable[[], Any],
+                 config: Optional[Dict[str, Any]] = None,
+                 validate: Optional[Callable[[str], Any]] = None) -> Any:
+        """
+        Return a CachedResponse for a request seen before, otherwise run request() and cache
+        the text of its response if the answer is complete and valid.
+
+        Args:
+            validate (Callable): Called with the response text, raises ValueError if the answer
+                is unusable (e.g. structured_output.parse). Such answers are not cached and a
+                cached one that fails is evicted and requested again.
+        """
+        text = self.get(model, prompt, config)
+        if text is not None:
+            try:
+                if validate is not None:
+                    validate(text)
+                return CachedResponse(text)
+            except ValueError:
+                self.delete(model, prompt, config)
+        response = request()
+        candidates = getattr(response, 'candidates', None) or [None]
+        finish_reason = getattr(candidates[0], 'finish_reason', None)
+        finish_reason = None if finish_reason is None else str(getattr(finish_reason, 'name', finish_reason))
+        text = getattr(response, 'text', None)
+        if text and finish_reason in CACHEABLE_FINISH_REASONS:
+            try:
+                if validate is not None:
+                    validate(text)
+                self.put(model, prompt, text, config)
+            except ValueError:
+                pass
+        return response
+
+    def prune(self) -> None:
+        """Delete expired entries, then the least recently used ones beyond max_entries."""
+        cutoff = time.time() - self.ttl_days * 86400
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for filename in files:
+                if not filename.endswith('.json'):
+                    continue
+                path = os.path.join(root, filename)
+                try:
+                    last_used = os.path.getmtime(path)
+                    if last_used < cutoff:
+                        os.remove(path)
+                    else:
+                        entries.append((last_used, path))
+                except OSError:
+                    continue
+        if len(entries) > self.max_entries:
+            entries.sort()
+            for _, path in entries[:len(entries) - self.max_entries]:
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMCache:
+    """Return the shared LLM response cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache()
+        return _cache
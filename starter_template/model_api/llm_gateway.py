@@ -0,0 +1,215 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+from dotenv import load_dotenv
+
+try:
+    from .politeness_scheduler import parse_retry_after
+except ImportError:
+    from politeness_scheduler import parse_retry_after
+
+load_dotenv()
+
+# Requests per minute, tokens per minute and concurrent requests allowed per provider,
+# overridable with LLM_<PROVIDER>_RPM / _TPM / _CONCURRENCY (e.g. LLM_GEMINI_RPM=2000 on a paid tier)
+DEFAULT_LIMITS = {
+    'gemini': {'rpm': 30, 'tpm': 1000000, 'concurrency': 4},
+    'deepseek': {'rpm': 60, 'tpm': 1000000, 'concurrency': 4},
+    'openai': {'rpm': 500, 'tpm': 200000, 'concurrency': 4},
+    'anthropic': {'rpm': 50, 'tpm': 40000, 'concurrency': 2},
+}
+
+# 429 handling: retries per call and the back-off when the error carries no Retry-After
+MAX_RATE_LIMIT_RETRIES = 3
+DEFAULT_RATE_LIMIT_BACKOFF = 20.0
+
+# Token estimate for prompts without a better count
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of text, about 4 characters per token."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _limit(provider: str, name: str) -> float:
+    return float(os.getenv(f"LLM_{provider.upper()}_{name.upper()}", DEFAULT_LIMITS[provider][name]))
+
+
+def _build_client(provider: str) -> Any:
+    if provider == 'gemini':
+        from google import genai
+        return genai.Client(api_key=os.getenv('GEMINI_API_KEY'))
+    if provider == 'deepseek':
+        from openai import OpenAI
+        return OpenAI(api_key=os.getenv('DEEPSEEK_API_KEY'), base_url="https://api.deepseek.com")
+    if provider == 'openai':
+        from openai import OpenAI
+        return OpenAI(organization=os.getenv('ORG'), project=os.getenv('PROJ'), api_key=os.getenv('OPENAI_API_KEY'))
+    if provider == 'anthropic':
+        import anthropic
+        return anthropic.Anthropic(api_key=os.getenv('ANTHROPIC_API_KEY'))
+    raise ValueError(f"Unknown LLM provider: {provider}")
+
+
+def _used_tokens(response: Any) -> Optional[int]:
+    # Gemini: usage_metadata, OpenAI/Deepseek: usage.total_tokens, Anthropic: usage.input/output_tokens
+    usage = getattr(response, 'usage_metadata', None)
+    if usage is not None and getattr(usage, 'total_token_count', None):
+        return usage.total_token_count
+    usage = getattr(response, 'usage', None)
+    if usage is not None:
+        if getattr(usage, 'total_tokens', None):
+            return usage.total_tokens
+        if getattr(usage, 'input_tokens', None) is not None:
+            return usage.input_tokens + (getattr(usage, 'output_tokens', None) or 0)
+    return None
+
+
+def _rate_limit_delay(error: Exception) -> Optional[float]:
+    """Seconds to wait if error is a 429 / quota error, None for any other error."""
+    status = getattr(error, 'status_code', None) or getattr(error, 'code', None)
+    if status != 429 and 'RESOURCE_EXHAUSTED' not in str(error):
+        return None
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    delay = parse_retry_after(headers.get('retry-after') or headers.get('Retry-After'))
+    return DEFAULT_RATE_LIMIT_BACKOFF if delay is None else delay
+
+
+class _MinuteBucket:
+    """Token bucket refilled continuously at limit per minute, holding at most one minute of budget."""
+
+    def __init__(self, limit: float):
+        self.capacity = max(1.0, limit)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Take amount (the balance may go negative) and return the seconds until it is covered."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= min(amount, self.capacity)
+        return max(0.0, -self.tokens / self.rate)
+
+    def adjust(self, amount: float) -> None:
+        """Correct an earlier reservation by amount (negative gives tokens back)."""
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+
+class _ProviderQueue:
+    """Budget of one provider: RPM and TPM buckets plus a first-come first-served concurrency limit."""
+
+    def __init__(self, provider: str):
+        self.requests = _MinuteBucket(_limit(provider, 'rpm'))
+        self.tokens = _MinuteBucket(_limit(provider, 'tpm'))
+        self.concurrency = max(1, int(_limit(provider, 'concurrency')))
+        self.blocked_until = 0.0
+        self.active = 0
+        self.waiting: deque = deque()
+        self.condition = threading.Condition()
+
+    def acquire(self, estimated_tokens: int) -> float:
+        """Wait for a slot and the rate budget of one request, in arrival order. Returns seconds waited."""
+        started = time.monotonic()
+        with self.condition:
+            ticket = object()
+            self.waiting.append(ticket)
+            while self.waiting[0] is not ticket or self.active >= self.concurrency:
+                self.condition.wait()
+            self.waiting.popleft()
+            self.active += 1
+            now = time.monotonic()
+            wait = max(self.requests.reserve(1, now), self.tokens.reserve(estimated_tokens, now), self.blocked_until - now)
+            # The next caller may reserve its budget while this one sleeps
+            self.condition.notify_all()
+        if wait > 0:
+            time.sleep(wait)
+        return time.monotonic() - started
+
+    def release(self, estimated_tokens: int, used_tokens: Optional[int]) -> None:
+        with self.condition:
+            self.active -= 1
+            if used_tokens is not None:
+                self.tokens.adjust(used_tokens - estimated_tokens)
+            self.condition.notify_all()
+
+    def penalize(self, delay: float) -> None:
+        with self.condition:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+
+
+class LLMGateway:
+    """
+    Process-wide entry point for LLM calls: one pooled client per provider, shared
+    requests-per-minute and tokens-per-minute budgets, and a fair (FIFO) queue across threads.
+
+    call() waits for a slot and enough budget, runs request(client), corrects the token budget
+    with the usage reported by the response, and on a 429 blocks the whole provider for the
+    Retry-After time before retrying. acall() is the same for asyncio code.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients: Dict[str, Any] = {}
+        self._queues: Dict[str, _ProviderQueue] = {}
+
+    def client(self, provider: str) -> Any:
+        """Return the shared client of provider, creating it on first use."""
+        with self._lock:
+            if provider not in self._clients:
+                self._clients[provider] = _build_client(provider)
+            return self._clients[provider]
+
+    def _queue(self, provider: str) -> _ProviderQueue:
+        with self._lock:
+            if provider not in self._queues:
+                self._queues[provider] = _ProviderQueue(provider)
+            return self._queues[provider]
+
+    def call(self, provider: str, request: Callable[[Any], Any], estimated_tokens: int = 0) -> Any:
+        """
+        Run request(client) within the rate limits of provider.
+
+        Args:
+            provider (str): 'gemini', 'deepseek', 'openai' or 'anthropic'
+            request (Callable): Makes the API call with the shared client and returns the response
+            estimated_tokens (int): Prompt plus expected output tokens, charged to the TPM budget until
+                the response reports its usage
+
+        Returns:
+            Any: The response returned by request
+        """
+        client = self.client(provider)
+        queue = self._queue(provider)
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            queue.acquire(estimated_tokens)
+            response = None
+            try:
+                response = request(client)
+                return response
+            except Exception as e:
+                delay = _rate_limit_delay(e)
+                if delay is None or attempt == MAX_RATE_LIMIT_RETRIES:
+                    raise
+                print(f"{provider} rate limit reached, pausing its requests for {delay:.1f}s: {str(e)}")
+                queue.penalize(delay)
+            finally:
+                queue.release(estimated_tokens, _used_tokens(response) if response is not None else None)
+
+    async def acall(self, provider: str, request: Callable[[Any], Any], estimated_tokens: int = 0) -> Any:
+        """Async version of call(), the blocking client runs in a worker thread."""
+        return await asyncio.to_thread(self.call, provider, request, estimated_tokens)
+
+
+_gateway = LLMGateway()
+
+
+def get_llm_gateway() -> LLMGateway:
+    """Return the shared LLM gateway."""
+    return _gateway
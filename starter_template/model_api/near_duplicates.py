@@ -0,0 +1,120 @@
+import hashlib
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+# 64-bit SimHash over word shingles. Bodies whose fingerprints differ in at most
+# MAX_HAMMING_DISTANCE bits are treated as copies of the same story.
+SIMHASH_BITS = 64
+SHINGLE_SIZE = 3
+MAX_HAMMING_DISTANCE = 3
+# Fingerprints are bucketed by BANDS bit ranges; with BANDS > MAX_HAMMING_DISTANCE two
+# near-duplicates always share at least one band, so only same-bucket candidates are compared
+BANDS = 4
+# Bodies shorter than this many words are too small to fingerprint reliably
+MIN_WORDS = 40
+
+WORD = re.compile(r'\w+')
+
+
+def _hash64(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def simhash(text: str, shingle_size: int = SHINGLE_SIZE) -> Optional[int]:
+    """
+    Return the 64-bit SimHash of text over lowercased word shingles, or None if text is too short.
+    """
+    words = WORD.findall(text.lower())
+    if len(words) < MIN_WORDS:
+        return None
+    weights = [0] * SIMHASH_BITS
+    for i in range(len(words) - shingle_size + 1):
+        value = _hash64(' '.join(words[i:i + shingle_size]))
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+class NearDuplicateIndex:
+    """
+    Groups near-duplicate article bodies (the same wire story published by several sources).
+
+    add() returns the key of the group an article belongs to: the key of the first article
+    with a fingerprint within max_distance bits, or its own key if it starts a new group.
+    Thread-safe, so one index can be shared by several scraper threads.
+    """
+
+    def __init__(self, max_distance: int = MAX_HAMMING_DISTANCE, bands: int = BANDS):
+        self.max_distance = max_distance
+        self.bands = bands
+        self.band_bits = SIMHASH_BITS // bands
+        self._lock = threading.Lock()
+        self._buckets: Dict[Tuple[int, int], List[Tuple[int, str]]] = {}
+
+    def _band_keys(self, fingerprint: int) -> List[Tuple[int, int]]:
+        mask = (1 << self.band_bits) - 1
+        return [(band, fingerprint >> (band * self.band_bits) & mask) for band in range(self.bands)]
+
+    def add(self, key: str, text: str) -> str:
+        """
+        Index text under key.
+
+        Returns:
+            str: Key of the group representative, key itself for a new group or unfingerprintable text
+        """
+        fingerprint = simhash(text)
+        if fingerprint is None:
+            return key
+        band_keys = self._band_keys(fingerprint)
+        with self._lock:
+            for band_key in band_keys:
+                for other_fingerprint, other_key in self._buckets.get(band_key, []):
+                    if hamming_distance(fingerprint, other_fingerprint) <= self.max_distance:
+                        return other_key
+            for band_key in band_keys:
+                self._buckets.setdefault(band_key, []).append((fingerprint, key))
+        return key
+
+
+def group_near_duplicates(links: Dict[str, Dict[str, object]], index: Optional[NearDuplicateIndex] = None
+                          ) -> Tuple[Dict[str, Dict[str, object]], Dict[str, List[str]]]:
+    """
+    Keep one representative per group of near-duplicate articles.
+
+    Args:
+        links (dict): {base_url: {article_url: [title, body] or error string}} as built by start_gemini_assistant
+        index (NearDuplicateIndex, optional): Index to group against, a fresh one by default
+
+    Returns:
+        tuple: (links without the duplicates, {representative_url: [duplicate_url, ...]})
+            The representative is the longest body of its group.
+    """
+    index = index or NearDuplicateIndex()
+    groups: Dict[str, List[Tuple[str, str, int]]] = {}
+    for base_url, articles in links.items():
+        for article_url, content in articles.items():
+            if not (isinstance(content, list) and len(content) >= 2 and content[1]):
+                continue
+            group_key = index.add(article_url, content[1])
+            groups.setdefault(group_key, []).append((base_url, article_url, len(content[1])))
+
+    deduplicated = {base_url: dict(articles) for base_url, articles in links.items()}
+    duplicates: Dict[str, List[str]] = {}
+    for members in groups.values():
+        if len(members) < 2:
+            continue
+        members.sort(key=lambda member: -member[2])
+        representative = members[0][1]
+        duplicates[representative] = [article_url for _, article_url, _ in members[1:]]
+        for base_url, article_url, _ in members[1:]:
+            deduplicated[base_url].pop(article_url, None)
+    return deduplicated, duplicates
@@ -13,21 +13,20 @@ try:
     from .web_scrapper_api import get_links_and_content_from_page
     from .mongo import db
     from .logging_scripts import *
+    from .llm_gateway import get_llm_gateway, estimate_tokens
 except ImportError:
     from web_scrapper_api import get_links_and_content_from_page
     from mongo import db
     from logging_scripts import *
+    from llm_gateway import get_llm_gateway, estimate_tokens
 
 
 
 class OpenAiAPI:
     def __init__(self):
         load_dotenv()   
-        self.client=OpenAI(
-            organization=os.getenv('ORG'),
-            project=os.getenv('PROJ'),
-            api_key=os.getenv('OPENAI_API_KEY')
-        )
+        # Shared by every OpenAI caller of the process, see llm_gateway
+        self.client = get_llm_gateway().client("openai")
         # self.client=OpenAI(
         #     api_key=os.getenv('DEEPSEEK_API_KEY'),
         #     base_url=os.getenv('DEEPSEEK_BASE_URL')
@@ -121,34 +120,38 @@ class OpenAiAPI:
     def openai_api_request(self, txt):
         
         append_to_log(self.log_file, f"[OPENAI][DBG][{datetime.today().strftime('%H:%M:%S')}][openai_api_request] Recieved OPENAI request for content {txt}")
+        # One assistant run is one request of the process-wide OpenAI budget, see llm_gateway
+        return get_llm_gateway().call("openai", lambda client: self._run_assistant(client, txt), estimated_tokens=estimate_tokens(txt))
+
+    def _run_assistant(self, client, txt):
         thread = self.news_thread  
         # print(f"Thread created: {thread.id}")  # Debugging line
-        message = self.client.beta.threads.messages.create(  # Create a new message in the thread
+        message = client.beta.threads.messages.create(  # Create a new message in the thread
             thread_id=thread.id,
             role="user",
             content=txt
         )
         # print(f"Message created: {message.id}")  # Debugging line
-        run = self.client.beta.threads.runs.create(  # Create a new run in the thread
+        run = client.beta.threads.runs.create(  # Create a new run in the thread
             thread_id=thread.id,
             assistant_id='asst_WqxlAhEY2ktg9mj5fGHqvNaq',
         )
         # print(f"Run created: {run.id}")  # Debugging line
-        run = self.wait_on_run( run, thread)
+        run = self.wait_on_run(run, thread, client)
         if (run.status == 'failed' or run.status == 'stopped'):
             append_to_log(self.log_file, f"[OPENAI][ERR][{datetime.today().strftime('%H:%M:%S')}][openai_api_request] Failed run : {run}")
             raise Exception(f"Run failed or stopped with error: {run}")
         while run.status == 'requires_action':  # Handle required actions if the run status is 'requires_action'
             append_to_log(self.log_file, f"[OPENAI][DBG][{datetime.today().strftime('%H:%M:%S')}][openai_api_request] Tool name: {run.required_action.submit_tool_outputs.tool_calls[0].id}")
             # print(f"Tool name {run.required_action.submit_tool_outputs.tool_calls[0].id}")  # Debugging line
-            run = self.client.beta.threads.runs.submit_tool_outputs(
+            run = client.beta.threads.runs.submit_tool_outputs(
                 thread_id=thread.id,
                 run_id=run.id,
                 tool_outputs=[{"tool_call_id": run.required_action.submit_tool_outputs.tool_calls[0].id, "output": "true"}]
             )
-            self.wait_on_run(run, thread)  # Wait for the run to complete
+            self.wait_on_run(run, thread, client)  # Wait for the run to complete
             # print(f"FINAL Run requires action: {run.status}")  # Debugging line
-        messages = self.client.beta.threads.messages.list(
+        messages = client.beta.threads.messages.list(
             thread_id=thread.id, order='asc', after=message.id,
         )
         append_to_log(self.log_file, f"[OPENAI][DBG][{datetime.today().strftime('%H:%M:%S')}][openai_api_request] Messages retrieved from thread: {messages}")
@@ -157,11 +160,12 @@ class OpenAiAPI:
 
 
 
-    def wait_on_run(self, run, thread):
+    def wait_on_run(self, run, thread, client=None):
+        client = client or self.client
         while run.status=='queued' or run.status=='in_progress':
             append_to_log(self.log_file, f"[OPENAI][DBG][{datetime.today().strftime('%H:%M:%S')}][wait_on_run] Run status: {run.status}")
             # print(f"Run status: {run.status}")  # Debugging line
-            run = self.client.beta.threads.runs.retrieve(
+            run = client.beta.threads.runs.retrieve(
                 thread_id=thread.id,
                 run_id=run.id,
             )
@@ -0,0 +1,135 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional
+
+try:
+    from .html_parser import make_soup, extract_hrefs
+    from .date_extractor import get_date_extractor
+    from .extraction_rules import get_extraction_rules
+    from .snapshot_archive import get_snapshot_archive
+except ImportError:
+    from html_parser import make_soup, extract_hrefs
+    from date_extractor import get_date_extractor
+    from extraction_rules import get_extraction_rules
+    from snapshot_archive import get_snapshot_archive
+
+# Parser processes, by default one per core left over from the I/O threads; 0 parses in the calling thread
+PARSE_WORKERS = int(os.getenv('SCRAPER_PARSE_WORKERS', max(1, (os.cpu_count() or 2) - 1)))
+
+# The scraper process runs threads (crawl engine, scheduler, LLM gateway) whose locks a forked child
+# could inherit in a held state, so parser processes come from a fork server, or are spawned where
+# there is none. Call get_parse_pool().start() before starting scraper threads.
+PARSE_START_METHOD = os.getenv('SCRAPER_PARSE_START_METHOD',
+                               'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+
+
+def parse_page(url: str, html: str, want_article: bool = True, want_links: bool = False,
+               hints: Optional[Dict[str, Optional[str]]] = None) -> Dict[str, Any]:
+    """
+    Parse one downloaded page into a compact, picklable record. Runs in a parser process.
+    hints is what the calling process learned for the domain so far, see ParsePool.hints.
+
+    Returns:
+        dict: {"content": [title, body] or error string, "pub_date": ISO string or None,
+               "links": [href, ...] or None, "body_selector": selector that produced the body or None,
+               "date_strategy": date strategy that worked last for the domain or None}
+    """
+    record = {"content": None, "pub_date": None, "links": None, "body_selector": None, "date_strategy": None}
+    if hints:
+        if hints.get("body_selector"):
+            get_extraction_rules().learn(url, hints["body_selector"], persist=False)
+        if hints.get("date_strategy"):
+            get_date_extractor().learn_strategy(url, hints["date_strategy"])
+    if want_links:
+        record["links"] = extract_hrefs(html)
+    if want_article:
+        soup = make_soup(html)
+        # The date is read before extraction removes boilerplate such as <time> in asides
+        pub_date = get_date_extractor().extract(url, html=html, soup=soup)
+        record["pub_date"] = pub_date.isoformat() if pub_date else None
+        record["date_strategy"] = get_date_extractor().learned_strategy(url)
+        record["content"], record["body_selector"] = get_extraction_rules().extract_with_selector(soup, url, learn=False)
+    return record
+
+
+class ParsePool:
+    """
+    Process pool for the CPU-bound parsing stage of the scraper.
+
+    The crawl engine's threads only download; they hand the HTML to parse() and wait for the
+    record while a parser process holds its own GIL, so parsing scales with cores. Parser
+    processes only know what they were started with, so every task carries the body selector
+    and date strategy learned for its domain, and what the parser learned comes back in the
+    record to be merged (and persisted once, unless replaying a snapshot archive) in the
+    calling process. If the pool cannot be used the page is parsed in the calling thread; a
+    broken pool is logged and started again.
+    """
+
+    def __init__(self, workers: int = PARSE_WORKERS, start_method: str = PARSE_START_METHOD):
+        self.workers = workers
+        self.start_method = start_method
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.restarts = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context(self.start_method))
+            return self._executor
+
+    def start(self) -> None:
+        """Start the parser processes now rather than on the first page."""
+        if self.workers <= 0:
+            return
+        try:
+            self._get_executor().submit(len, '').result()
+        except (BrokenProcessPool, OSError) as e:
+            print(f"Parser processes unavailable, parsing in threads: {str(e)}")
+            self.shutdown()
+
+    def hints(self, url: str) -> Dict[str, Optional[str]]:
+        """What the calling process learned for the domain of url, handed to parse_page."""
+        return {
+            "body_selector": get_extraction_rules().learned_selector(url),
+            "date_strategy": get_date_extractor().learned_strategy(url),
+        }
+
+    def parse(self, url: str, html: str, want_article: bool = True, want_links: bool = False) -> Dict[str, Any]:
+        """Parse a page in a parser process, see parse_page."""
+        hints = self.hints(url) if want_article else None
+        if self.workers <= 0:
+            record = parse_page(url, html, want_article, want_links, hints)
+        else:
+            try:
+                record = self._get_executor().submit(parse_page, url, html, want_article, want_links, hints).result()
+            except (BrokenProcessPool, OSError) as e:
+                with self._lock:
+                    self.restarts += 1
+                    restarts = self.restarts
+                print(f"Parser process pool broken, parsing {url} in thread and starting a new pool (restart {restarts}): {str(e)}")
+                self.shutdown()
+                record = parse_page(url, html, want_article, want_links, hints)
+        if record["body_selector"]:
+            get_extraction_rules().learn(url, record["body_selector"], persist=not get_snapshot_archive().replaying)
+        if record["date_strategy"]:
+            get_date_extractor().learn_strategy(url, record["date_strategy"])
+        return record
+
+    def shutdown(self) -> None:
+        """Stop the parser processes, the next parse() starts new ones."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pool = ParsePool()
+
+
+def get_parse_pool() -> ParsePool:
+    """Return the shared parser process pool."""
+    return _pool
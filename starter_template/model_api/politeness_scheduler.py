@@ -0,0 +1,148 @@
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlparse
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Sustained request rate and burst allowed per host. Requests to different hosts never wait on each other.
+DEFAULT_REQUESTS_PER_SECOND = float(os.getenv('SCRAPER_HOST_RATE', 2.0))
+DEFAULT_BURST = int(os.getenv('SCRAPER_HOST_BURST', 4))
+
+# Back-off applied to a host that answers 429 without a usable Retry-After header
+DEFAULT_429_BACKOFF = 10.0
+MAX_429_BACKOFF = 300.0
+
+
+def get_host(url: str) -> str:
+    """Return the lower-cased host part of a URL, used as the scheduling key."""
+    return urlparse(url).netloc.lower()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header value into seconds.
+
+    Args:
+        value (str, optional): Either delta-seconds ("120") or an HTTP date
+
+    Returns:
+        Optional[float]: Seconds to wait, or None if the header is missing or invalid
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class _HostBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.consecutive_429 = 0
+
+
+class DomainScheduler:
+    """
+    Thread-safe per-domain token bucket.
+
+    acquire(url) returns immediately while the host has tokens and otherwise sleeps just
+    long enough for the next token. A 429 or Retry-After from a host blocks only that
+    host until the server-requested time has passed.
+    """
+
+    def __init__(self, rate: float = DEFAULT_REQUESTS_PER_SECOND, burst: int = DEFAULT_BURST):
+        self.default_rate = rate
+        self.default_burst = burst
+        self._buckets: Dict[str, _HostBucket] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, host: str) -> _HostBucket:
+        if host not in self._buckets:
+            self._buckets[host] = _HostBucket(self.default_rate, self.default_burst)
+        return self._buckets[host]
+
+    def _refill(self, bucket: _HostBucket, now: float) -> None:
+        bucket.tokens = min(bucket.burst, bucket.tokens + (now - bucket.updated) * bucket.rate)
+        bucket.updated = now
+
+    def set_rate(self, url: str, rate: float, burst: Optional[int] = None) -> None:
+        """Override the request rate for the host of url, e.g. from a robots.txt crawl-delay."""
+        with self._lock:
+            bucket = self._bucket(get_host(url))
+            self._refill(bucket, time.monotonic())
+            bucket.rate = max(rate, 0.001)
+            if burst is not None:
+                bucket.burst = max(1, burst)
+                bucket.tokens = min(bucket.tokens, bucket.burst)
+
+    def acquire(self, url: str) -> float:
+        """
+        Block until a request to the host of url is allowed and reserve it.
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        with self._lock:
+            now = time.monotonic()
+            bucket = self._bucket(get_host(url))
+            self._refill(bucket, now)
+            # Reserve the token now (the balance may go negative) so concurrent callers queue up behind it
+            bucket.tokens -= 1
+            wait = max(0.0, -bucket.tokens / bucket.rate, bucket.blocked_until - now)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def penalize(self, url: str, retry_after: Optional[str] = None) -> float:
+        """
+        Record a 429/503 answer from the host of url and block it for Retry-After seconds,
+        or for an exponentially growing back-off when the header is missing.
+
+        Returns:
+            float: Seconds the host is blocked for
+        """
+        delay = parse_retry_after(retry_after)
+        with self._lock:
+            bucket = self._bucket(get_host(url))
+            bucket.consecutive_429 += 1
+            if delay is None:
+                delay = min(MAX_429_BACKOFF, DEFAULT_429_BACKOFF * (2 ** (bucket.consecutive_429 - 1)))
+            bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + delay)
+            bucket.tokens = min(bucket.tokens, 0.0)
+        return delay
+
+    def record_success(self, url: str) -> None:
+        """Reset the 429 back-off of the host of url after a successful response."""
+        with self._lock:
+            bucket = self._buckets.get(get_host(url))
+            if bucket:
+                bucket.consecutive_429 = 0
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> DomainScheduler:
+    """Return the shared process-wide domain scheduler."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = DomainScheduler()
+        return _scheduler
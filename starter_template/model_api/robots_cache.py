@@ -0,0 +1,161 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+import requests
+from dotenv import load_dotenv
+
+try:
+    from .politeness_scheduler import get_host, get_scheduler
+    from .http_session_pool import get_session, read_body
+except ImportError:
+    from politeness_scheduler import get_host, get_scheduler
+    from http_session_pool import get_session, read_body
+
+load_dotenv()
+
+# Product token matched against robots.txt groups; the scrapers rotate browser user agents,
+# so by default only the rules for every crawler ("User-agent: *") apply
+ROBOTS_USER_AGENT = os.getenv('SCRAPER_ROBOTS_USER_AGENT', '*')
+
+# Sent when the caller passes no headers; sites that block unknown clients also block python-requests
+ROBOTS_FETCH_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# Seconds a fetched robots.txt is reused, and how soon a host whose robots.txt could not be read is retried
+ROBOTS_TTL = float(os.getenv('SCRAPER_ROBOTS_TTL', 24 * 3600))
+ROBOTS_RETRY_AFTER = 600.0
+ROBOTS_TIMEOUT = 10
+MAX_ROBOTS_BYTES = 512 * 1024
+
+# Upper bound on the per-host rate derived from a Crawl-delay / Request-rate
+MAX_ROBOTS_RATE = 10.0
+
+# Fetched robots.txt files are kept next to the scripts
+ROBOTS_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'robots_cache.json')
+
+
+class RobotsDisallowedError(requests.exceptions.RequestException):
+    """Raised instead of requesting a URL the host's robots.txt disallows."""
+
+
+class RobotsCache:
+    """
+    Per-host robots.txt cache shared by the scrapers, persisted between runs.
+
+    The first allowed() for a host reads its robots.txt (from the cache file while fresh,
+    otherwise over the shared session) and hands its Crawl-delay or Request-rate to the
+    domain scheduler, so each host is crawled at the rate it asks for instead of the default.
+    Any 4xx, including 401/403 from sites that refuse the client rather than the crawl, allows
+    the host as the robots.txt convention has it; 401/403, network errors and 5xx are only
+    cached for ROBOTS_RETRY_AFTER so the robots.txt is read again soon.
+    """
+
+    def __init__(self, cache_file: str = ROBOTS_CACHE_FILE, user_agent: str = ROBOTS_USER_AGENT):
+        self.cache_file = cache_file
+        self.user_agent = user_agent
+        self._lock = threading.Lock()
+        self._host_locks: Dict[str, threading.Lock] = {}
+        self._parsers: Dict[str, RobotFileParser] = {}
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as file:
+                self.entries: Dict[str, Dict] = json.load(file)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def _save(self) -> None:
+        try:
+            tmp_path = f"{self.cache_file}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                json.dump(self.entries, file)
+            os.replace(tmp_path, self.cache_file)
+        except OSError as e:
+            print(f"Failed to save robots.txt cache: {str(e)}")
+
+    def _fetch(self, robots_url: str, headers: Optional[Dict[str, str]] = None) -> Dict:
+        get_scheduler().acquire(robots_url)
+        try:
+            response = get_session(robots_url).get(robots_url, headers=headers or ROBOTS_FETCH_HEADERS,
+                                                   timeout=ROBOTS_TIMEOUT, stream=True)
+            read_body(response, max_bytes=MAX_ROBOTS_BYTES)
+        except requests.exceptions.RequestException as e:
+            print(f"Could not read {robots_url}, allowing all: {str(e)}")
+            return {"status": None, "text": "", "expires": time.time() + ROBOTS_RETRY_AFTER}
+        if response.status_code >= 500 or response.status_code in (401, 403):
+            return {"status": response.status_code, "text": "", "expires": time.time() + ROBOTS_RETRY_AFTER}
+        text = response.text if response.status_code == 200 else ""
+        return {"status": response.status_code, "text": text, "expires": time.time() + ROBOTS_TTL}
+
+    def _build_parser(self, robots_url: str, entry: Dict) -> RobotFileParser:
+        parser = RobotFileParser(robots_url)
+        parser.parse(entry["text"].splitlines())
+        return parser
+
+    def _apply_rate(self, url: str, parser: RobotFileParser) -> None:
+        delay = parser.crawl_delay(self.user_agent)
+        request_rate = parser.request_rate(self.user_agent)
+        rate = None
+        if delay:
+            rate = 1.0 / float(delay)
+        elif request_rate and request_rate.requests and request_rate.seconds:
+            rate = request_rate.requests / request_rate.seconds
+        if rate:
+            get_scheduler().set_rate(url, min(rate, MAX_ROBOTS_RATE), burst=1)
+
+    def parser_for(self, url: str, headers: Optional[Dict[str, str]] = None) -> RobotFileParser:
+        """
+        Return the parsed robots.txt of the host of url, fetching it when it is not cached or stale.
+        headers are sent with that request, so it carries the scraper's browser User-Agent.
+        """
+        host = get_host(url)
+        with self._lock:
+            parser = self._parsers.get(host)
+            entry = self.entries.get(host)
+            if parser is not None and entry and entry["expires"] > time.time():
+                return parser
+            host_lock = self._host_locks.setdefault(host, threading.Lock())
+        # One fetch per host, other threads wait for it
+        with host_lock:
+            with self._lock:
+                parser = self._parsers.get(host)
+                entry = self.entries.get(host)
+            if parser is not None and entry and entry["expires"] > time.time():
+                return parser
+            robots_url = f"{urlparse(url).scheme or 'https'}://{host}/robots.txt"
+            if not entry or entry["expires"] <= time.time():
+                entry = self._fetch(robots_url, headers)
+                with self._lock:
+                    self.entries[host] = entry
+                    self._save()
+            parser = self._build_parser(robots_url, entry)
+            self._apply_rate(url, parser)
+            with self._lock:
+                self._parsers[host] = parser
+            return parser
+
+    def allowed(self, url: str, headers: Optional[Dict[str, str]] = None) -> bool:
+        """True if robots.txt of the host allows fetching url."""
+        return self.parser_for(url, headers).can_fetch(self.user_agent, url)
+
+    def check(self, url: str, headers: Optional[Dict[str, str]] = None) -> None:
+        """Raise RobotsDisallowedError if robots.txt of the host disallows url."""
+        if not self.allowed(url, headers):
+            raise RobotsDisallowedError(f"{url} is disallowed by robots.txt of {get_host(url)}")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_robots_cache() -> RobotsCache:
+    """Return the shared robots.txt cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = RobotsCache()
+        return _cache
@@ -0,0 +1,128 @@
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Set, Tuple
+
+try:
+    from .mongo import db
+except ImportError:
+    try:
+        from mongo import db
+    except ImportError:
+        db = None
+
+try:
+    from pymongo import UpdateOne
+    from pymongo.errors import PyMongoError
+except ImportError:
+    UpdateOne = None
+    PyMongoError = Exception
+
+SEEN_URLS_COLLECTION = 'seen_urls'
+
+# Outcomes recorded for a processed article URL
+OUTCOME_STORED = 'stored'                # categorized and inserted into the database by the Gemini pipeline
+OUTCOME_OUT_OF_WINDOW = 'out_of_window'  # published before the window start, will never qualify again
+OUTCOME_NO_DATE = 'no_date'              # no publication date could be extracted
+OUTCOME_TOO_SHORT = 'too_short'          # fewer than 20 words or no body found
+OUTCOME_ERROR = 'error'                  # fetch failed, retried on the next run
+
+# Outcomes that make a URL skippable in any later run. OUTCOME_STORED is only skipped for a
+# different window, so re-running the same window (e.g. after a failed run) still rebuilds its data.
+FINAL_OUTCOMES = [OUTCOME_OUT_OF_WINDOW]
+
+# Outcomes that may be temporary (a half-loaded page, a date added later): skipped only until the
+# record is this old, then the URL is processed again
+RETRY_AFTER = timedelta(hours=float(os.getenv('SCRAPER_SEEN_RETRY_HOURS', 12)))
+RETRYABLE_OUTCOMES = [OUTCOME_NO_DATE, OUTCOME_TOO_SHORT]
+
+
+class SeenUrlIndex:
+    """
+    Persistent index of article URLs already processed by the scraper, stored in Mongo
+    with a unique index on url. Every record keeps the outcome, the time window and the
+    time it was processed. The index disables itself if Mongo is unreachable so
+    scraping never fails because of it.
+    """
+
+    def __init__(self, collection=None):
+        if collection is None and db is not None:
+            collection = db[SEEN_URLS_COLLECTION]
+        self.collection = collection
+        self.enabled = collection is not None and UpdateOne is not None
+        if self.enabled:
+            try:
+                self.collection.create_index('url', unique=True)
+            except PyMongoError as e:
+                print(f"Seen URL index disabled, could not reach MongoDB: {str(e)}")
+                self.enabled = False
+
+    def seen_urls(self, urls: Iterable[str], window: str) -> Set[str]:
+        """
+        Return the subset of urls that can be skipped for the given window.
+
+        Args:
+            urls (Iterable[str]): Candidate article URLs
+            window (str): Identifier of the current time window, e.g. '2025-04-06_18:00'
+
+        Returns:
+            Set[str]: URLs already processed with a final outcome, with a retryable outcome less than
+                RETRY_AFTER ago, or stored for an earlier window
+        """
+        urls = list(urls)
+        if not self.enabled or not urls:
+            return set()
+        query = {
+            "url": {"$in": urls},
+            "$or": [
+                {"outcome": {"$in": FINAL_OUTCOMES}},
+                {"outcome": {"$in": RETRYABLE_OUTCOMES}, "processed_at": {"$gt": datetime.now() - RETRY_AFTER}},
+                {"outcome": OUTCOME_STORED, "window": {"$ne": window}}
+            ]
+        }
+        try:
+            return {record["url"] for record in self.collection.find(query, {"url": 1, "_id": 0})}
+        except PyMongoError as e:
+            print(f"Seen URL lookup failed, processing all links: {str(e)}")
+            return set()
+
+    def mark_many(self, records: List[Tuple[str, str]], window: str, source: Optional[str] = None) -> None:
+        """
+        Record the outcome of processed URLs.
+
+        Args:
+            records (List[Tuple[str, str]]): (url, outcome) pairs
+            window (str): Identifier of the current time window
+            source (str, optional): Section page the URLs were found on
+        """
+        if not self.enabled or not records:
+            return
+        now = datetime.now()
+        operations = [
+            UpdateOne(
+                {"url": url},
+                {
+                    "$set": {"outcome": outcome, "window": window, "source": source, "processed_at": now},
+                    "$setOnInsert": {"first_seen_at": now}
+                },
+                upsert=True
+            )
+            for url, outcome in records
+        ]
+        try:
+            self.collection.bulk_write(operations, ordered=False)
+        except PyMongoError as e:
+            print(f"Failed to update seen URL index: {str(e)}")
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_seen_url_index() -> SeenUrlIndex:
+    """Return the shared seen-URL index."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = SeenUrlIndex()
+        return _index
@@ -0,0 +1,237 @@
+import glob
+import gzip
+import io
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from dotenv import load_dotenv
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+load_dotenv()
+
+# 'record' archives every response fetched by make_request, 'replay' serves make_request from
+# an archive without touching the network, 'off' disables both
+ARCHIVE_MODE = os.getenv('SCRAPER_ARCHIVE_MODE', 'off')
+ARCHIVE_DIR = os.getenv('SCRAPER_ARCHIVE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'snapshots'))
+# Run recorded into (default: the start time of this process) and run replayed (default: the latest archive)
+RUN_ID = os.getenv('SCRAPER_RUN_ID', datetime.today().strftime('%Y_%m_%d_%H_%M_%S'))
+REPLAY_RUN_ID = os.getenv('SCRAPER_REPLAY_RUN_ID')
+# Archives kept in ARCHIVE_DIR when recording, older ones are deleted; 0 keeps all
+ARCHIVE_KEEP_RUNS = int(os.getenv('SCRAPER_ARCHIVE_KEEP_RUNS', 10))
+
+# Response headers kept in the archive
+ARCHIVED_HEADERS = ['Content-Type', 'ETag', 'Last-Modified']
+
+ZSTD_EXTENSION = '.warc.zst'
+GZIP_EXTENSION = '.warc.gz'
+
+
+def _compress(data: bytes) -> bytes:
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data)
+
+
+def _decompress_all(path: str) -> bytes:
+    # Every record is its own zstd frame / gzip member, as in WARC files
+    with open(path, 'rb') as file:
+        if path.endswith(ZSTD_EXTENSION):
+            if zstandard is None:
+                raise RuntimeError(f"zstandard is required to replay {path}")
+            with zstandard.ZstdDecompressor().stream_reader(file, read_across_frames=True) as reader:
+                return reader.read()
+        with gzip.GzipFile(fileobj=file) as reader:
+            return reader.read()
+
+
+def _read_record(stream: io.BytesIO) -> Optional[Tuple[Dict[str, str], bytes]]:
+    headers = {}
+    line = stream.readline()
+    while line in (b'\r\n', b'\n'):
+        line = stream.readline()
+    if not line:
+        return None
+    for line in iter(stream.readline, b'\r\n'):
+        if not line:
+            return None
+        name, _, value = line.decode('utf-8').partition(':')
+        headers[name.strip()] = value.strip()
+    block = stream.read(int(headers.get('Content-Length', 0)))
+    return headers, block
+
+
+class SnapshotArchive:
+    """
+    WARC-like archive of fetched pages, one compressed file per run under ARCHIVE_DIR.
+
+    Every response is appended as a 'response' record (WARC headers, HTTP status line and
+    headers, body) compressed as an independent zstd frame, or gzip member if zstandard is
+    not installed, so a crashed run still leaves a readable archive. The time window of the
+    run is stored as a 'metadata' record. In replay mode the archive of REPLAY_RUN_ID (or the
+    latest one) is indexed by URL, make_request serves responses from it and the scraper
+    filters with the recorded time window. Recording keeps the last ARCHIVE_KEEP_RUNS archives.
+    """
+
+    def __init__(self, mode: str = ARCHIVE_MODE, archive_dir: str = ARCHIVE_DIR, run_id: str = RUN_ID,
+                 replay_run_id: Optional[str] = REPLAY_RUN_ID, keep_runs: int = ARCHIVE_KEEP_RUNS):
+        self.mode = mode
+        self.archive_dir = archive_dir
+        self.run_id = run_id
+        self.keep_runs = keep_runs
+        self._lock = threading.Lock()
+        self._index: Dict[str, Tuple[Dict[str, str], bytes]] = {}
+        self._time_window: Optional[Dict[str, str]] = None
+        self._pruned = False
+        extension = ZSTD_EXTENSION if zstandard is not None else GZIP_EXTENSION
+        self.path = os.path.join(self.archive_dir, f"{self.run_id}{extension}")
+        if self.mode == 'replay':
+            self.replay_path = self._find_archive(replay_run_id)
+            self._load(self.replay_path)
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == 'record'
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == 'replay'
+
+    def _archives(self, pattern: str = "*.warc.*") -> List[str]:
+        return sorted(glob.glob(os.path.join(self.archive_dir, pattern)), key=os.path.getmtime)
+
+    def _find_archive(self, run_id: Optional[str]) -> str:
+        pattern = f"{run_id}.warc.*" if run_id else "*.warc.*"
+        archives = self._archives(pattern)
+        if not archives:
+            raise FileNotFoundError(f"No snapshot archive matching {pattern} in {self.archive_dir}")
+        return archives[-1]
+
+    def _load(self, path: str) -> None:
+        stream = io.BytesIO(_decompress_all(path))
+        while True:
+            record = _read_record(stream)
+            if record is None:
+                break
+            warc_headers, block = record
+            if warc_headers.get('WARC-Type') == 'response':
+                self._index[warc_headers['WARC-Target-URI']] = (warc_headers, block)
+            elif warc_headers.get('WARC-Type') == 'metadata' and self._time_window is None:
+                self._time_window = json.loads(block.decode('utf-8'))
+
+    def _append(self, data: bytes) -> None:
+        # Called with self._lock held
+        os.makedirs(self.archive_dir, exist_ok=True)
+        if not self._pruned:
+            self._pruned = True
+            if self.keep_runs > 0:
+                # This run's archive is about to become the newest one
+                for path in [path for path in self._archives() if path != self.path][:-(self.keep_runs - 1) or None]:
+                    os.remove(path)
+        with open(self.path, 'ab') as file:
+            file.write(data)
+
+    def time_window(self, time_window: Dict[str, str]) -> Dict[str, str]:
+        """
+        Time window the scraper filters with: when recording, time_window is stored as the run's
+        window on first use; when replaying, the window of the recorded run replaces it.
+
+        Raises:
+            ValueError: If the replayed archive has no recorded time window
+        """
+        if self.replaying:
+            if self._time_window is None:
+                raise ValueError(f"Snapshot archive {self.replay_path} has no recorded time window")
+            return dict(self._time_window)
+        if not self.recording:
+            return time_window
+        with self._lock:
+            if self._time_window is None:
+                self._time_window = dict(time_window)
+                block = json.dumps(self._time_window).encode('utf-8')
+                warc_headers = (
+                    "WARC/1.1\r\n"
+                    "WARC-Type: metadata\r\n"
+                    f"WARC-Date: {datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')}\r\n"
+                    f"WARC-Run-Id: {self.run_id}\r\n"
+                    "Content-Type: application/json\r\n"
+                    f"Content-Length: {len(block)}\r\n\r\n"
+                ).encode('utf-8')
+                try:
+                    self._append(_compress(warc_headers + block + b"\r\n\r\n"))
+                except OSError as e:
+                    print(f"Failed to archive time window: {str(e)}")
+            return dict(self._time_window)
+
+    def record(self, url: str, response: requests.Response) -> None:
+        """Append response to the archive of this run."""
+        if not self.recording:
+            return
+        status_line = f"HTTP/1.1 {response.status_code} {response.reason or ''}".rstrip()
+        http_headers = ''.join(f"{name}: {response.headers[name]}\r\n" for name in ARCHIVED_HEADERS if response.headers.get(name))
+        if response.encoding:
+            http_headers += f"X-Encoding: {response.encoding}\r\n"
+        block = f"{status_line}\r\n{http_headers}\r\n".encode('utf-8') + response.content
+        warc_headers = (
+            "WARC/1.1\r\n"
+            "WARC-Type: response\r\n"
+            f"WARC-Target-URI: {url}\r\n"
+            f"WARC-Date: {datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')}\r\n"
+            f"WARC-Run-Id: {self.run_id}\r\n"
+            + ("WARC-Truncated: length\r\n" if getattr(response, "truncated", False) else "")
+            + "Content-Type: application/http;msgtype=response\r\n"
+            f"Content-Length: {len(block)}\r\n\r\n"
+        ).encode('utf-8')
+        data = _compress(warc_headers + block + b"\r\n\r\n")
+        with self._lock:
+            try:
+                self._append(data)
+            except OSError as e:
+                print(f"Failed to archive {url}: {str(e)}")
+
+    def replay(self, url: str) -> requests.Response:
+        """
+        Rebuild the archived response for url.
+
+        Raises:
+            requests.exceptions.ConnectionError: If url is not in the replayed archive
+        """
+        entry = self._index.get(url)
+        if entry is None:
+            raise requests.exceptions.ConnectionError(f"{url} is not in snapshot archive {self.replay_path}")
+        warc_headers, block = entry
+        head, _, body = block.partition(b"\r\n\r\n")
+        lines = head.decode('utf-8').split("\r\n")
+        response = requests.Response()
+        response.status_code = int(lines[0].split()[1])
+        response.headers = CaseInsensitiveDict()
+        for line in lines[1:]:
+            name, _, value = line.partition(':')
+            response.headers[name.strip()] = value.strip()
+        response.encoding = response.headers.pop('X-Encoding', None)
+        response._content = body
+        response.url = url
+        response.truncated = 'WARC-Truncated' in warc_headers
+        response.from_archive = True
+        return response
+
+
+_archive = None
+_archive_lock = threading.Lock()
+
+
+def get_snapshot_archive() -> SnapshotArchive:
+    """Return the shared snapshot archive for this process."""
+    global _archive
+    with _archive_lock:
+        if _archive is None:
+            _archive = SnapshotArchive()
+        return _archive
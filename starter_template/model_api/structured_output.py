@@ -0,0 +1,181 @@
+import json
+from typing import Any, Callable, Dict, List, Optional
+
+# Schemas use the OpenAPI subset Gemini accepts as response_schema (type, properties, required,
+# items, enum, minItems, maxItems, minimum, maximum); validate() checks the same keywords strictly
+
+
+class StructuredOutputError(ValueError):
+    """Raised when a model answer is not valid JSON or does not match the requested schema."""
+
+
+def string_list(min_items: int = 0, max_items: Optional[int] = None, enum: Optional[List[str]] = None) -> Dict:
+    """Schema of an array of strings, optionally limited to enum values."""
+    items = {"type": "STRING"}
+    if enum is not None:
+        items["enum"] = list(enum)
+    schema = {"type": "ARRAY", "items": items, "minItems": min_items}
+    if max_items is not None:
+        schema["maxItems"] = max_items
+    return schema
+
+
+def categorized_articles_schema(categories: List[str]) -> Dict:
+    """Answer of categorize_content_with_gemini: the categories of every article, by URL."""
+    return {
+        "type": "OBJECT",
+        "properties": {
+            "categorized_articles": {
+                "type": "ARRAY",
+                "items": {
+                    "type": "OBJECT",
+                    "properties": {
+                        "article_url": {"type": "STRING"},
+                        "categories": string_list(enum=categories),
+                    },
+                    "required": ["article_url", "categories"],
+                },
+            },
+        },
+        "required": ["categorized_articles"],
+    }
+
+
+def category_indices_schema(category_count: int, article_count: int) -> Dict:
+    """Answer of the grd_nws grading prompt: the article indices of every category index."""
+    return {
+        "type": "OBJECT",
+        "properties": {
+            "categories": {
+                "type": "ARRAY",
+                "items": {
+                    "type": "OBJECT",
+                    "properties": {
+                        "category_index": {"type": "INTEGER", "minimum": 0, "maximum": category_count - 1},
+                        "article_indices": {
+                            "type": "ARRAY",
+                            "items": {"type": "INTEGER", "minimum": 0, "maximum": article_count - 1},
+                        },
+                    },
+                    "required": ["category_index", "article_indices"],
+                },
+            },
+        },
+        "required": ["categories"],
+    }
+
+
+def text_fields_schema(*fields: str) -> Dict:
+    """Schema of an object of required, non-structured text fields, e.g. {"title", "summary"}."""
+    return {
+        "type": "OBJECT",
+        "properties": {field: {"type": "STRING"} for field in fields},
+        "required": list(fields),
+    }
+
+
+_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "integer": int,
+    "number": (int, float),
+    "boolean": bool,
+}
+
+
+def validate(instance: Any, schema: Dict, path: str = "$") -> None:
+    """
+    Check instance against schema. Unknown properties are rejected, so a valid answer has
+    exactly the structure that was asked for.
+
+    Raises:
+        StructuredOutputError: At the first mismatch, naming its JSON path
+    """
+    expected = schema.get("type", "").lower()
+    python_type = _TYPES.get(expected)
+    # bool is an int in Python but never a valid JSON integer or number
+    if python_type is None or not isinstance(instance, python_type) or (
+            isinstance(instance, bool) and expected != "boolean"):
+        raise StructuredOutputError(f"{path}: expected {expected}, got {type(instance).__name__}")
+    if "enum" in schema and instance not in schema["enum"]:
+        raise StructuredOutputError(f"{path}: {instance!r} is not one of {schema['enum']}")
+    if "minimum" in schema and instance < schema["minimum"]:
+        raise StructuredOutputError(f"{path}: {instance} is below {schema['minimum']}")
+    if "maximum" in schema and instance > schema["maximum"]:
+        raise StructuredOutputError(f"{path}: {instance} is above {schema['maximum']}")
+    if expected == "object":
+        properties = schema.get("properties", {})
+        for name in schema.get("required", []):
+            if name not in instance:
+                raise StructuredOutputError(f"{path}: missing property {name!r}")
+        for name, value in instance.items():
+            if name not in properties:
+                raise StructuredOutputError(f"{path}: unexpected property {name!r}")
+            validate(value, properties[name], f"{path}.{name}")
+    elif expected == "array":
+        if len(instance) < schema.get("minItems", 0):
+            raise StructuredOutputError(f"{path}: fewer than {schema['minItems']} items")
+        if "maxItems" in schema and len(instance) > schema["maxItems"]:
+            raise StructuredOutputError(f"{path}: more than {schema['maxItems']} items")
+        for index, item in enumerate(instance):
+            validate(item, schema.get("items", {}), f"{path}[{index}]")
+
+
+def parse(text: str, schema: Dict) -> Any:
+    """
+    Parse and validate a JSON answer. Markdown code fences around it are tolerated.
+
+    Raises:
+        StructuredOutputError: If the text is not JSON or does not match schema
+    """
+    text = (text or "").strip()
+    if text.startswith("```"):
+        text = text.split("```")[1]
+        if text[:4].lower() == "json":
+            text = text[4:]
+        text = text.strip()
+    try:
+        data = json.loads(text)
+    except ValueError as e:
+        raise StructuredOutputError(f"invalid JSON: {str(e)}") from e
+    validate(data, schema)
+    return data
+
+
+def response_config(schema: Dict) -> Dict:
+    """generate_content config asking Gemini for JSON constrained to schema."""
+    return {"response_mime_type": "application/json", "response_schema": schema}
+
+
+def repair_prompt(prompt: str, answer: str, error: StructuredOutputError) -> str:
+    """Prompt of the repair pass: the original task, the rejected answer and why it was rejected."""
+    return f"""{prompt}
+
+    Your previous answer was rejected: {str(error)}
+    Previous answer:
+    {answer}
+
+    Return the corrected answer as JSON that matches the required schema exactly, nothing else.
+    """
+
+
+def request_json(generate: Callable[[str, Dict], str], prompt: str, schema: Dict) -> Any:
+    """
+    Ask for a schema-constrained JSON answer and return it parsed and validated. An invalid
+    answer gets one repair request, so a batch costs at most two calls.
+
+    Args:
+        generate (Callable): Sends (prompt, schema) to the model and returns the answer text
+        prompt (str): Task prompt
+        schema (dict): Schema of the answer
+
+    Raises:
+        StructuredOutputError: If the repaired answer is still invalid
+    """
+    answer = generate(prompt, schema)
+    try:
+        return parse(answer, schema)
+    except StructuredOutputError as e:
+        answer = generate(repair_prompt(prompt, answer, e), schema)
+        return parse(answer, schema)
@@ -0,0 +1,99 @@
+import threading
+from concurrent.futures import Future
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# How long a thread waits for an article another thread is fetching before giving up on it
+WAIT_TIMEOUT = 600
+
+
+class UrlRegistry:
+    """
+    Run-scoped registry of article URLs shared by the category threads of one
+    start_gemini_assistant run, so every article is fetched and processed once.
+
+    Fetching: the first thread to claim() a URL owns it and publishes the article (or None)
+    with resolve(); every other thread gets a Future for the owner's result.
+    Processing works the same way: the first thread to claim_processing() an article sends it
+    through relevance and Gemini and publishes its categories with record_categories(); other
+    threads wait_categories() for them instead of sending the article again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._fetches: Dict[str, Future] = {}
+        self._categories: Dict[str, Future] = {}
+
+    def claim(self, url: str) -> Tuple[bool, Future]:
+        """
+        Returns:
+            tuple: (True if the caller owns the URL and must resolve it, Future of the article)
+        """
+        with self._lock:
+            future = self._fetches.get(url)
+            if future is not None:
+                return False, future
+            future = Future()
+            self._fetches[url] = future
+            return True, future
+
+    def resolve(self, url: str, article) -> None:
+        """Publish the fetched article ([title, body]) of an owned URL, None if it was not kept."""
+        with self._lock:
+            future = self._fetches.get(url)
+        if future is not None and not future.done():
+            future.set_result(article)
+
+    def release(self, urls: Iterable[str]) -> None:
+        """Resolve owned URLs that were never resolved (e.g. after an error) so nobody waits on them."""
+        for url in urls:
+            self.resolve(url, None)
+
+    def wait(self, futures: Dict[str, Future], timeout: float = WAIT_TIMEOUT) -> Dict[str, object]:
+        """Wait for articles fetched by other threads, returns {url: article} for the kept ones."""
+        articles = {}
+        for url, future in futures.items():
+            try:
+                article = future.result(timeout=timeout)
+            except Exception:
+                continue
+            if article:
+                articles[url] = article
+        return articles
+
+    def claim_processing(self, url: str) -> Tuple[bool, Future]:
+        """
+        Claim the relevance/Gemini processing of an article, atomically like claim().
+
+        Returns:
+            tuple: (True if the caller owns the article and must record_categories() it,
+                Future of the owner's categories)
+        """
+        with self._lock:
+            future = self._categories.get(url)
+            if future is not None:
+                return False, future
+            future = Future()
+            self._categories[url] = future
+            return True, future
+
+    def record_categories(self, url: str, categories: List[str]) -> None:
+        """Publish the categories of an owned article, an empty list if it was irrelevant."""
+        with self._lock:
+            future = self._categories.setdefault(url, Future())
+        if not future.done():
+            future.set_result(list(categories))
+
+    def release_processing(self, urls: Iterable[str]) -> None:
+        """Record owned articles that got no categories (e.g. after an error) as uncategorized."""
+        for url in urls:
+            self.record_categories(url, [])
+
+    def wait_categories(self, futures: Dict[str, Future], timeout: float = WAIT_TIMEOUT) -> Dict[str, List[str]]:
+        """Wait for articles processed by other threads, returns {url: categories}."""
+        categories = {}
+        for url, future in futures.items():
+            try:
+                categories[url] = list(future.result(timeout=timeout))
+            except Exception:
+                continue
+        return categories
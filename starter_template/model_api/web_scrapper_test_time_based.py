@@ -5,12 +5,41 @@ from urllib.parse import urljoin
 from typing import List, Set, Dict, Any, Optional
 import random
 import time
+from functools import partial
 try:
     from .logging_scripts import *
-    from .web_scrapper_time_based import scrape_with_time_constraint
+    from .web_scrapper_time_based import check_time_constraint, DateProbe
+    from .crawl_engine import get_crawl_engine
+    from .politeness_scheduler import get_scheduler
+    from .http_session_pool import get_session, read_body
+    from .http_cache import get_http_cache
+    from .seen_url_index import get_seen_url_index, OUTCOME_STORED, OUTCOME_OUT_OF_WINDOW, OUTCOME_NO_DATE, OUTCOME_TOO_SHORT, OUTCOME_ERROR
+    from .link_classifier import get_link_classifier
+    from .feed_discovery import discover_feed_urls, parse_feed
+    from .html_parser import make_soup, extract_hrefs
+    from .extraction_rules import get_extraction_rules
+    from .parse_pool import get_parse_pool
+    from .snapshot_archive import get_snapshot_archive
+    from .circuit_breaker import get_circuit_breaker
+    from .high_water_marks import get_high_water_marks
+    from .robots_cache import get_robots_cache
 except ImportError:
     from logging_scripts import *
-    from web_scrapper_time_based import scrape_with_time_constraint
+    from web_scrapper_time_based import check_time_constraint, DateProbe
+    from crawl_engine import get_crawl_engine
+    from politeness_scheduler import get_scheduler
+    from http_session_pool import get_session, read_body
+    from http_cache import get_http_cache
+    from seen_url_index import get_seen_url_index, OUTCOME_STORED, OUTCOME_OUT_OF_WINDOW, OUTCOME_NO_DATE, OUTCOME_TOO_SHORT, OUTCOME_ERROR
+    from link_classifier import get_link_classifier
+    from feed_discovery import discover_feed_urls, parse_feed
+    from html_parser import make_soup, extract_hrefs
+    from extraction_rules import get_extraction_rules
+    from parse_pool import get_parse_pool
+    from snapshot_archive import get_snapshot_archive
+    from circuit_breaker import get_circuit_breaker
+    from high_water_marks import get_high_water_marks
+    from robots_cache import get_robots_cache
 from datetime import datetime, timedelta
 
 
@@ -27,6 +56,31 @@ USER_AGENTS = [
     'Mozilla/5.0 (iPad; CPU OS 14_6 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0 Mobile/15E148 Safari/604.1'
 ]
 
+# Revalidate section and article pages with If-None-Match / If-Modified-Since between runs
+USE_HTTP_CACHE = True
+
+# Skip article links already processed in earlier runs (see seen_url_index)
+USE_SEEN_URL_INDEX = True
+
+# Keep only likely article links (capped per source) before fetching (see link_classifier)
+USE_LINK_CLASSIFIER = True
+
+# Take article links and dates from the source's RSS/Atom feed or news sitemap (FEED_SOURCES in
+# feed_discovery) instead of its section page; FEED_AUTODISCOVERY also uses the feeds linked in the
+# page <head>, which are often site-wide rather than the section's
+USE_FEED_DISCOVERY = False
+FEED_AUTODISCOVERY = False
+
+# Stop downloading an article once its <head> shows it is outside the time window (see DateProbe)
+USE_DATE_PROBE = True
+
+# Walk a section page's links newest-first in batches and stop after EARLY_STOP_AFTER consecutive fetched
+# links that are out of the window and not newer than the source's high-water mark; already processed
+# links are skipped without counting
+USE_INCREMENTAL_SCRAPING = True
+EARLY_STOP_AFTER = 5
+INCREMENTAL_BATCH_SIZE = 8
+
 # Example proxy list - replace with your actual proxy service
 PROXY_LIST = [
     # Format: "http://username:password@ip:port"
@@ -47,116 +101,377 @@ def get_random_proxy() -> Optional[Dict[str, str]]:
     proxy = random.choice(PROXY_LIST)
     return {"http": proxy, "https": proxy}
 
-def make_request(url: str, retry_count: int = 3, delay_range: tuple = (1, 3)) -> requests.Response:
+def make_request(url: str, retry_count: int = 3, delay_range: tuple = (1, 3), cache=None, stop=None) -> requests.Response:
     """
-    Makes an HTTP request with random user agent, delay and optional proxy rotation.
-    Implements retries with exponential backoff.
+    Makes an HTTP request with random user agent and optional proxy rotation over the shared keep-alive session for the host.
+    Requests are spaced per host by the shared domain scheduler, which also honours 429/Retry-After.
+    Implements retries with exponential backoff, delay_range is the base of the backoff.
+    Pages are revalidated against the HTTP cache (the shared one unless cache is given, cache=False disables it);
+    a 304 returns the cached response with response.from_cache set.
+    Bodies are streamed and capped at MAX_RESPONSE_BYTES; stop (see read_body) can end a download
+    early, such responses have response.truncated set and are not cached.
+    Every response is recorded to the snapshot archive; in replay mode it is served from there instead.
+    Timeouts follow the host's observed latency and hosts that keep failing are skipped for the rest of
+    the run: the shared circuit breaker raises CircuitOpenError (a ConnectionError) without a request.
+    URLs disallowed by the host's robots.txt raise RobotsDisallowedError, its Crawl-delay sets the host's rate.
     """
+    archive = get_snapshot_archive()
+    if archive.replaying:
+        return archive.replay(url)
+    
     headers = {"User-Agent": get_random_user_agent()}
     proxies = get_random_proxy()
-    
-    # Add random delay to avoid rate limits
+    # Before the first request to a host, also applies its Crawl-delay to the scheduler
+    get_robots_cache().check(url, headers=headers)
+    scheduler = get_scheduler()
+    breaker = get_circuit_breaker()
+    session = get_session(url)
+    if cache is None and USE_HTTP_CACHE:
+        cache = get_http_cache()
+    if cache:
+        headers.update(cache.conditional_headers(url))
     delay = random.uniform(*delay_range)
-    time.sleep(delay)
     
     attempt = 0
     while attempt < retry_count:
+        # Also stops retrying once other requests to the host opened the circuit
+        breaker.check(url)
+        # Wait only if this host was hit recently or asked us to back off
+        waited = scheduler.acquire(url)
+        if waited > 0:
+            append_to_log(log_file, f'[WEB_SCRAPPER][DBG][{datetime.today().strftime("%H:%M:%S")}] Waited {waited:.2f}s for host slot of {url}')
+        rate_limited = False
+        response = None
+        timeout = breaker.timeout(url)
         try:
             if proxies:
                 append_to_log(log_file, f'[WEB_SCRAPPER][INF][{datetime.today().strftime("%H:%M:%S")}] Requesting {url} with proxy')
-                response = requests.get(url, headers=headers, proxies=proxies, timeout=10)
+                response = session.get(url, headers=headers, proxies=proxies, timeout=timeout, stream=True)
             else:
                 append_to_log(log_file, f'[WEB_SCRAPPER][INF][{datetime.today().strftime("%H:%M:%S")}] Requesting {url} without proxy')
-                response = requests.get(url, headers=headers, timeout=10)
+                response = session.get(url, headers=headers, timeout=timeout, stream=True)
+            if breaker.record_response(url, response.status_code, response.elapsed.total_seconds(),
+                                       throttled=bool(response.headers.get("Retry-After"))):
+                append_to_log(log_file, f'[WEB_SCRAPPER][WAR][{datetime.today().strftime("%H:%M:%S")}] Circuit opened for {url}, skipping its host for this run')
+            read_body(response, stop=stop if response.status_code == 200 else None)
             
+            if cache:
+                response = cache.handle(url, response)
+                if response.status_code == 304:
+                    # Cache entry disappeared after the conditional request was built, request the full page
+                    # through the same host slot, circuit breaker and cache handling as any other request
+                    conditional = [headers.pop(name, None) for name in ('If-None-Match', 'If-Modified-Since')]
+                    if any(conditional):
+                        append_to_log(log_file, f'[WEB_SCRAPPER][WAR][{datetime.today().strftime("%H:%M:%S")}] Cached copy of {url} is gone, requesting the full page')
+                        continue
+                elif getattr(response, "from_cache", False):
+                    append_to_log(log_file, f'[WEB_SCRAPPER][INF][{datetime.today().strftime("%H:%M:%S")}] {url} not modified, using cached copy')
+            
+            if response.status_code == 429 or (response.status_code == 503 and response.headers.get("Retry-After")):
+                rate_limited = True
+                blocked_for = scheduler.penalize(url, response.headers.get("Retry-After"))
+                append_to_log(log_file, f'[WEB_SCRAPPER][WAR][{datetime.today().strftime("%H:%M:%S")}] {response.status_code} from {url}, host blocked for {blocked_for:.2f}s')
             response.raise_for_status()
+            scheduler.record_success(url)
+            archive.record(url, response)
             return response
         except requests.RequestException as e:
+            # Connection errors and timeouts; answers were recorded above
+            if response is None and breaker.record_failure(url):
+                append_to_log(log_file, f'[WEB_SCRAPPER][WAR][{datetime.today().strftime("%H:%M:%S")}] Circuit opened for {url}, skipping its host for this run')
             attempt += 1
             if attempt == retry_count:
                 raise
-            # Exponential backoff
-            wait_time = delay * (2 ** attempt)
-            append_to_log(log_file, f'[WEB_SCRAPPER][WAR][{datetime.today().strftime("%H:%M:%S")}] Request failed, retrying in {wait_time:.2f}s: {str(e)}')
-            time.sleep(wait_time)
+            if rate_limited:
+                # The scheduler already holds this host back for the server-requested time
+                append_to_log(log_file, f'[WEB_SCRAPPER][WAR][{datetime.today().strftime("%H:%M:%S")}] Request rate limited, retrying after host back-off: {str(e)}')
+            else:
+                # Exponential backoff
+                wait_time = delay * (2 ** attempt)
+                append_to_log(log_file, f'[WEB_SCRAPPER][WAR][{datetime.today().strftime("%H:%M:%S")}] Request failed, retrying in {wait_time:.2f}s: {str(e)}')
+                time.sleep(wait_time)
             # Rotate proxy on failure if available
             if PROXY_LIST:
                 proxies = get_random_proxy()
 
-def get_links_and_content_from_page(url: str) -> dict:
+def get_time_window(current_time: Optional[datetime] = None) -> Dict[str, str]:
+    """
+    Returns the scraping time window for the current run: 06:00 to now during the day,
+    18:00 to 06:00 overnight.
+    
+    Returns:
+        dict: {"start_date", "start_time", "end_date", "end_time", "time_period"}
+    """
+    # Get current time to determine time constraints
+    current_time = current_time or datetime.now()
+    current_hour = current_time.hour
+    
+    # Set time constraints based on current time
+    if 6 <= current_hour < 18:  # Between 6am and 6pm
+        # Today from 6am to current time
+        start_date = current_time.strftime("%Y-%m-%d")
+        start_time = "06:00"
+        end_date = current_time.strftime("%Y-%m-%d")
+        end_time = current_time.strftime("%H:%M")
+        time_period = "morning to now"
+    else:  # Between 6pm and 6am
+        if current_hour >= 18:  # Evening (6pm to midnight)
+            start_date = current_time.strftime("%Y-%m-%d")  # Today
+            start_time = "18:00"
+            end_date = (current_time + timedelta(days=1)).strftime("%Y-%m-%d")  # Tomorrow
+            end_time = "06:00"
+            time_period = "evening to early morning"
+        else:  # Early morning (midnight to 6am)
+            start_date = (current_time - timedelta(days=1)).strftime("%Y-%m-%d")  # Yesterday
+            start_time = "18:00"
+            end_date = current_time.strftime("%Y-%m-%d")  # Today
+            end_time = "06:00"
+            time_period = "evening to now"
+    
+    return {
+        "start_date": start_date,
+        "start_time": start_time,
+        "end_date": end_date,
+        "end_time": end_time,
+        "time_period": time_period
+    }
+
+def get_links_from_feeds(url: str, html: str, time_window: Dict[str, str], outcomes: List) -> Optional[List[str]]:
+    """
+    Discovery through the RSS/Atom feed or news sitemap of a section page.
+    Entries dated outside the time window are dropped without fetching the article
+    (too old ones are recorded in outcomes), undated entries are kept for the normal date check.
+    
+    Returns:
+        list: Candidate article links, or None if the source has no usable feed
+    """
+    feed_entries = []
+    for feed_url in discover_feed_urls(url, html, autodiscover=FEED_AUTODISCOVERY):
+        try:
+            feed_response = make_request(feed_url)
+        except requests.exceptions.RequestException as e:
+            append_to_log(log_file, f'[WEB_SCRAPPER][WAR][{datetime.today().strftime("%H:%M:%S")}] Could not fetch feed {feed_url}: {e}')
+            continue
+        entries = parse_feed(feed_response.content)
+        append_to_log(log_file, f'[WEB_SCRAPPER][INF][{datetime.today().strftime("%H:%M:%S")}] Read {len(entries)} entries from feed {feed_url}')
+        feed_entries.extend(entries)
+    
+    if not feed_entries:
+        return None
+    
+    links = []
+    for link, pub_date in feed_entries:
+        if link in links:
+            continue
+        if pub_date is None:
+            links.append(link)
+            continue
+        time_result = check_time_constraint(pub_date, link, **{key: time_window[key] for key in ("start_date", "start_time", "end_date", "end_time")})
+        if time_result["valid"]:
+            links.append(link)
+        elif time_result["reason"] and time_result["reason"].startswith("Article too old"):
+            outcomes.append((link, OUTCOME_OUT_OF_WINDOW))
+    append_to_log(log_file, f'[WEB_SCRAPPER][INF][{datetime.today().strftime("%H:%M:%S")}] Feeds of {url}: {len(links)} of {len(feed_entries)} entries in the time window')
+    return links
+
+def has_article_body(article: Dict[str, Any]) -> bool:
+    """True if a fetched article (see fetch_article) has a body of at least 20 words."""
+    article_content = article["content"]
+    return (isinstance(article_content, list) and len(article_content) == 2
+            and bool(article_content[1]) and len(article_content[1].split()) >= 20)
+
+def check_article(link: str, article: Dict[str, Any], time_window: Dict[str, str], content: dict, outcomes: List) -> Optional[str]:
+    """
+    Checks a fetched article (see fetch_article) against the time window and its length.
+    Kept articles are added to content, the outcome is appended to outcomes.
+    
+    Returns:
+        str: The seen_url_index outcome of the article, None if none applies
+    """
+    append_to_log(log_file, f'[WEB_SCRAPPER][INF][{datetime.today().strftime("%H:%M:%S")}] Checking time constraints for {link}')
+    print(f"Checking time constraints for {link}")
+    
+    outcome = None
+    if article["error"]:
+        time_result = {"valid": False, "timestamp": None, "url": link, "reason": article["error"]}
+        outcome = OUTCOME_ERROR
+    else:
+        time_result = check_time_constraint(
+            article["pub_date"],
+            link,
+            **{key: time_window[key] for key in ("start_date", "start_time", "end_date", "end_time")}
+        )
+    
+    print(f"Time constraint check result: {time_result}")
+    append_to_log(log_file, f'[WEB_SCRAPPER][INF][{datetime.today().strftime("%H:%M:%S")}] Time constraint check result: {time_result}')
+    
+    # Only process articles that meet the time constraint
+    if time_result["valid"]:
+        append_to_log(log_file, f'[WEB_SCRAPPER][INF][{datetime.today().strftime("%H:%M:%S")}] Getting content from {link}')
+        print(f"Extracting content from {link}")
+        article_content = article["content"]
+        
+        # Check if content is valid and has enough words
+        if isinstance(article_content, list) and len(article_content) == 2:
+            # Check if body text has at least 20 words
+            if has_article_body(article):
+                content[link] = article_content
+                outcome = OUTCOME_STORED
+            else:
+                outcome = OUTCOME_TOO_SHORT
+                message = "Missing Content: Less than 20 words"
+                append_to_log(log_file, f'[WEB_SCRAPPER][INF][{datetime.today().strftime("%H:%M:%S")}] Skipping {link}: {message}')
+                print(f"Skipping {link}: {message}")
+        else:
+            outcome = OUTCOME_TOO_SHORT
+            message = "Missing Content"
+            append_to_log(log_file, f'[WEB_SCRAPPER][INF][{datetime.today().strftime("%H:%M:%S")}] Skipping {link}: {message}')
+            print(f"Skipping {link}: {message}")
+    else:
+        reason = time_result.get("reason", "Did not meet time constraints")
+        if not article["error"]:
+            if not article["pub_date"]:
+                outcome = OUTCOME_NO_DATE
+            elif reason and reason.startswith("Article too old"):
+                outcome = OUTCOME_OUT_OF_WINDOW
+        append_to_log(log_file, f'[WEB_SCRAPPER][INF][{datetime.today().strftime("%H:%M:%S")}] Skipping {link}: {reason}')
+        print(f"Skipping {link}: {reason}")
+    
+    if outcome is not None:
+        outcomes.append((link, outcome))
+    return outcome
+
+def get_links_and_content_from_page(url: str, registry=None) -> dict:
+    """
+    Scrapes the in-window articles linked from a section page.
+    Links are fetched in page order and, with USE_INCREMENTAL_SCRAPING, the walk stops once the page
+    has passed into articles covered by earlier runs (see high_water_marks).
+    With a registry (url_registry.UrlRegistry) shared by several threads, links claimed by
+    another thread are not fetched again; their articles are taken from that thread instead.
+    When replaying a snapshot archive the recorded time window is used and nothing learned
+    (seen links, high-water marks, link patterns, derived cache entries) is saved.
+    
+    Returns:
+        dict: {article_url: [title, body]}
+    """
+    owned_links = []
     try:
-        response = make_request(url)
-        links = extract_links_from_html(response.text, url)
+        archive = get_snapshot_archive()
+        time_window = archive.time_window(get_time_window())
+        start_date = time_window["start_date"]
+        start_time = time_window["start_time"]
+        end_date = time_window["end_date"]
+        end_time = time_window["end_time"]
+        time_period = time_window["time_period"]
+        
+        append_to_log(log_file, f'[WEB_SCRAPPER][INF][{datetime.today().strftime("%H:%M:%S")}] Using time constraint: {time_period} ({start_date} {start_time} to {end_date} {end_time})')
+        print(f"Using time constraint: {time_period} ({start_date} {start_time} to {end_date} {end_time})")
+        window = f"{start_date}_{start_time}"
+        outcomes = []
         content = {}
         
-        # Get current time to determine time constraints
-        current_time = datetime.now()
-        current_hour = current_time.hour
+        response = make_request(url)
+        links = None
         
-        # Set time constraints based on current time
-        if 6 <= current_hour < 18:  # Between 6am and 6pm
-            # Today from 6am to current time
-            start_date = current_time.strftime("%Y-%m-%d")
-            start_time = "06:00"
-            end_date = current_time.strftime("%Y-%m-%d")
-            end_time = current_time.strftime("%H:%M")
-            time_period = "morning to now"
-        else:  # Between 6pm and 6am
-            if current_hour >= 18:  # Evening (6pm to midnight)
-                start_date = current_time.strftime("%Y-%m-%d")  # Today
-                start_time = "18:00"
-                end_date = (current_time + timedelta(days=1)).strftime("%Y-%m-%d")  # Tomorrow
-                end_time = "06:00"
-                time_period = "evening to early morning"
-            else:  # Early morning (midnight to 6am)
-                start_date = (current_time - timedelta(days=1)).strftime("%Y-%m-%d")  # Yesterday
-                start_time = "18:00"
-                end_date = current_time.strftime("%Y-%m-%d")  # Today
-                end_time = "06:00"
-                time_period = "evening to now"
+        # Feed-capable sources are filtered by publication date before any article is fetched
+        if USE_FEED_DISCOVERY:
+            links = get_links_from_feeds(url, response.text, time_window, outcomes)
         
-        append_to_log(log_file, f'[WEB_SCRAPPER][INF][{current_time.strftime("%H:%M:%S")}] Using time constraint: {time_period} ({start_date} {start_time} to {end_date} {end_time})')
-        print(f"Using time constraint: {time_period} ({start_date} {start_time} to {end_date} {end_time})")
+        # Otherwise fall back to scraping the links of the HTML section page
+        if links is None:
+            if getattr(response, "from_cache", False):
+                links = get_http_cache().get_derived(url, "links")
+            if links is None:
+                links = extract_links_from_html(response.text, url)
+                if USE_HTTP_CACHE and not archive.replaying:
+                    get_http_cache().put_derived(url, "links", links)
         
-        for link in links:
-            append_to_log(log_file, f'[WEB_SCRAPPER][INF][{datetime.today().strftime("%H:%M:%S")}] Checking time constraints for {link}')
-            print(f"Checking time constraints for {link}")
-            
-            # Check if article meets time constraints
-            time_result = scrape_with_time_constraint(
-                link,
-                start_date=start_date,
-                start_time=start_time,
-                end_date=end_date,
-                end_time=end_time
-            )
+        # Feed and page links alike are limited to likely same-site articles, capped per source
+        if USE_LINK_CLASSIFIER:
+            candidate_count = len(links)
+            links = get_link_classifier().select(links, url)
+            append_to_log(log_file, f'[WEB_SCRAPPER][INF][{datetime.today().strftime("%H:%M:%S")}] Kept {len(links)} of {candidate_count} links from {url} as likely articles')
+        
+        # Links already processed in an earlier run are never fetched again
+        seen_index = get_seen_url_index() if USE_SEEN_URL_INDEX else None
+        seen = seen_index.seen_urls(links, window) if seen_index else set()
+        if seen:
+            append_to_log(log_file, f'[WEB_SCRAPPER][INF][{datetime.today().strftime("%H:%M:%S")}] Skipping {len(seen)} already processed links from {url}')
+        links = [link for link in links if link not in seen]
+        
+        fetch = fetch_article
+        if USE_DATE_PROBE:
+            fetch = partial(fetch_article, time_window={key: time_window[key] for key in ("start_date", "start_time", "end_date", "end_time")})
+        marks = get_high_water_marks() if USE_INCREMENTAL_SCRAPING else None
+        batch_size = INCREMENTAL_BATCH_SIZE if USE_INCREMENTAL_SCRAPING else max(1, len(links))
+        
+        # Fetch the links in page order, a batch at a time, until the page has passed into covered articles
+        claimed_elsewhere = {}
+        link_observations = []
+        stale_streak = 0
+        stop_early = False
+        newest = None
+        position = 0
+        while position < len(links) and not stop_early:
+            batch = links[position:position + batch_size]
+            position += len(batch)
+            to_fetch = []
+            for link in batch:
+                # Links another thread of this run is already fetching are waited for instead
+                if registry is not None:
+                    is_owner, future = registry.claim(link)
+                    if not is_owner:
+                        claimed_elsewhere[link] = future
+                        continue
+                    owned_links.append(link)
+                to_fetch.append(link)
             
-            print(f"Time constraint check result: {time_result}")
-            append_to_log(log_file, f'[WEB_SCRAPPER][INF][{datetime.today().strftime("%H:%M:%S")}] Time constraint check result: {time_result}')
+            # Fetch and parse the batch concurrently, each article only once
+            append_to_log(log_file, f'[WEB_SCRAPPER][INF][{datetime.today().strftime("%H:%M:%S")}] Fetching {len(to_fetch)} links from {url}')
+            articles = get_crawl_engine().crawl(to_fetch, fetch)
             
-            # Only process articles that meet the time constraint
-            if time_result["valid"]:
-                append_to_log(log_file, f'[WEB_SCRAPPER][INF][{datetime.today().strftime("%H:%M:%S")}] Getting content from {link}')
-                print(f"Extracting content from {link}")
-                article_content = extract_news_content(link)
-                
-                # Check if content is valid and has enough words
-                if isinstance(article_content, list) and len(article_content) == 2:
-                    # Check if body text has at least 20 words
-                    if article_content[1] and len(article_content[1].split()) >= 20:
-                        content[link] = article_content
-                    else:
-                        message = "Missing Content: Less than 20 words"
-                        append_to_log(log_file, f'[WEB_SCRAPPER][INF][{datetime.today().strftime("%H:%M:%S")}] Skipping {link}: {message}')
-                        print(f"Skipping {link}: {message}")
-                else:
-                    message = "Missing Content"
-                    append_to_log(log_file, f'[WEB_SCRAPPER][INF][{datetime.today().strftime("%H:%M:%S")}] Skipping {link}: {message}')
-                    print(f"Skipping {link}: {message}")
-            else:
-                reason = time_result.get("reason", "Did not meet time constraints")
-                append_to_log(log_file, f'[WEB_SCRAPPER][INF][{datetime.today().strftime("%H:%M:%S")}] Skipping {link}: {reason}')
-                print(f"Skipping {link}: {reason}")
+            for link in batch:
+                if link in claimed_elsewhere:
+                    continue
+                article = articles[link]
+                if isinstance(article, Exception):
+                    article = {"url": link, "pub_date": None, "content": None, "error": f"Error: {str(article)}"}
+                outcome = check_article(link, article, time_window, content, outcomes)
+                # The classifier learns from pages that clearly were articles, or clearly were not: no
+                # date and no body. A dated page that was too short (e.g. paywalled), or an article whose
+                # date could not be read, may be a temporary failure and is not held against its URL shape
+                if outcome in (OUTCOME_STORED, OUTCOME_OUT_OF_WINDOW):
+                    link_observations.append((link, True))
+                elif outcome == OUTCOME_NO_DATE and not has_article_body(article):
+                    link_observations.append((link, False))
+                # Only articles an earlier run already passed count, a page may list old pinned articles above new ones
+                if outcome == OUTCOME_OUT_OF_WINDOW and marks and marks.is_below(url, link, article["pub_date"]):
+                    stale_streak += 1
+                elif outcome is not None and outcome != OUTCOME_ERROR:
+                    stale_streak = 0
+                if outcome == OUTCOME_STORED and (newest is None or article["pub_date"].replace(tzinfo=None) > newest[1].replace(tzinfo=None)):
+                    newest = (link, article["pub_date"])
+                # Articles of the batch already fetched are still kept
+                stop_early = stop_early or (USE_INCREMENTAL_SCRAPING and stale_streak >= EARLY_STOP_AFTER)
+            if stop_early and position < len(links):
+                append_to_log(log_file, f'[WEB_SCRAPPER][INF][{datetime.today().strftime("%H:%M:%S")}] Reached old articles on {url}, skipping its remaining {len(links) - position} links')
+        if claimed_elsewhere:
+            append_to_log(log_file, f'[WEB_SCRAPPER][INF][{datetime.today().strftime("%H:%M:%S")}] {len(claimed_elsewhere)} links from {url} are fetched by another thread')
+        if marks and newest and not archive.replaying:
+            marks.advance(url, *newest)
+        
+        if seen_index and not archive.replaying:
+            # Stored articles are recorded by mark_stored once they are in the database
+            seen_index.mark_many([(link, outcome) for link, outcome in outcomes if outcome != OUTCOME_STORED], window, source=url)
+        if USE_LINK_CLASSIFIER and not archive.replaying:
+            # Teach the classifier which URL shapes of this site lead to real articles
+            get_link_classifier().learn(link_observations)
+        
+        if registry is not None:
+            # Publish own results first so threads waiting on each other never deadlock
+            for link in owned_links:
+                registry.resolve(link, content.get(link))
+            content.update(registry.wait(claimed_elsewhere))
         
         if content:
             append_to_log(log_file, f'[WEB_SCRAPPER][SUC][{datetime.today().strftime("%H:%M:%S")}] Extracted successfully from {url}')
@@ -169,43 +484,89 @@ def get_links_and_content_from_page(url: str) -> dict:
         append_to_log(log_file, f'[WEB_SCRAPPER][ERR][{datetime.today().strftime("%H:%M:%S")}] Error processing {url}: {str(e)}')
         print(f"Error processing {url}: {str(e)}")
         return {}
+    finally:
+        if registry is not None:
+            registry.release(owned_links)
+
+
+def mark_stored(links: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Record the articles of links ({section_url: {article_url: content}}, as returned by
+    get_links_and_content_from_page) as stored in the seen-URL index. Called once they are in
+    the database, so articles of a run that failed to store them are processed again.
+    Nothing is recorded when replaying a snapshot archive.
+    """
+    archive = get_snapshot_archive()
+    if not USE_SEEN_URL_INDEX or archive.replaying:
+        return
+    time_window = archive.time_window(get_time_window())
+    window = f"{time_window['start_date']}_{time_window['start_time']}"
+    seen_index = get_seen_url_index()
+    for url, articles in links.items():
+        seen_index.mark_many([(link, OUTCOME_STORED) for link in articles], window, source=url)
+
+
+def fetch_article(page: str, time_window: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    Fetches an article page once and extracts everything the pipeline needs from a single parsed tree,
+    built by a parser process.
+    With a time_window (check_time_constraint keyword arguments) the download stops after the
+    <head> if the article is outside it; only pub_date is set then.
+    What was extracted is kept in the HTTP cache for the next 304, except when replaying a snapshot archive.
+    
+    Returns:
+        dict: {"url", "pub_date", "content", "error"} where content is [title, body] or an error
+              string (same contract as extract_news_content) and error is set only when the fetch failed.
+    """
+    article = {"url": page, "pub_date": None, "content": None, "error": None}
+    probe = DateProbe(page, time_window) if time_window else None
+    try:
+        response = make_request(page, stop=probe)
+    except requests.exceptions.RequestException as e:
+        append_to_log(log_file,f'[WEB_SCRAPPER][ERR][{datetime.today().strftime("%H:%M:%S")}] Could not fetch page: {e}')
+        article["error"] = f"Error: Could not fetch page: {e}"
+        return article
+
+    if probe and probe.rejected:
+        append_to_log(log_file,f'[WEB_SCRAPPER][INF][{datetime.today().strftime("%H:%M:%S")}] Stopped download of {page} after {len(response.content)} bytes, published {probe.pub_date}')
+        article["pub_date"] = probe.pub_date
+        return article
+
+    # An unchanged page (304) reuses what was extracted from it last time
+    if getattr(response, "from_cache", False):
+        derived = get_http_cache().get_derived(page, "article")
+        if derived:
+            article["pub_date"] = datetime.fromisoformat(derived["pub_date"]) if derived["pub_date"] else None
+            article["content"] = derived["content"]
+            return article
+
+    try:
+        # Parsing runs in a parser process, this thread only downloads (see parse_pool)
+        record = get_parse_pool().parse(page, response.text)
+        article["pub_date"] = datetime.fromisoformat(record["pub_date"]) if record["pub_date"] else None
+        article["content"] = record["content"]
+        if isinstance(article["content"], str):
+            append_to_log(log_file,f'[WEB_SCRAPPER][ERR][{datetime.today().strftime("%H:%M:%S")}] {article["content"]} for {page}')
+        if USE_HTTP_CACHE and not get_snapshot_archive().replaying:
+            get_http_cache().put_derived(page, "article", {
+                "pub_date": record["pub_date"],
+                "content": article["content"]
+            })
+    except Exception as e:
+        append_to_log(log_file,f'[WEB_SCRAPPER][ERR][{datetime.today().strftime("%H:%M:%S")}] An unexpected error occurred: {e}')
+        article["error"] = f"Error: An unexpected error occurred: {e}"
+    return article
 
 
 def extract_news_content(page: str) -> List[str]:
     """
-    Extracts article title and body from a news URL using BeautifulSoup.
+    Extracts article title and body from a news URL using the configured HTML parser.
     Works best on article pages. Returns title, body or an error message.
     """
     try:       
         response = make_request(page)
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        # Attempt to find the title
-        title = soup.find('h1') or soup.find('h2')
-        if title:
-          title = title.text.strip()
-        else:
-           append_to_log(log_file,f'[WEB_SCRAPPER][ERR][{datetime.today().strftime("%H:%M:%S")}] Could not find article title')
-           return "Error: Could not find an article title"
-
-        # Attempt to find the main article body
-        article_body = soup.find('div', class_=['article-content', 'article-body', 'body-content', 'article-text', 'content']) # Common article body classes, can expand as needed
-        if article_body:
-           paragraphs = article_body.find_all('p')
-           body_text = "\n".join([p.text.strip() for p in paragraphs])
-        else:
-            # If a specific article-body div isn't found, fallback to all paragraphs in the main content (risky!)
-            main_content = (soup.find('main') or 
-                            soup.find('div', id='main') or 
-                            soup.find('div', class_="container")) # Common main content areas, you can expand this too
-            if main_content:
-                paragraphs = main_content.find_all('p')
-                body_text = "\n".join([p.text.strip() for p in paragraphs])
-            else:
-                append_to_log(log_file,f'[WEB_SCRAPPER][ERR][{datetime.today().strftime("%H:%M:%S")}] Could not find article body ')
-                return "Error: Could not find an article body"
-
-        return [title, body_text]
+        soup = make_soup(response.text)
+        return extract_content_from_soup(soup, page)
     except requests.exceptions.RequestException as e:
        append_to_log(log_file,f'[WEB_SCRAPPER][ERR][{datetime.today().strftime("%H:%M:%S")}] Could not fetch page: {e}')
        return f"Error: Could not fetch page: {e}"
@@ -214,14 +575,26 @@ def extract_news_content(page: str) -> List[str]:
         return f"Error: An unexpected error occurred: {e}"
 
 
+def extract_content_from_soup(soup: BeautifulSoup, url: Optional[str] = None) -> List[str]:
+    """
+    Extracts article title and body from an already parsed article page,
+    using the extraction rules for the domain of url (see extraction_rules).
+    Returns [title, body] or an error message.
+    """
+    content = get_extraction_rules().extract(soup, url)
+    if isinstance(content, str):
+        append_to_log(log_file,f'[WEB_SCRAPPER][ERR][{datetime.today().strftime("%H:%M:%S")}] {content} for {url}')
+    return content
+
+
 def extract_links_from_html(html_content: str, base_url: str) -> List[str]:
     """Extract and normalize links from HTML content."""
-    soup = BeautifulSoup(html_content, 'html.parser')
-    links: Set[str] = set()
-    for a in soup.find_all('a', href=True):
-        href = a['href']
+    # Kept in page order, section pages list the newest articles first
+    links: Dict[str, None] = {}
+    # Only the <a href> tags are parsed (see html_parser)
+    for href in extract_hrefs(html_content):
         # Normalize URL
         full_url = urljoin(base_url, href)
         if full_url.startswith('http'):
-            links.add(full_url)
-    return links
+            links[full_url] = None
+    return list(links)
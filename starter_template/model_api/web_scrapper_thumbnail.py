@@ -6,7 +6,7 @@ from datetime import datetime, timedelta
 import argparse
 from dotenv import load_dotenv
 import urllib.parse
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import random
 import re
 import google.generativeai as google_genai
@@ -15,8 +15,6 @@ import socket
 import ssl
 import http.client
 from fake_useragent import UserAgent
-from urllib3.util.retry import Retry
-from requests.adapters import HTTPAdapter
 import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from queue import Queue
@@ -27,11 +25,27 @@ try:
     # Try relative imports (for Django)
     from .mongo import db
     from .logging_scripts import *
+    from .politeness_scheduler import get_scheduler
+    from .http_session_pool import get_session
+    from .html_parser import make_soup, select_attrs
+    from .robots_cache import get_robots_cache
+    from . import dns_cache
+    from .llm_gateway import get_llm_gateway, estimate_tokens
+    from .llm_cache import get_llm_cache
+    from .structured_output import StructuredOutputError, parse, request_json, response_config, string_list
 except ImportError:
     try:
         # Try absolute imports (for standalone script)
         from mongo import db
         from logging_scripts import *
+        from politeness_scheduler import get_scheduler
+        from http_session_pool import get_session
+        from html_parser import make_soup, select_attrs
+        from robots_cache import get_robots_cache
+        import dns_cache
+        from llm_gateway import get_llm_gateway, estimate_tokens
+        from llm_cache import get_llm_cache
+        from structured_output import StructuredOutputError, parse, request_json, response_config, string_list
     except ImportError:
         print("Warning: Could not import some modules. Some functionality may be limited.")
         # Define fallback or dummy functions/variables if needed
@@ -50,7 +64,8 @@ class ThumbnailScraper:
         print(os.getenv('GEMINI_API_KEY'), " GEMINI_API_KEY")
         # exit(0)
         self.api_key = os.getenv('GEMINI_API_KEY')
-        self.client = genai.Client(api_key=self.api_key)
+        # Shared by every Gemini caller of the process, see llm_gateway
+        self.client = get_llm_gateway().client("gemini")
             
         # Connect to database
         self.web_db = db['envisage_web']
@@ -248,38 +263,33 @@ class ThumbnailScraper:
         """
         Makes an HTTP request with advanced techniques to avoid bot detection.
         
+        Requests are spaced per host by the shared domain scheduler instead of a blind
+        sleep, so searches and downloads on different hosts do not wait on each other.
+        URLs disallowed by the host's robots.txt are not requested, its Crawl-delay sets the host's rate.
+        
         Args:
             url (str): URL to request
             retry_count (int): Number of retry attempts
-            delay_range (tuple): Min and max delay between requests
+            delay_range (tuple): Min and max base delay for the backoff between attempts
             
         Returns:
             requests.Response: Response object or None if all attempts fail
         """
-        # Add random delay before request
+        scheduler = get_scheduler()
         delay = random.uniform(*delay_range)
-        time.sleep(delay)
         
         # Increment total requests counter
         self.approach_stats["total_requests"] += 1
         
+        if not get_robots_cache().allowed(url, headers=self.get_browser_like_headers()):
+            self.log_msg(f"Skipping {url}, disallowed by robots.txt", "WARN")
+            self.approach_stats["total_failure"] += 1
+            return None
+        
         # Try different approaches across retry attempts
         for attempt in range(retry_count):
-            # Create a fresh session for each attempt
-            session = requests.Session()
-            
-            # Configure retry strategy with backoff
-            retry_strategy = Retry(
-                total=2,  # number of retries
-                status_forcelist=[429, 500, 502, 503, 504],
-                allowed_methods=["GET", "HEAD"],
-                backoff_factor=1
-            )
-            
-            # Mount the adapter to both http and https
-            adapter = HTTPAdapter(max_retries=retry_strategy)
-            session.mount("http://", adapter)
-            session.mount("https://", adapter)
+            # Reuse the pooled keep-alive session (with retry adapter) for this host
+            session = get_session(url)
             
             # Get fresh headers and proxy for this attempt
             headers = self.get_browser_like_headers()
@@ -287,6 +297,7 @@ class ThumbnailScraper:
             
             approach_key = f"approach_{attempt+1}"
             self.log_msg(f"Attempt #{attempt+1}/{retry_count} for {url}", "INF")
+            rate_limited = False
             
             try:
                 # Different approaches based on the attempt number
@@ -294,15 +305,18 @@ class ThumbnailScraper:
                     # First attempt: Direct request with standard browser-like behavior
                     self.log_msg(f"Using standard browser approach for {url}", "DBG")
                     
-                    # Visit a related site first to establish cookies and browsing history
-                    if "unsplash" in url:
-                        session.get("https://unsplash.com/", headers=headers, timeout=10)
-                    elif "pexels" in url:
-                        session.get("https://www.pexels.com/", headers=headers, timeout=10)
-                    
-                    time.sleep(random.uniform(1, 2))
+                    # Visit a related site first to establish cookies and browsing history,
+                    # only needed once since the pooled session keeps its cookies
+                    if not session.cookies:
+                        if "unsplash" in url:
+                            scheduler.acquire("https://unsplash.com/")
+                            session.get("https://unsplash.com/", headers=headers, timeout=10)
+                        elif "pexels" in url:
+                            scheduler.acquire("https://www.pexels.com/")
+                            session.get("https://www.pexels.com/", headers=headers, timeout=10)
                     
                     # Make the actual request with the same session
+                    scheduler.acquire(url)
                     response = session.get(
                         url,
                         headers=headers,
@@ -319,6 +333,7 @@ class ThumbnailScraper:
                     simple_url = url.split('?')[0]
                     
                     # Different header set with a proxy
+                    scheduler.acquire(simple_url)
                     response = session.get(
                         simple_url,
                         headers=headers,
@@ -338,6 +353,7 @@ class ThumbnailScraper:
                         path += '?' + parsed_url.query
                     
                     # Custom low-level HTTP request to bypass some bot detection
+                    scheduler.acquire(url)
                     connection = http.client.HTTPSConnection(parsed_url.netloc, timeout=15)
                     
                     # Add headers one by one
@@ -369,6 +385,7 @@ class ThumbnailScraper:
                         "Connection": "keep-alive"
                     }
                     
+                    scheduler.acquire(url)
                     response = session.get(
                         url,
                         headers=googlebot_headers,
@@ -386,14 +403,19 @@ class ThumbnailScraper:
                     # Print stats periodically
                     if self.approach_stats["total_requests"] % 10 == 0:
                         self.print_approach_stats()
-                    # Add a small delay after success to mimic browser behavior
-                    time.sleep(random.uniform(0.5, 1.0))
+                    scheduler.record_success(url)
                     return response
                 else:
                     self.log_msg(f"Request returned status code {response.status_code} with approach #{attempt+1}", "WARN")
                     # Update failure stats
                     self.approach_stats[approach_key]["failure"] += 1
                     
+                    # Rate limited: block this host for the time the server asked for
+                    if response.status_code == 429 or (response.status_code == 503 and response.headers.get("Retry-After")):
+                        rate_limited = True
+                        blocked_for = scheduler.penalize(url, response.headers.get("Retry-After"))
+                        self.log_msg(f"Rate limited by {urllib.parse.urlparse(url).netloc}, host blocked for {blocked_for:.2f}s", "WARN")
+                    
                     # Check if we're hitting CAPTCHA or bot detection
                     if response.status_code == 403:
                         # Look for signs of bot detection in response
@@ -416,6 +438,10 @@ class ThumbnailScraper:
                 # Update failure stats
                 self.approach_stats[approach_key]["failure"] += 1
             
+            # The scheduler already holds a rate limited host back, no extra sleep needed
+            if rate_limited:
+                continue
+            
             # Wait before next attempt with exponential backoff
             backoff_factor = (2 ** attempt)
             wait_time = delay * backoff_factor * (0.75 + random.random() * 0.5)  # Add jitter
@@ -606,24 +632,12 @@ class ThumbnailScraper:
             # Log the request being sent
             print(f"DEBUG: Sending request to Gemini API with prompt length: {len(prompt)} characters")
             
-            # Make the request to Gemini
-            response = self.openai_api_request(prompt)
-            
-            response_text = response.text
-            print(f"DEBUG: Received response from Gemini: {response_text}")
-            
-            # Clean up the response text to ensure it's valid JSON
-            if "```" in response_text:
-                response_text = response_text.split("```")[1].split("```")[0].strip()
-                
-            if response_text.startswith('json') or response_text.startswith('JSON'):
-                response_text = response_text[4:].strip()
-                
             try:
-                # Parse JSON response
-                search_terms = json.loads(response_text)
-                if not isinstance(search_terms, list):
-                    raise ValueError("Response is not a list")
+                # Make the request to Gemini, constrained to a JSON array of strings; an invalid
+                # answer gets one repair request
+                search_terms = request_json(
+                    lambda prompt_text, schema: self.openai_api_request(prompt_text, response_schema=schema).text,
+                    prompt, string_list(min_items=1, max_items=10))
                     
                 print(f"DEBUG: Successfully parsed search terms: {search_terms}")
                 self.log_msg(f"Generated terms for {category}: {search_terms}", "INF")
@@ -636,10 +650,9 @@ class ThumbnailScraper:
                     
                 return search_terms
                 
-            except json.JSONDecodeError as e:
+            except StructuredOutputError as e:
                 self.log_msg(f"Error parsing Gemini API response: {str(e)}", "ERR")
-                print(f"DEBUG ERROR: JSON parsing error for response: {response_text}")
-                print(f"DEBUG ERROR: {str(e)}")
+                print(f"DEBUG ERROR: Invalid search terms after repair: {str(e)}")
                 # Fall back to basic search terms
                 return [title, category]
                 
@@ -651,12 +664,14 @@ class ThumbnailScraper:
             # Fall back to basic search terms
             return [title, category]
 
-    def openai_api_request(self, prompt_text):
+    def openai_api_request(self, prompt_text, response_schema=None):
         """
         Makes an API request to Gemini model and returns response in an OpenAI-compatible format.
         
         Args:
             prompt_text (str): The prompt text to send to the Gemini API
+            response_schema (dict, optional): Schema the JSON answer must follow, see structured_output;
+                the answer is cached only if it matches the schema
                 
         Returns:
             ResponseWrapper: Custom object containing response data with attributes:
@@ -675,10 +690,14 @@ class ThumbnailScraper:
             # required_input_tokens = model.count_tokens(prompt_text)
             # print(f"DEBUG: Required tokens for prompt: {required_input_tokens}")
             
-            # Fix: Use client.models.generate_content method instead of non-existent method
-            response = self.client.models.generate_content(
-                model="gemini-2.0-flash-lite",
-                contents=[prompt_text])
+            # Repeated search-term prompts are answered from the LLM response cache,
+            # the others are queued against the process-wide Gemini RPM/TPM budget
+            config = response_config(response_schema) if response_schema else None
+            validate = (lambda text: parse(text, response_schema)) if response_schema else None
+            response = get_llm_cache().generate("gemini-2.0-flash-lite", prompt_text, lambda: get_llm_gateway().call(
+                "gemini",
+                lambda client: client.models.generate_content(model="gemini-2.0-flash-lite", contents=[prompt_text], config=config),
+                estimated_tokens=estimate_tokens(prompt_text)), config=config, validate=validate)
             
             print(f"DEBUG: Gemini response received")
             print(f"DEBUG: Finish reason: {response.candidates[0].finish_reason}")
@@ -755,15 +774,12 @@ class ThumbnailScraper:
                 self.log_msg(f"Failed to get Unsplash search page for {query}", "ERR")
                 return []
                 
-            # Parse the HTML
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
             # Find image elements - Unsplash usually has images in figure elements
             image_urls = []
             restricted_skipped = 0
             
-            # Look for image elements with data-test attribute
-            image_elements = soup.select("figure img[srcset]")
+            # Look for image elements with data-test attribute, only <figure> subtrees are parsed
+            image_elements = select_attrs(response.text, "figure img[srcset]", parse_only=SoupStrainer('figure'))
             
             for img in image_elements:
                 if len(image_urls) >= n_images:
@@ -800,7 +816,11 @@ class ThumbnailScraper:
             # If we didn't find enough images with the above method, try alternate selectors
             if len(image_urls) < n_images:
                 # Try another common pattern for Unsplash images
-                alt_images = soup.select("div[data-test='search-photos-route'] img[src*='unsplash']")
+                alt_images = select_attrs(
+                    response.text,
+                    "div[data-test='search-photos-route'] img[src*='unsplash']",
+                    parse_only=SoupStrainer('div', attrs={'data-test': 'search-photos-route'})
+                )
                 for img in alt_images:
                     if len(image_urls) >= n_images:
                         break
@@ -858,7 +878,7 @@ class ThumbnailScraper:
                 return []
                 
             # Parse the HTML
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = make_soup(response.text)
             
             # Find image elements from Pexels
             image_urls = []
@@ -1160,6 +1180,9 @@ def main():
     parser.add_argument('--threads', type=int, help='Number of worker threads to use (default: CPU count * 2, max 10)')
     args = parser.parse_args()
     
+    # Every pooled session of this run resolves each host once per DNS_TTL
+    dns_cache.install()
+    
     try:
         # Test internet connectivity first
         print("Testing internet connectivity...")
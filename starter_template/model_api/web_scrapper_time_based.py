@@ -1,9 +1,20 @@
 import requests
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
-import re
 from typing import Dict, Any, Tuple, Optional, Union
-import dateutil.parser
+import re
+try:
+    from .http_session_pool import get_session, read_body
+    from .date_extractor import get_date_extractor
+    from .robots_cache import get_robots_cache
+except ImportError:
+    from http_session_pool import get_session, read_body
+    from date_extractor import get_date_extractor
+    from robots_cache import get_robots_cache
+
+# Seeing one of these in a streamed page means the cheap date strategies are worth running
+DATE_MARKER = re.compile(rb'datePublished|published_time|pubdate|publishdate|<time\b', re.IGNORECASE)
+HEAD_END = re.compile(rb'</head\s*>', re.IGNORECASE)
 
 def scrape_with_time_constraint(
     url: str, 
@@ -36,174 +47,181 @@ def scrape_with_time_constraint(
         }
     
     try:
-        # Fetch the page
-        response = requests.get(url, headers=headers, timeout=10)
+        get_robots_cache().check(url, headers=headers)
+        # Stream the page over the shared keep-alive session and stop once the date is known
+        response = get_session(url).get(url, headers=headers, timeout=10, stream=True)
         response.raise_for_status()
+        read_body(response, stop=DateProbe(url))
         
-        # Parse HTML content
-        soup = BeautifulSoup(response.text, 'html.parser')
+        # Extract publication date, a tree is only built if the cheap strategies find nothing
+        pub_date = extract_publication_date(response.text, url)
         
-        # Extract publication date
-        pub_date = extract_publication_date(soup, url)
+        return check_time_constraint(
+            pub_date,
+            url,
+            start_date=start_date,
+            start_time=start_time,
+            end_date=end_date,
+            end_time=end_time,
+            days_threshold=days_threshold
+        )
         
-        if not pub_date:
-            print(f"Could not extract publication date from {url}")
-            return {"valid": False, "timestamp": None, "url": url}
-        
-        # Calculate time constraints
-        current_date = datetime.now().replace(tzinfo=None)  # Ensure current_date is naive
+    except Exception as e:
+        print(f"Error checking {url}: {str(e)}")
+        return {"valid": False, "timestamp": None, "url": url, "reason": f"Error: {str(e)}"}
+
+def check_time_constraint(
+    pub_date: Optional[datetime],
+    url: str,
+    start_date: str = None,
+    start_time: str = None,
+    end_date: str = None,
+    end_time: str = None,
+    days_threshold: int = None
+) -> Dict[str, Any]:
+    """
+    Checks an already extracted publication date against the specified time constraint.
+    Lets callers that have fetched and parsed the article themselves reuse the same rules
+    as scrape_with_time_constraint without downloading the page again.
+    
+    Args:
+        pub_date (datetime, optional): Publication date extracted from the article
+        url (str): The URL of the news article
+        start_date (str, optional): Start date in YYYY-MM-DD format
+        start_time (str, optional): Start time in HH:MM format (24-hour)
+        end_date (str, optional): End date in YYYY-MM-DD format
+        end_time (str, optional): End time in HH:MM format (24-hour)
+        days_threshold (int, optional): Legacy parameter - maximum number of days old the article can be
         
-        # If specific start date/time is provided
-        start_constraint = None
-        if start_date:
-            start_components = start_date.split('-')
-            if len(start_components) == 3:
-                year, month, day = map(int, start_components)
-                if start_time:
-                    try:
-                        hour, minute = map(int, start_time.split(':'))
-                        start_constraint = datetime(year, month, day, hour, minute).replace(tzinfo=None)
-                    except (ValueError, IndexError):
-                        start_constraint = datetime(year, month, day).replace(tzinfo=None)
-                else:
+    Returns:
+        Dict[str, Any]: Dictionary with validity status and timestamp
+    """
+    if not pub_date:
+        print(f"Could not extract publication date from {url}")
+        return {"valid": False, "timestamp": None, "url": url}
+    
+    # Calculate time constraints
+    current_date = datetime.now().replace(tzinfo=None)  # Ensure current_date is naive
+    
+    # If specific start date/time is provided
+    start_constraint = None
+    if start_date:
+        start_components = start_date.split('-')
+        if len(start_components) == 3:
+            year, month, day = map(int, start_components)
+            if start_time:
+                try:
+                    hour, minute = map(int, start_time.split(':'))
+                    start_constraint = datetime(year, month, day, hour, minute).replace(tzinfo=None)
+                except (ValueError, IndexError):
                     start_constraint = datetime(year, month, day).replace(tzinfo=None)
-        
-        # If specific end date/time is provided
-        end_constraint = None
-        if end_date:
-            end_components = end_date.split('-')
-            if len(end_components) == 3:
-                year, month, day = map(int, end_components)
-                if end_time:
-                    try:
-                        hour, minute = map(int, end_time.split(':'))
-                        end_constraint = datetime(year, month, day, hour, minute).replace(tzinfo=None)
-                    except (ValueError, IndexError):
-                        end_constraint = datetime(year, month, day, 23, 59, 59).replace(tzinfo=None)
-                else:
+            else:
+                start_constraint = datetime(year, month, day).replace(tzinfo=None)
+    
+    # If specific end date/time is provided
+    end_constraint = None
+    if end_date:
+        end_components = end_date.split('-')
+        if len(end_components) == 3:
+            year, month, day = map(int, end_components)
+            if end_time:
+                try:
+                    hour, minute = map(int, end_time.split(':'))
+                    end_constraint = datetime(year, month, day, hour, minute).replace(tzinfo=None)
+                except (ValueError, IndexError):
                     end_constraint = datetime(year, month, day, 23, 59, 59).replace(tzinfo=None)
-        
-        # Determine validity based on time constraints
-        valid = True
-        reason = None
-        
-        # If days_threshold is provided but no specific dates
-        if days_threshold is not None and not start_constraint and not end_constraint:
-            time_limit = current_date - timedelta(days=days_threshold)
-            pub_date, time_limit = ensure_consistent_timezone(pub_date, time_limit)
-            if pub_date < time_limit:
+            else:
+                end_constraint = datetime(year, month, day, 23, 59, 59).replace(tzinfo=None)
+    
+    # Determine validity based on time constraints
+    valid = True
+    reason = None
+    
+    # If days_threshold is provided but no specific dates
+    if days_threshold is not None and not start_constraint and not end_constraint:
+        time_limit = current_date - timedelta(days=days_threshold)
+        pub_date, time_limit = ensure_consistent_timezone(pub_date, time_limit)
+        if pub_date < time_limit:
+            valid = False
+            reason = f"Article too old. Published on {pub_date.strftime('%Y-%m-%d %H:%M')}, threshold is {time_limit.strftime('%Y-%m-%d %H:%M')}"
+    else:
+        # Check if publication date is within constraints
+        if start_constraint:
+            pub_date, start_constraint = ensure_consistent_timezone(pub_date, start_constraint)
+            if pub_date < start_constraint:
                 valid = False
-                reason = f"Article too old. Published on {pub_date.strftime('%Y-%m-%d %H:%M')}, threshold is {time_limit.strftime('%Y-%m-%d %H:%M')}"
-        else:
-            # Check if publication date is within constraints
-            if start_constraint:
-                pub_date, start_constraint = ensure_consistent_timezone(pub_date, start_constraint)
-                if pub_date < start_constraint:
-                    valid = False
-                    reason = f"Article too old. Published on {pub_date.strftime('%Y-%m-%d %H:%M')}, start constraint is {start_constraint.strftime('%Y-%m-%d %H:%M')}"
-            
-            if end_constraint:
-                pub_date, end_constraint = ensure_consistent_timezone(pub_date, end_constraint)
-                if pub_date > end_constraint:
-                    valid = False
-                    reason = f"Article too recent. Published on {pub_date.strftime('%Y-%m-%d %H:%M')}, end constraint is {end_constraint.strftime('%Y-%m-%d %H:%M')}"
+                reason = f"Article too old. Published on {pub_date.strftime('%Y-%m-%d %H:%M')}, start constraint is {start_constraint.strftime('%Y-%m-%d %H:%M')}"
         
-        if not valid:
-            print(reason)
-            
-        return {
-            "valid": valid,
-            "timestamp": pub_date.isoformat(),
-            "url": url,
-            "reason": reason if not valid else None
-        }
+        if end_constraint:
+            pub_date, end_constraint = ensure_consistent_timezone(pub_date, end_constraint)
+            if pub_date > end_constraint:
+                valid = False
+                reason = f"Article too recent. Published on {pub_date.strftime('%Y-%m-%d %H:%M')}, end constraint is {end_constraint.strftime('%Y-%m-%d %H:%M')}"
+    
+    if not valid:
+        print(reason)
         
-    except Exception as e:
-        print(f"Error checking {url}: {str(e)}")
-        return {"valid": False, "timestamp": None, "url": url, "reason": f"Error: {str(e)}"}
+    return {
+        "valid": valid,
+        "timestamp": pub_date.isoformat(),
+        "url": url,
+        "reason": reason if not valid else None
+    }
+
+class DateProbe:
+    """
+    Stop condition for http_session_pool.read_body that reads a page only as far as needed
+    to date it. Once </head> or a date marker has been streamed, the cheap date strategies
+    run on the partial page. With a time window (check_time_constraint keyword arguments)
+    the download stops only when the article is outside it, so in-window articles and pages
+    without a usable date continue into a normal full download of the same response.
+    Without a window it stops as soon as a date is found.
+    """
+
+    def __init__(self, url: str, time_window: Optional[Dict[str, str]] = None):
+        self.url = url
+        self.time_window = time_window
+        self.pub_date = None
+        self.rejected = False
+        self.decided = False
+
+    def __call__(self, body: bytearray) -> bool:
+        if self.decided:
+            return False
+        # Only the part the cheap strategies would scan is searched, a page without markers there is read in full
+        scan_limit = get_date_extractor().scan_chars
+        head = bytes(body[:scan_limit])
+        head_end = HEAD_END.search(head)
+        if not head_end and not DATE_MARKER.search(head):
+            self.decided = len(body) >= scan_limit
+            return False
+        self.pub_date = get_date_extractor().extract_cheap(self.url, head.decode('utf-8', errors='replace'))
+        if not self.pub_date:
+            # A marker may be cut off mid-tag, keep reading until the head is complete
+            self.decided = head_end is not None or len(body) >= scan_limit
+            return False
+        self.decided = True
+        if self.time_window is None:
+            return True
+        self.rejected = not check_time_constraint(self.pub_date, self.url, **self.time_window)["valid"]
+        return self.rejected
 
-def extract_publication_date(soup: BeautifulSoup, url: str) -> Optional[datetime]:
+def extract_publication_date(soup: Union[BeautifulSoup, str], url: str, html: Optional[str] = None) -> Optional[datetime]:
     """
     Extract the publication date from a news article
     
     Args:
-        soup (BeautifulSoup): The parsed HTML content
+        soup (BeautifulSoup | str): The parsed HTML content, or the raw HTML
         url (str): The URL of the article
+        html (str, optional): Raw HTML when soup is parsed, lets the cheap strategies skip the tree
         
     Returns:
         Optional[datetime]: The publication date if found, None otherwise
     """
-    # Check for structured data
-    structured_data = soup.find('script', {'type': 'application/ld+json'})
-    if structured_data:
-        try:
-            import json
-            data = json.loads(structured_data.string)
-            if isinstance(data, list):
-                data = data[0]
-            
-            date_str = None
-            # Check various fields where date might be stored
-            for field in ['datePublished', 'dateModified', 'dateCreated', 'uploadDate']:
-                if field in data:
-                    date_str = data[field]
-                    break
-                    
-            if date_str:
-                parsed_date = dateutil.parser.parse(date_str)
-                # Convert to naive datetime if it has timezone info
-                if parsed_date.tzinfo is not None:
-                    parsed_date = parsed_date.replace(tzinfo=None)
-                return parsed_date
-        except:
-            pass
-    
-    # Common meta tags for publication date
-    meta_tags = [
-        ('meta[property="article:published_time"]', 'content'),
-        ('meta[name="pubdate"]', 'content'),
-        ('meta[name="publishdate"]', 'content'),
-        ('meta[name="timestamp"]', 'content'),
-        ('meta[name="date"]', 'content'),
-        ('time', 'datetime')
-    ]
-    
-    for selector, attr in meta_tags:
-        date_tag = soup.select_one(selector)
-        if date_tag and date_tag.get(attr):
-            try:
-                parsed_date = dateutil.parser.parse(date_tag[attr])
-                # Convert to naive datetime if it has timezone info
-                if parsed_date.tzinfo is not None:
-                    parsed_date = parsed_date.replace(tzinfo=None)
-                return parsed_date
-            except:
-                continue
-    
-    # Common patterns for dates in HTML text
-    date_patterns = [
-        # Look for date strings in HTML
-        r'(\d{1,2}\s+(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{4})',
-        r'((?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2},?\s+\d{4})',
-        r'(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})',
-        r'(\d{2}/\d{2}/\d{4})',
-        r'(\d{4}/\d{2}/\d{2})',
-    ]
-    
-    for pattern in date_patterns:
-        match = re.search(pattern, soup.text)
-        if match:
-            try:
-                parsed_date = dateutil.parser.parse(match.group(1))
-                # Convert to naive datetime if it has timezone info
-                if parsed_date.tzinfo is not None:
-                    parsed_date = parsed_date.replace(tzinfo=None)
-                return parsed_date
-            except:
-                continue
-    
-    # No date found
-    return None
+    # Cheap strategies first, remembered per domain (see date_extractor)
+    if isinstance(soup, str):
+        return get_date_extractor().extract(url, html=soup)
+    return get_date_extractor().extract(url, html=html, soup=soup)
 
 def ensure_consistent_timezone(dt1, dt2):
     """
@@ -12,35 +12,38 @@ except ImportError:
 from datetime import datetime
 
 # client = OpenAiAPI()
-client = GeminiAPI()
+# Created on first use: parser processes (see parse_pool) import this script again when it is the launcher
+client = None
 
 def get_openai_client():
+    global client
+    if client is None:
+        client = GeminiAPI()
     return client
 
 def run_openai_assistant():
     # openai_api = get_openai_client()
     # client.start_openai_assistant()
-    client.start_gemini_assistant()
+    get_openai_client().start_gemini_assistant()
     print("OpenAI Completed : Check DB for updated result!")
     # return None
 
 
 def summarize():
-    # client = get_openai_client()
-    client.fetch_content_and_run_summary()
+    get_openai_client().fetch_content_and_run_summary()
     print("OpenAI Completed : Check DB for updated result!")
 
 def check_news():
-    return client.chk_news()
+    return get_openai_client().chk_news()
 
 def check_results():
-    return client.chk_results()
+    return get_openai_client().chk_results()
 
 def check_summary():
-    return client.chk_summary()
+    return get_openai_client().chk_summary()
 
 def check_all_dates():
-    return client.get_all_available_dates()
+    return get_openai_client().get_all_available_dates()
 
 # def run_claude_assistant():
 #     start_claude_assistant()